@@ -1,14 +1,33 @@
 import logging
 import time
 
+from django.apps import apps
+from django.conf import settings
 from django.core.cache import cache
-from rest_framework_extensions.key_constructor.bits import KeyBitBase, QueryParamsKeyBit
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework_extensions.cache.decorators import CacheResponse
+from rest_framework_extensions.key_constructor.bits import KeyBitBase, KwargsKeyBit, QueryParamsKeyBit, UserKeyBit
 from rest_framework_extensions.key_constructor.constructors import (
-    DefaultListKeyConstructor, DefaultObjectKeyConstructor
+    DefaultKeyConstructor, DefaultListKeyConstructor, DefaultObjectKeyConstructor
 )
 
+from course_discovery.apps.api.utils import get_query_param
+
 logger = logging.getLogger(__name__)
 API_TIMESTAMP_KEY = 'api_timestamp'
+API_GENERATION_KEY = 'api_generation.{partner}.{model}'
+# Generation of the search index, bumped when update_index rebuilds it.
+SEARCH_INDEX_GENERATION_KEY = 'api_search_index_generation'
+# Generation of a model shared by all partners, bumped when an instance which does not belong to a partner changes.
+ALL_PARTNERS = 'all'
+# Generation of a model bumped when an instance of any partner changes, for views which span partners.
+ANY_PARTNER = 'any'
+# Seconds between checks for a response being rebuilt by another worker.
+WAIT_INTERVAL = 0.1
+# Relations followed to find the partner of an instance which does not have one itself.
+PARTNER_PARENT_FIELDS = ('course_run', 'course', 'person', 'program')
+# Parent relations followed to find the partner of instances of a model, by model.
+_partner_paths = {}
 
 
 class ApiTimestampKeyBit(KeyBitBase):
@@ -16,8 +35,75 @@ class ApiTimestampKeyBit(KeyBitBase):
         return cache.get_or_set(API_TIMESTAMP_KEY, time.time, None)
 
 
-class TimestampedListKeyConstructor(DefaultListKeyConstructor):
+class SiteKeyBit(KeyBitBase):
+    """ Site of the request. Sites and partners are one-to-one, but the site is known without querying the database. """
+
+    def get_data(self, **kwargs):  # pylint: disable=arguments-differ
+        site = getattr(kwargs['request'], 'site', None)
+        return site.id if site else None
+
+
+class ApiGenerationKeyBit(KeyBitBase):
+    """
+    Generations of the models the view depends on, for the partner of the request.
+
+    Views list the models their responses are built from in a cache_dependencies attribute. Views which do not are
+    assumed to depend on every course_metadata model. Views whose responses include data of every partner (e.g.
+    catalogs) set cache_across_partners, so changes made for any partner invalidate them. Views whose responses are
+    built from search results (e.g. the courses selected by a catalog's query) set cache_search_index, so rebuilding
+    the search index invalidates them.
+    """
+
+    def get_data(self, **kwargs):  # pylint: disable=arguments-differ
+        view = kwargs['view_instance']
+        request = kwargs['request']
+        models = getattr(view, 'cache_dependencies', None) or get_api_models()
+
+        if getattr(view, 'cache_across_partners', False):
+            partner_id = ANY_PARTNER
+        else:
+            partner = get_request_partner(request)
+            partner_id = partner.id if partner else None
+
+        generations = get_generations(models, partner_id)
+
+        if getattr(view, 'cache_search_index', False):
+            generations.append(get_versions([SEARCH_INDEX_GENERATION_KEY])[SEARCH_INDEX_GENERATION_KEY])
+
+        return generations
+
+
+class UtmUserKeyBit(UserKeyBit):
+    """
+    User of the request, for views whose marketing URLs include UTM parameters specific to the user (see
+    get_marketing_url_for_user). Responses excluding UTM parameters are shared by all users.
+    """
+
+    def get_data(self, **kwargs):  # pylint: disable=arguments-differ
+        if get_query_param(kwargs['request'], 'exclude_utm'):
+            return None
+
+        return super().get_data(**kwargs)
+
+
+class VersionedKeyConstructorMixin(object):
+    """
+    Key constructor whose keys include the API timestamp and model generations, i.e. the version of the data a
+    response was built from. Constructed with versioned=False, it builds a key shared by all versions of a response.
+    """
+    version_bits = ('timestamp', 'generations')
+
+    def __init__(self, versioned=True, **kwargs):
+        super().__init__(**kwargs)
+
+        if not versioned:
+            self.bits = {name: bit for name, bit in self.bits.items() if name not in self.version_bits}
+
+
+class TimestampedListKeyConstructor(VersionedKeyConstructorMixin, DefaultListKeyConstructor):
     timestamp = ApiTimestampKeyBit()
+    generations = ApiGenerationKeyBit()
+    site = SiteKeyBit()
     # The DefaultListKeyConstructor includes the PaginationKeyBit. While it does
     # subclass QueryParamsKeyBit, it also bypasses logic which includes all query
     # params in the cache key, restricting the set of query params that end up in
@@ -27,37 +113,373 @@ class TimestampedListKeyConstructor(DefaultListKeyConstructor):
     querystring = QueryParamsKeyBit()
 
 
-class TimestampedObjectKeyConstructor(DefaultObjectKeyConstructor):
+class TimestampedObjectKeyConstructor(VersionedKeyConstructorMixin, DefaultObjectKeyConstructor):
     timestamp = ApiTimestampKeyBit()
+    generations = ApiGenerationKeyBit()
+    site = SiteKeyBit()
     # The DefaultObjectKeyConstructor doesn't include querystring parameters
     # in its cache key.
     querystring = QueryParamsKeyBit()
 
 
-def timestamped_list_key_constructor(*args, **kwargs):  # pylint: disable=unused-argument
-    return TimestampedListKeyConstructor()(**kwargs)
+class TimestampedRouteKeyConstructor(VersionedKeyConstructorMixin, DefaultKeyConstructor):
+    """
+    Key constructor for custom routes (e.g. the courses of a catalog), whose objects are not looked up with the
+    view's queryset. Responses are identified by the URL's keyword arguments instead.
+    """
+    timestamp = ApiTimestampKeyBit()
+    generations = ApiGenerationKeyBit()
+    site = SiteKeyBit()
+    kwargs = KwargsKeyBit()
+    querystring = QueryParamsKeyBit()
+
+
+class UserTimestampedListKeyConstructor(TimestampedListKeyConstructor):
+    user = UtmUserKeyBit()
+
+
+class UserTimestampedObjectKeyConstructor(TimestampedObjectKeyConstructor):
+    user = UtmUserKeyBit()
+
+
+class UserTimestampedRouteKeyConstructor(TimestampedRouteKeyConstructor):
+    user = UtmUserKeyBit()
+
+
+def timestamped_list_key_constructor(*args, versioned=True, **kwargs):  # pylint: disable=unused-argument
+    return TimestampedListKeyConstructor(versioned=versioned)(**kwargs)
+
+
+def timestamped_object_key_constructor(*args, versioned=True, **kwargs):  # pylint: disable=unused-argument
+    return TimestampedObjectKeyConstructor(versioned=versioned)(**kwargs)
+
+
+def timestamped_route_key_constructor(*args, versioned=True, **kwargs):  # pylint: disable=unused-argument
+    return TimestampedRouteKeyConstructor(versioned=versioned)(**kwargs)
+
+
+def user_timestamped_list_key_constructor(*args, versioned=True, **kwargs):  # pylint: disable=unused-argument
+    return UserTimestampedListKeyConstructor(versioned=versioned)(**kwargs)
+
+
+def user_timestamped_object_key_constructor(*args, versioned=True, **kwargs):  # pylint: disable=unused-argument
+    return UserTimestampedObjectKeyConstructor(versioned=versioned)(**kwargs)
+
+
+def user_timestamped_route_key_constructor(*args, versioned=True, **kwargs):  # pylint: disable=unused-argument
+    return UserTimestampedRouteKeyConstructor(versioned=versioned)(**kwargs)
+
+
+class ApiCacheResponse(CacheResponse):
+    """
+    Caches API responses. Search requests (i.e. those with a q parameter) are not cached, since their queries are
+    arbitrary, and rarely repeated. Responses of views which are built from search results in other ways are cached
+    with the generation of the search index (see ApiGenerationKeyBit).
+
+    When the data a cached response was built from changes, a single worker rebuilds the response, holding a lock in
+    the cache. Meanwhile, other workers serve the previous version of the response, as long as it has not been stale
+    for more than API_CACHE_STALE_TIMEOUT seconds. Workers without a previous version to serve wait for the new one.
+    """
+
+    def process_cache_response(self, view_instance, view_method, request, args, kwargs):
+        if request.query_params.get('q'):
+            return view_method(view_instance, request, *args, **kwargs)
+
+        key_kwargs = {
+            'view_instance': view_instance,
+            'view_method': view_method,
+            'request': request,
+            'args': args,
+            'kwargs': kwargs,
+        }
+        key = self.calculate_key(**key_kwargs)
+        response = self.cache.get(key)
+
+        if not response:
+            latest_key = 'api_latest.' + self.calculate_key(versioned=False, **key_kwargs)
+            response = self.get_or_rebuild_response(key, latest_key, **key_kwargs)
+
+        if not hasattr(response, '_closable_objects'):
+            response._closable_objects = []
+
+        return response
+
+    def calculate_key(self, view_instance, view_method, request, args, kwargs, versioned=True):
+        # pylint: disable=arguments-differ
+        if isinstance(self.key_func, str):
+            key_func = getattr(view_instance, self.key_func)
+        else:
+            key_func = self.key_func
+
+        return key_func(
+            view_instance=view_instance,
+            view_method=view_method,
+            request=request,
+            args=args,
+            kwargs=kwargs,
+            versioned=versioned,
+        )
+
+    def get_or_rebuild_response(self, key, latest_key, view_instance, view_method, request, args, kwargs):
+        """
+        Returns a response whose cached version is missing. The response is rebuilt, unless another worker is already
+        rebuilding it, in which case the previous version of the response, or the one being rebuilt, is returned.
+
+        Arguments:
+            key (str): Cache key of the response.
+            latest_key (str): Cache key under which the key of the latest version of the response is stored.
+        """
+        lock_key = 'api_lock.' + key
+        stale_since_key = 'api_stale_since.' + key
+        # The marker is deleted once the response is cached. It expires in case the response is never rebuilt.
+        stale_since_timeout = settings.API_CACHE_STALE_TIMEOUT + settings.API_CACHE_LOCK_TIMEOUT
+        self.cache.add(stale_since_key, time.time(), stale_since_timeout)
+
+        locked = self.cache.add(lock_key, True, settings.API_CACHE_LOCK_TIMEOUT)
+        if not locked:
+            response = self.get_stale_response(key, latest_key, stale_since_key)
+            response = response or self.wait_for_response(key, lock_key)
+            if response:
+                return response
+
+            logger.warning('Cached response [%s] was not rebuilt by another worker in time.', key)
+
+        try:
+            response = view_method(view_instance, request, *args, **kwargs)
+            response = view_instance.finalize_response(request, response, *args, **kwargs)
+            response.render()  # should be rendered, before picklining while storing to cache
 
+            if not response.status_code >= 400 or self.cache_errors:
+                self.cache.set_many({key: response, latest_key: key}, self.timeout)
+                self.cache.delete(stale_since_key)
+        finally:
+            if locked:
+                self.cache.delete(lock_key)
 
-def timestamped_object_key_constructor(*args, **kwargs):  # pylint: disable=unused-argument
-    return TimestampedObjectKeyConstructor()(**kwargs)
+        return response
+
+    def get_stale_response(self, key, latest_key, stale_since_key):
+        """ Returns the previous version of a response, unless it has been stale for too long. """
+        previous_key = self.cache.get(latest_key)
+        if not previous_key or previous_key == key:
+            return None
+
+        stale_since = self.cache.get(stale_since_key)
+        if stale_since is None or time.time() - stale_since > settings.API_CACHE_STALE_TIMEOUT:
+            return None
+
+        return self.cache.get(previous_key)
+
+    def wait_for_response(self, key, lock_key):
+        """
+        Waits for another worker to rebuild a response.
+
+        Returns:
+            Response: The rebuilt response, or None if it was not rebuilt in time, or could not be cached.
+        """
+        deadline = time.time() + settings.API_CACHE_WAIT_TIMEOUT
+
+        while time.time() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            response = self.cache.get(key)
+
+            if response or not self.cache.get(lock_key):
+                return response
+
+        return None
+
+
+api_cache_response = ApiCacheResponse
+
+
+class ApiCacheResponseMixin(object):
+    """
+    Caches the list and retrieve responses of a viewset. Responses are cached per user, unless UTM parameters are
+    excluded from their marketing URLs.
+    """
+    list_cache_key_func = user_timestamped_list_key_constructor
+    object_cache_key_func = user_timestamped_object_key_constructor
+
+    @api_cache_response(key_func='list_cache_key_func')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @api_cache_response(key_func='object_cache_key_func')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+def get_api_models():
+    """ Returns the models whose changes invalidate cached API responses. """
+    return list(apps.get_app_config('course_metadata').get_models())
+
+
+def get_request_partner(request):
+    """ Returns the partner of the site a request was made to, or None if the site has no partner. """
+    return getattr(getattr(request, 'site', None), 'partner', None)
+
+
+def get_partner_path(model):
+    """
+    Returns the parent relations followed from a model to reach a model with a partner, or None if there is no such
+    path. An empty list is returned for models which have a partner themselves.
+    """
+    if model not in _partner_paths:
+        path = None
+        if any(field.name == 'partner' for field in model._meta.concrete_fields):
+            path = []
+        else:
+            for name in PARTNER_PARENT_FIELDS:
+                try:
+                    field = model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    continue
+
+                if field.concrete and (field.many_to_one or field.one_to_one):
+                    parent_path = get_partner_path(field.related_model)
+                    path = None if parent_path is None else [field] + parent_path
+                    break
+
+        _partner_paths[model] = path
+
+    return _partner_paths[model]
+
+
+def get_partner_id(instance):
+    """
+    Returns the id of the partner an instance belongs to. Instances without a partner of their own belong to the
+    partner of their course run, course, person or program. None is returned if no partner can be found.
+
+    Parents already loaded on the instance are used as is. Otherwise the partner is read from the foreign key of the
+    first parent, in a single query, rather than by loading every parent in turn.
+    """
+    path = get_partner_path(type(instance))
+    if path is None:
+        return None
+
+    while path:
+        field = path[0]
+        if not hasattr(instance, field.get_cache_name()):
+            break
+
+        instance = getattr(instance, field.get_cache_name())
+        if instance is None:
+            return None
+
+        path = path[1:]
+
+    if not path:
+        return instance.partner_id
+
+    parent_id = getattr(instance, path[0].attname)
+    if parent_id is None:
+        return None
+
+    lookup = '__'.join([field.name for field in path[1:]] + ['partner_id'])
+    return path[0].related_model._base_manager.filter(pk=parent_id).values_list(lookup, flat=True).first()
+
+
+def get_generation_key(model, partner_id=None, template=API_GENERATION_KEY):
+    return template.format(partner=partner_id or ALL_PARTNERS, model=model._meta.label_lower)
+
+
+def get_generations(models, partner_id=None, template=API_GENERATION_KEY):
+    """
+    Returns the generations of models, both those shared by all partners and those of the partner, in a single
+    cache round trip.
+
+    Arguments:
+        template (str): Template of the generation keys, for generations other than those of API responses.
+
+    Returns:
+        list: Generations, ordered by their cache key.
+    """
+    models = list(models)
+    keys = {get_generation_key(model, template=template) for model in models}
+    if partner_id:
+        keys |= {get_generation_key(model, partner_id, template) for model in models}
+
+    keys = sorted(keys)
+    generations = get_versions(keys)
+    return [generations[key] for key in keys]
+
+
+def get_versions(keys):
+    """
+    Returns the versions (e.g. generations) stored under keys, in a single cache round trip.
+
+    Versions which are not cached (i.e. were never bumped, or were evicted) are started at the current time, so a
+    version never goes back to a value which responses were cached with.
+
+    Returns:
+        dict: Versions, keyed by their cache key.
+    """
+    versions = cache.get_many(keys)
+
+    now = time.time()
+    missing = {key: now for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+
+    return versions
+
+
+def bump_generation(model, partner_id=None, template=API_GENERATION_KEY):
+    """
+    Invalidates the cached API responses which depend on a model, for a single partner, or for all partners if
+    partner_id is None. Responses of views which span partners are invalidated in both cases.
+    """
+    now = time.time()
+
+    if partner_id:
+        cache.set_many({
+            get_generation_key(model, partner_id, template): now,
+            get_generation_key(model, ANY_PARTNER, template): now,
+        }, None)
+    else:
+        cache.set(get_generation_key(model, template=template), now, None)
+
+
+def bump_partner_generations(partner_id, models=None):
+    """
+    Invalidates the cached API responses of a partner which depend on any of the models (by default, every model
+    served by the API), in a single cache round trip.
+    """
+    now = time.time()
+    generations = {}
+
+    for model in models or get_api_models():
+        generations[get_generation_key(model, partner_id)] = now
+        generations[get_generation_key(model, ANY_PARTNER)] = now
+
+    cache.set_many(generations, None)
+
+
+def bump_search_index_generation():
+    """ Invalidates the cached API responses which are built from search results. """
+    cache.set(SEARCH_INDEX_GENERATION_KEY, time.time(), None)
 
 
 def set_api_timestamp(timestamp):
     cache.set(API_TIMESTAMP_KEY, timestamp, None)
 
 
-def api_change_receiver(sender, **kwargs):  # pylint: disable=unused-argument
+def api_change_receiver(sender, instance=None, **kwargs):  # pylint: disable=unused-argument
     """
     Receiver function for handling post_save and post_delete signals emitted by
     course_metadata models.
+
+    Only the responses which depend on the changed model, for the partner the
+    changed instance belongs to, are invalidated.
     """
-    timestamp = time.time()
+    partner_id = get_partner_id(instance) if instance is not None else None
 
     logger.info(
-        '{model_name} model changed. Updating API timestamp to {timestamp}.'.format(
+        '{model_name} model changed for partner [{partner}]. Updating API generation.'.format(
             model_name=sender.__name__,
-            timestamp=timestamp
+            partner=partner_id or ALL_PARTNERS
         )
     )
 
-    set_api_timestamp(timestamp)
+    bump_generation(sender, partner_id)
@@ -0,0 +1,367 @@
+"""
+Documents are the serialized representations of programs and courses, cached per object so API responses can be
+assembled from them rather than serialized from the database.
+
+Each object has a version, which is bumped when the object, or an object it is serialized with (e.g. the course runs
+of a course, or the courses of a program), changes. Changes to other models (e.g. organizations or people) invalidate
+the documents of the partner through document generations instead. These are kept apart from the generations of API
+responses (see api.cache), so that refreshing course metadata only invalidates the documents of changed objects.
+"""
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.signals import pre_delete
+from rest_framework.response import Response
+from rest_framework_extensions.key_constructor.bits import KeyBitBase, LanguageKeyBit, QueryParamsKeyBit
+from rest_framework_extensions.key_constructor.constructors import KeyConstructor
+from rest_framework_extensions.settings import extensions_api_settings
+
+from course_discovery.apps.api.cache import (
+    SiteKeyBit, UtmUserKeyBit, bump_generation, get_api_models, get_generations, get_partner_id, get_request_partner,
+    get_versions
+)
+from course_discovery.apps.course_metadata.models import (
+    Course, CourseEntitlement, CourseRun, DataLoaderCheckpoint, DataLoaderConfig, DataLoaderFingerprint,
+    DataLoaderImage, DataLoaderRun, Program, Seat
+)
+
+logger = logging.getLogger(__name__)
+DOCUMENT_KEY = 'api_document.{representation}.{model}.{identifier}.{version}'
+DOCUMENT_VERSION_KEY = 'api_document_version.{model}.{identifier}'
+DOCUMENT_GENERATION_KEY = 'api_document_generation.{partner}.{model}'
+# Query parameters which select a page of results, rather than change how objects are represented.
+PAGINATION_PARAMS = ('page', 'page_size', 'limit', 'offset')
+# Models whose changes only invalidate the documents of the objects they are serialized with.
+TRACKED_MODELS = (Program, Course, CourseRun, Seat, CourseEntitlement)
+# Models whose documents can only be found while their instances exist, so invalidations of deleted instances are
+# never deferred. Other tracked models find their documents through the ids of their parents.
+DELETION_TRACKED_MODELS = (Program, Course)
+# Models recording the state of the data loaders, which documents are not built from.
+DATA_LOADER_MODELS = (DataLoaderCheckpoint, DataLoaderConfig, DataLoaderFingerprint, DataLoaderImage, DataLoaderRun)
+# Number of instances whose documents are invalidated with each query, when deferred invalidations are made.
+DEFERRED_BATCH_SIZE = 500
+# Invalidations deferred by defer_document_bumps, shared by the threads of data loaders.
+_deferral_lock = threading.Lock()
+_deferral = {'depth': 0, 'instances': {}, 'related': {}}
+
+
+class RepresentationQueryParamsKeyBit(QueryParamsKeyBit):
+    """ Query parameters of the request, other than those selecting a page of results. """
+
+    def get_data(self, **kwargs):
+        data = super().get_data(**kwargs)
+        return {name: value for name, value in data.items() if name not in PAGINATION_PARAMS}
+
+
+class SerializerKeyBit(KeyBitBase):
+    def get_data(self, **kwargs):  # pylint: disable=arguments-differ
+        serializer_class = kwargs['view_instance'].get_serializer_class()
+        return '.'.join([serializer_class.__module__, serializer_class.__name__])
+
+
+class DocumentGenerationKeyBit(KeyBitBase):
+    """ Generations of the models documents are built from, other than the tracked ones, for the partner. """
+
+    def get_data(self, **kwargs):  # pylint: disable=arguments-differ
+        partner = get_request_partner(kwargs['request'])
+        models = [model for model in get_document_models() if model not in TRACKED_MODELS]
+        return get_generations(models, partner.id if partner else None, DOCUMENT_GENERATION_KEY)
+
+
+class DocumentRepresentationKeyConstructor(KeyConstructor):
+    """
+    Identifies how the documents of a request are represented. Documents of requests with the same representation
+    (e.g. different pages of a list) are shared.
+    """
+    serializer = SerializerKeyBit()
+    language = LanguageKeyBit()
+    site = SiteKeyBit()
+    user = UtmUserKeyBit()
+    querystring = RepresentationQueryParamsKeyBit()
+    generations = DocumentGenerationKeyBit()
+
+
+class ApiDocumentMixin(object):
+    """
+    Serves the list and retrieve responses of a viewset from documents. Documents which are missing are serialized,
+    and cached for subsequent requests.
+
+    Viewsets implement get_document_queryset, which returns the objects listed by the viewset without the related
+    objects they are serialized with. Objects are identified by their document_identifier_field.
+    """
+    document_identifier_field = 'uuid'
+    document_representation_key_func = DocumentRepresentationKeyConstructor()
+
+    def get_document_queryset(self):
+        raise NotImplementedError
+
+    def get_document_identifier(self, lookup_value):
+        """ Returns the identifier of the object a retrieve request looks up, or None if it is not valid. """
+        try:
+            return str(uuid.UUID(lookup_value))
+        except ValueError:
+            return None
+
+    def get_document_keys(self, identifiers):
+        """
+        Returns:
+            dict: Cache keys of the documents of the objects, keyed by their identifiers.
+        """
+        model = self.get_document_queryset().model
+        representation = self.document_representation_key_func(
+            view_instance=self, view_method=None, request=self.request, args=(), kwargs=self.kwargs
+        )
+        versions = get_document_versions(model, identifiers)
+
+        return {
+            identifier: DOCUMENT_KEY.format(
+                representation=representation,
+                model=model._meta.label_lower,
+                identifier=identifier,
+                version=versions[identifier],
+            )
+            for identifier in identifiers
+        }
+
+    def get_documents(self, identifiers):
+        """ Returns the documents of objects, in the order of their identifiers. """
+        identifiers = [str(identifier) for identifier in identifiers]
+        keys = self.get_document_keys(identifiers)
+        documents = cache.get_many(keys.values())
+        missing = [identifier for identifier in identifiers if keys[identifier] not in documents]
+
+        if missing:
+            filter_kwargs = {self.document_identifier_field + '__in': missing}
+            instances = list(self.get_queryset().filter(**filter_kwargs))
+            serializer = self.get_serializer(instances, many=True)
+
+            built = {
+                keys[str(getattr(instance, self.document_identifier_field))]: data
+                for instance, data in zip(instances, serializer.data)
+            }
+            cache.set_many(built, extensions_api_settings.DEFAULT_CACHE_RESPONSE_TIMEOUT)
+            documents.update(built)
+
+        # Objects deleted since they were listed are left out.
+        return [documents[keys[identifier]] for identifier in identifiers if keys[identifier] in documents]
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('q'):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_document_queryset())
+        identifiers = queryset.values_list(self.document_identifier_field, flat=True)
+
+        page = self.paginate_queryset(identifiers)
+        if page is not None:
+            return self.get_paginated_response(self.get_documents(page))
+
+        return Response(self.get_documents(identifiers))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        identifier = self.get_document_identifier(self.kwargs[lookup_url_kwarg])
+        if identifier is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        # The version is read before the document is built, so changes made meanwhile invalidate it.
+        key = self.get_document_keys([identifier])[identifier]
+        document = cache.get(key)
+
+        if document is None:
+            response = super().retrieve(request, *args, **kwargs)
+            cache.set(key, response.data, extensions_api_settings.DEFAULT_CACHE_RESPONSE_TIMEOUT)
+            return response
+
+        return Response(document)
+
+
+def get_document_models():
+    """ Returns the models documents are built from. """
+    return [model for model in get_api_models() if model not in DATA_LOADER_MODELS]
+
+
+def get_document_version_key(model, identifier):
+    return DOCUMENT_VERSION_KEY.format(model=model._meta.label_lower, identifier=identifier)
+
+
+def get_document_versions(model, identifiers):
+    """
+    Returns:
+        dict: Versions of the documents of objects, keyed by their identifiers.
+    """
+    keys = {identifier: get_document_version_key(model, identifier) for identifier in identifiers}
+    versions = get_versions(list(keys.values()))
+    return {identifier: versions[key] for identifier, key in keys.items()}
+
+
+def get_document_version_keys(*instances):
+    """
+    Returns the version keys of the documents instances are serialized in: those of their own programs and courses,
+    and of the programs and courses serialized with them. The number of queries made does not depend on the number
+    of instances.
+    """
+    program_ids, course_ids, course_run_ids = set(), set(), set()
+
+    for instance in instances:
+        if isinstance(instance, Program):
+            program_ids.add(instance.pk)
+        elif isinstance(instance, Course):
+            course_ids.add(instance.pk)
+        elif isinstance(instance, (CourseRun, CourseEntitlement)):
+            course_ids.add(instance.course_id)
+        elif isinstance(instance, Seat):
+            course_run_ids.add(instance.course_run_id)
+
+    if course_run_ids:
+        course_ids.update(CourseRun.objects.filter(pk__in=course_run_ids).values_list('course_id', flat=True))
+
+    if not (program_ids or course_ids):
+        return []
+
+    programs = Program.objects.filter(Q(pk__in=program_ids) | Q(courses__in=course_ids)).distinct()
+    courses = Course.objects.filter(Q(pk__in=course_ids) | Q(programs__in=program_ids)).distinct()
+
+    keys = [get_document_version_key(Program, uuid) for uuid in programs.values_list('uuid', flat=True)]
+    for key, uuid in courses.values_list('key', 'uuid'):
+        # Courses are retrieved by key or UUID.
+        keys += [get_document_version_key(Course, key), get_document_version_key(Course, uuid)]
+
+    return keys
+
+
+def bump_document_versions(*instances):
+    """ Invalidates the documents the instances are serialized in. """
+    keys = get_document_version_keys(*instances)
+
+    if keys:
+        now = time.time()
+        cache.set_many({key: now for key in keys}, None)
+
+
+def bump_documents(model, instances, defer=True):
+    """
+    Invalidates the documents which instances of a model are part of. Changes which are made without sending signals
+    (e.g. with bulk_create or QuerySet.update) are reported with this function.
+
+    Within defer_document_bumps, the documents are only invalidated at the end of the block, unless defer is False.
+    """
+    instances = list(instances)
+    if defer and defer_document_bump(model, instances):
+        return
+
+    if model in TRACKED_MODELS:
+        bump_document_versions(*instances)
+    elif model not in DATA_LOADER_MODELS:
+        for partner_id in {get_partner_id(instance) for instance in instances}:
+            bump_generation(model, partner_id, DOCUMENT_GENERATION_KEY)
+
+
+@contextmanager
+def defer_document_bumps():
+    """
+    Defers the invalidation of the documents of objects changed within the block, by any thread, to the end of the
+    block, where the documents of all of them are invalidated with a few queries. Data loaders run within this block,
+    so that saving an object does not query the objects it is serialized with each time.
+
+    Deletions of programs and courses are not deferred, since the objects they are serialized with can no longer be
+    found once they are deleted.
+    """
+    with _deferral_lock:
+        _deferral['depth'] += 1
+
+    try:
+        yield
+    finally:
+        with _deferral_lock:
+            _deferral['depth'] -= 1
+            pending = None
+            if not _deferral['depth']:
+                pending = (_deferral['instances'], _deferral['related'])
+                _deferral['instances'], _deferral['related'] = {}, {}
+
+        if pending:
+            bump_deferred_documents(*pending)
+
+
+def defer_document_bump(model, instances=(), related_ids=()):
+    """
+    Records changes to be invalidated at the end of defer_document_bumps.
+
+    Arguments:
+        model (Model): Model of the changed instances.
+        instances (iterable): Changed instances of the model.
+        related_ids (iterable): Primary keys of changed instances which are not loaded, e.g. the objects added to or
+            removed from a many-to-many relation.
+
+    Returns:
+        bool: False if invalidations are not being deferred, in which case nothing is recorded.
+    """
+    with _deferral_lock:
+        if not _deferral['depth']:
+            return False
+
+        _deferral['instances'].setdefault(model, {}).update((instance.pk, instance) for instance in instances)
+        _deferral['related'].setdefault(model, set()).update(related_ids)
+
+    return True
+
+
+def bump_deferred_documents(instances, related):
+    """ Invalidates the documents of the changes recorded by defer_document_bump. """
+    tracked = []
+    for model, model_instances in instances.items():
+        if model in TRACKED_MODELS:
+            tracked += model_instances.values()
+        else:
+            bump_documents(model, model_instances.values(), defer=False)
+
+    for model, ids in related.items():
+        ids = list(ids.difference(instances.get(model, {})))
+        for start in range(0, len(ids), DEFERRED_BATCH_SIZE):
+            tracked += model.objects.filter(pk__in=ids[start:start + DEFERRED_BATCH_SIZE])
+
+    for start in range(0, len(tracked), DEFERRED_BATCH_SIZE):
+        bump_document_versions(*tracked[start:start + DEFERRED_BATCH_SIZE])
+
+
+def document_change_receiver(sender, instance=None, signal=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Receiver function for handling post_save and pre_delete signals emitted by the models documents are built from.
+    Deletions are handled before the instance is deleted, while the objects it is serialized with can still be found.
+    """
+    logger.debug('{model_name} [{pk}] changed. Updating documents.'.format(
+        model_name=sender.__name__, pk=instance.pk
+    ))
+
+    bump_documents(sender, [instance], defer=not (signal is pre_delete and sender in DELETION_TRACKED_MODELS))
+
+
+def document_m2m_change_receiver(sender, instance, action, model, pk_set, **kwargs):  # pylint: disable=unused-argument
+    """
+    Receiver function for handling m2m_changed signals emitted by the relations of tracked models. Relations are
+    handled after objects are added or removed, and before they are cleared.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    related_ids = pk_set if pk_set and model in TRACKED_MODELS else ()
+    # The objects removed by clearing a relation are only known before it is cleared.
+    if action != 'pre_clear' and defer_document_bump(type(instance), [instance], related_ids):
+        return
+
+    instances = [instance]
+    if related_ids:
+        instances += list(model.objects.filter(pk__in=related_ids))
+
+    bump_document_versions(*instances)
+
+
+def get_document_m2m_senders():
+    """ Returns the through models of the many-to-many relations of tracked models. """
+    return [field.remote_field.through for model in TRACKED_MODELS for field in model._meta.many_to_many]
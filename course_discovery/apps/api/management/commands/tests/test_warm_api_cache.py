@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+
+import mock
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from rest_framework.reverse import reverse
+
+from course_discovery.apps.api.documents import ApiDocumentMixin
+from course_discovery.apps.api.management.commands.warm_api_cache import Command
+from course_discovery.apps.api.v1.tests.test_views.mixins import APITestCase
+from course_discovery.apps.core.tests.factories import UserFactory
+from course_discovery.apps.course_metadata.tests.factories import ProgramFactory
+
+ACCESS_LOG_LINE = '127.0.0.1 - - [17/Oct/2026:10:00:00 +0000] "GET {path} HTTP/1.1" {status} 512 "-" "curl/7.58.0"\n'
+
+
+class WarmApiCacheCommandTests(APITestCase):
+    def setUp(self):
+        super(WarmApiCacheCommandTests, self).setUp()
+        cache.clear()
+        self.user = UserFactory(is_staff=True)
+        self.client.force_authenticate(self.user)
+        ProgramFactory(partner=self.partner)
+        self.path = reverse('api:v1:program-list')
+
+    def write_file(self, content):
+        f = tempfile.NamedTemporaryFile('w', delete=False)
+        self.addCleanup(os.remove, f.name)
+
+        with f:
+            f.write(content)
+
+        return f.name
+
+    def assert_warmed(self, *command_args):
+        """ Verify the command caches the response clients then receive. """
+        with mock.patch.object(ApiDocumentMixin, 'list', autospec=True, side_effect=ApiDocumentMixin.list) as mock_list:
+            call_command('warm_api_cache', '--workers', '1', *command_args)
+            self.assertEqual(mock_list.call_count, 1)
+
+            response = self.client.get(self.path)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(mock_list.call_count, 1)
+
+    def test_manifest(self):
+        manifest = self.write_file(json.dumps([
+            {'path': self.path, 'username': self.user.username, 'partner_code': self.partner.short_code},
+        ]))
+        self.assert_warmed('--manifest', manifest)
+
+    def test_access_log(self):
+        """ Verify the most frequent successful API requests of the access log are replayed. """
+        access_log = self.write_file(
+            ACCESS_LOG_LINE.format(path=self.path, status=200) * 2 +
+            ACCESS_LOG_LINE.format(path=self.path + '?page=2', status=200) +
+            ACCESS_LOG_LINE.format(path=self.path + '?page=3', status=404) * 3
+        )
+        self.assert_warmed('--access_log', access_log, '--limit', '1', '--username', self.user.username)
+
+    def test_skip_search_index(self):
+        """ Verify requests whose responses are built from search results can be skipped. """
+        catalog_path = reverse('api:v1:catalog-courses', kwargs={'id': 1})
+        manifest = self.write_file(json.dumps([self.path, catalog_path]))
+
+        with mock.patch.object(Command, 'warm', return_value=True) as mock_warm:
+            call_command('warm_api_cache', '--manifest', manifest, '--username', self.user.username, '--workers', '1',
+                         '--skip_search_index')
+
+        self.assertEqual([call[0][0] for call in mock_warm.call_args_list], [self.path])
+
+    def test_unknown_user(self):
+        manifest = self.write_file(json.dumps([self.path]))
+
+        with self.assertRaises(CommandError):
+            call_command('warm_api_cache', '--manifest', manifest, '--username', 'nobody')
+
+    def test_no_requests(self):
+        with self.assertRaises(CommandError):
+            call_command('warm_api_cache')
@@ -0,0 +1,239 @@
+import concurrent.futures
+import json
+import logging
+import re
+from collections import Counter, namedtuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.urls import Resolver404, resolve
+from django.utils import translation
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from course_discovery.apps.core.models import Partner
+
+logger = logging.getLogger(__name__)
+
+# Successful GET requests to the API, in the combined log format used by nginx and Apache.
+ACCESS_LOG_REGEX = re.compile(r'"GET (?P<path>/api/\S+) HTTP/[\d.]+" 200 ')
+
+WarmRequest = namedtuple('WarmRequest', ['path', 'username', 'partner_code'])
+
+
+def read_manifest(path):
+    """
+    Reads the requests listed in a manifest: a JSON list of paths, or of objects with a path and, optionally, the
+    username and partner_code the request is made for.
+
+    Returns:
+        list[WarmRequest]
+    """
+    with open(path) as f:
+        entries = json.load(f)
+
+    return [
+        WarmRequest(entry, None, None) if isinstance(entry, str) else
+        WarmRequest(entry['path'], entry.get('username'), entry.get('partner_code'))
+        for entry in entries
+    ]
+
+
+def uses_search_index(path):
+    """ Returns True if the response of a request is built from search results. See ApiGenerationKeyBit. """
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return False
+
+    return getattr(getattr(match.func, 'cls', None), 'cache_search_index', False)
+
+
+def read_access_log(path, limit):
+    """
+    Reads the most frequent successful API requests in an access log.
+
+    Returns:
+        list[WarmRequest]
+    """
+    counts = Counter()
+
+    with open(path) as f:
+        for line in f:
+            match = ACCESS_LOG_REGEX.search(line)
+            if match:
+                counts[match.group('path')] += 1
+
+    return [WarmRequest(path, None, None) for path, __ in counts.most_common(limit)]
+
+
+class Command(BaseCommand):
+    help = 'Warm the API response cache by replaying frequent requests.'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.users = {}
+        self.partners = {}
+        self.default_username = None
+        self.default_partner_code = None
+        self.factory = APIRequestFactory()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--manifest',
+            action='store',
+            dest='manifest',
+            default=None,
+            help='Path of a JSON manifest of the requests to replay. Defaults to the API_CACHE_WARMING_MANIFEST '
+                 'setting.'
+        )
+        parser.add_argument(
+            '--access_log',
+            action='store',
+            dest='access_log',
+            default=None,
+            help='Path of an access log, whose most frequent API requests are replayed.'
+        )
+        parser.add_argument(
+            '--limit',
+            action='store',
+            dest='limit',
+            type=int,
+            default=100,
+            help='Number of requests replayed from the access log.'
+        )
+        parser.add_argument(
+            '--username',
+            action='store',
+            dest='username',
+            default=None,
+            help='User the requests are made for, unless the manifest names one. Responses including marketing URLs '
+                 'are cached per user, so this should be the main client of the API. Defaults to the '
+                 'API_CACHE_WARMING_USERNAME setting.'
+        )
+        parser.add_argument(
+            '--partner_code',
+            action='store',
+            dest='partner_code',
+            default=None,
+            help='Short code of the partner whose site the requests are made to, unless the manifest names one. '
+                 'Defaults to the only partner, if there is only one.'
+        )
+        parser.add_argument(
+            '--workers',
+            action='store',
+            dest='workers',
+            type=int,
+            default=4,
+            help='Number of requests made at the same time.'
+        )
+        parser.add_argument(
+            '--skip_search_index',
+            action='store_true',
+            dest='skip_search_index',
+            default=False,
+            help='Skip requests whose responses are built from search results, e.g. when the search index has not '
+                 'been rebuilt yet.'
+        )
+
+    def handle(self, *args, **options):
+        manifest = options.get('manifest') or settings.API_CACHE_WARMING_MANIFEST
+        access_log = options.get('access_log')
+
+        if access_log:
+            requests = read_access_log(access_log, options['limit'])
+        elif manifest:
+            requests = read_manifest(manifest)
+        else:
+            raise CommandError('Either a manifest or an access log is required!')
+
+        if options.get('skip_search_index'):
+            requests = [request for request in requests if not uses_search_index(request.path)]
+
+        self.default_username = options.get('username') or settings.API_CACHE_WARMING_USERNAME
+        self.default_partner_code = options.get('partner_code')
+
+        # Users and partners are looked up before requests are made, so invalid ones fail the command early.
+        requests = [self.resolve_request(request) for request in requests]
+
+        logger.info('Warming the API cache with [%d] requests...', len(requests))
+        workers = max(options['workers'], 1)
+
+        if workers > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self.warm_in_thread, requests))
+        else:
+            results = [self.warm(*request) for request in requests]
+
+        failed = results.count(False)
+        logger.info('Warmed the API cache with [%d] requests. [%d] failed.', len(results) - failed, failed)
+
+    def resolve_request(self, request):
+        """ Returns the path, user and partner of a request. """
+        username = request.username or self.default_username
+        if not username:
+            raise CommandError('No user to make request [{}] for!'.format(request.path))
+
+        user = self.users.get(username)
+        if user is None:
+            try:
+                user = self.users[username] = get_user_model().objects.get(username=username)
+            except get_user_model().DoesNotExist:
+                raise CommandError('User [{}] does not exist!'.format(username))
+
+            if not (user.is_staff or user.is_superuser):
+                logger.warning('Requests made for user [%s] are throttled, since the user is not staff.', username)
+
+        partner_code = request.partner_code or self.default_partner_code
+        partner = self.partners.get(partner_code)
+        if partner is None:
+            partners = Partner.objects.filter(short_code=partner_code) if partner_code else Partner.objects.all()
+            partners = list(partners.select_related('site')[:2])
+
+            if len(partners) != 1:
+                raise CommandError('No single partner to make request [{}] to!'.format(request.path))
+
+            partner = self.partners[partner_code] = partners[0]
+
+        return request.path, user, partner
+
+    def warm(self, path, user, partner):
+        """
+        Makes a request to the API, in this process, so its response is cached.
+
+        Returns:
+            bool: True if the request succeeded.
+        """
+        try:
+            match = resolve(urlsplit(path).path)
+        except Resolver404:
+            logger.error('Request [%s] does not match any view.', path)
+            return False
+
+        request = self.factory.get(path, HTTP_HOST=partner.site.domain)
+        request.site = partner.site
+        force_authenticate(request, user=user)
+
+        try:
+            # Management commands deactivate translations, and responses are cached per language. Requests are made in
+            # the language the API is served in by default, so the responses they cache are those clients get.
+            with translation.override(settings.LANGUAGE_CODE):
+                response = match.func(request, *match.args, **match.kwargs)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Request [%s] failed.', path)
+            return False
+
+        if response.status_code >= 400:
+            logger.error('Request [%s] failed with status [%d].', path, response.status_code)
+            return False
+
+        return True
+
+    def warm_in_thread(self, request):
+        try:
+            return self.warm(*request)
+        finally:
+            # Each thread opens its own connection to the database, which must not be left open once it is done.
+            connection.close()
@@ -0,0 +1,243 @@
+import time
+
+import ddt
+import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from course_discovery.apps.api.cache import (
+    ApiCacheResponse, ApiGenerationKeyBit, UtmUserKeyBit, api_change_receiver, bump_generation,
+    bump_partner_generations, bump_search_index_generation, get_generation_key, get_partner_id
+)
+from course_discovery.apps.core.tests.factories import PartnerFactory, UserFactory
+from course_discovery.apps.course_metadata.models import Course, Program, Seat, Video
+from course_discovery.apps.course_metadata.tests.factories import (
+    CourseFactory, CourseRunFactory, SeatFactory, VideoFactory
+)
+
+
+class ApiGenerationTests(TestCase):
+    def setUp(self):
+        super(ApiGenerationTests, self).setUp()
+        cache.clear()
+        self.partner = PartnerFactory()
+        self.other_partner = PartnerFactory()
+
+    def get_key_data(self, partner, dependencies=None, across_partners=False, search_index=False):
+        request = mock.Mock(site=partner.site)
+        view = mock.Mock(
+            cache_dependencies=dependencies, cache_across_partners=across_partners, cache_search_index=search_index
+        )
+        return ApiGenerationKeyBit().get_data(request=request, view_instance=view)
+
+    def test_get_partner_id(self):
+        """ Verify the partner of an instance is found through its parents, if it does not have one itself. """
+        course = CourseFactory(partner=self.partner)
+        seat = SeatFactory(course_run=CourseRunFactory(course=course))
+
+        self.assertEqual(get_partner_id(course), self.partner.id)
+        self.assertEqual(get_partner_id(seat), self.partner.id)
+        self.assertIsNone(get_partner_id(VideoFactory()))
+
+    def test_get_partner_id_queries(self):
+        """ Verify the partner of an instance is read from the foreign key of its parent in a single query. """
+        seat = SeatFactory(course_run=CourseRunFactory(course=CourseFactory(partner=self.partner)))
+        seat = Seat.objects.get(pk=seat.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_partner_id(seat), self.partner.id)
+
+        # Parents which are already loaded are used as is.
+        seat = Seat.objects.select_related('course_run__course').get(pk=seat.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_partner_id(seat), self.partner.id)
+
+    def test_generations_are_stable(self):
+        """ Verify generations do not change until they are bumped. """
+        data = self.get_key_data(self.partner)
+        self.assertEqual(self.get_key_data(self.partner), data)
+
+    def test_partner_change(self):
+        """ Verify changes to an instance of a partner only invalidate the responses of that partner. """
+        course = CourseFactory(partner=self.partner)
+        data = self.get_key_data(self.partner)
+        other_data = self.get_key_data(self.other_partner)
+
+        with mock.patch('time.time', return_value=data[0] + 1):
+            api_change_receiver(Course, instance=course)
+
+        self.assertNotEqual(self.get_key_data(self.partner), data)
+        self.assertEqual(self.get_key_data(self.other_partner), other_data)
+
+    def test_across_partners(self):
+        """ Verify changes to an instance of any partner invalidate the responses of views spanning partners. """
+        course = CourseFactory(partner=self.other_partner)
+        data = self.get_key_data(self.partner, across_partners=True)
+
+        with mock.patch('time.time', return_value=data[0] + 1):
+            api_change_receiver(Course, instance=course)
+
+        self.assertNotEqual(self.get_key_data(self.partner, across_partners=True), data)
+
+    def test_shared_change(self):
+        """ Verify changes to an instance without a partner invalidate the responses of every partner. """
+        data = self.get_key_data(self.partner)
+        other_data = self.get_key_data(self.other_partner)
+
+        with mock.patch('time.time', return_value=data[0] + 1):
+            api_change_receiver(Video, instance=VideoFactory())
+
+        self.assertNotEqual(self.get_key_data(self.partner), data)
+        self.assertNotEqual(self.get_key_data(self.other_partner), other_data)
+
+    def test_dependencies(self):
+        """ Verify changes to models a view does not depend on do not invalidate its responses. """
+        data = self.get_key_data(self.partner, dependencies=[Program])
+
+        with mock.patch('time.time', return_value=data[0] + 1):
+            bump_generation(Course, self.partner.id)
+            self.assertEqual(self.get_key_data(self.partner, dependencies=[Program]), data)
+
+            bump_generation(Program, self.partner.id)
+            self.assertNotEqual(self.get_key_data(self.partner, dependencies=[Program]), data)
+
+    def test_bump_partner_generations(self):
+        """ Verify all of a partner's responses, and those spanning partners, can be invalidated at once. """
+        data = self.get_key_data(self.partner)
+        across_data = self.get_key_data(self.other_partner, across_partners=True)
+        other_data = self.get_key_data(self.other_partner)
+
+        with mock.patch('time.time', return_value=data[0] + 1):
+            bump_partner_generations(self.partner.id)
+
+        self.assertNotEqual(self.get_key_data(self.partner), data)
+        self.assertNotEqual(self.get_key_data(self.other_partner, across_partners=True), across_data)
+        self.assertEqual(self.get_key_data(self.other_partner), other_data)
+
+    def test_search_index(self):
+        """ Verify rebuilding the search index only invalidates the responses built from search results. """
+        data = self.get_key_data(self.partner)
+        search_data = self.get_key_data(self.partner, search_index=True)
+
+        with mock.patch('time.time', return_value=search_data[-1] + 1):
+            bump_search_index_generation()
+
+        self.assertEqual(self.get_key_data(self.partner), data)
+        self.assertNotEqual(self.get_key_data(self.partner, search_index=True), search_data)
+
+    def test_evicted_generation(self):
+        """ Verify an evicted generation does not go back to a value responses may have been cached with. """
+        data = self.get_key_data(self.partner, dependencies=[Program])
+
+        with mock.patch('time.time', return_value=data[0] + 1):
+            cache.delete(get_generation_key(Program, self.partner.id))
+            self.assertNotEqual(self.get_key_data(self.partner, dependencies=[Program]), data)
+
+
+@ddt.ddt
+class UtmUserKeyBitTests(TestCase):
+    @ddt.data(
+        ({}, True),
+        ({'exclude_utm': 0}, True),
+        ({'exclude_utm': 1}, False),
+    )
+    @ddt.unpack
+    def test_get_data(self, query_params, expected_user):
+        """ Verify responses are only cached per user if their marketing URLs include UTM parameters. """
+        user = UserFactory()
+        request = Request(APIRequestFactory().get('/', query_params))
+        request.user = user
+
+        data = UtmUserKeyBit().get_data(request=request, params=None, view_instance=None, view_method=None,
+                                        args=None, kwargs=None)
+        self.assertEqual(data, str(user.id) if expected_user else None)
+
+
+class FakeResponse(object):
+    """ Picklable stand-in for a rendered response. """
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+    def render(self):
+        pass
+
+
+class ApiCacheResponseTests(TestCase):
+    def setUp(self):
+        super(ApiCacheResponseTests, self).setUp()
+        cache.clear()
+        self.version = 1
+        self.view = mock.Mock()
+        self.view.finalize_response.side_effect = lambda request, response, *args, **kwargs: response
+        self.request = Request(APIRequestFactory().get('/'))
+        self.cache_response = ApiCacheResponse(key_func=self.key_func)
+
+    def key_func(self, versioned=True, **kwargs):  # pylint: disable=unused-argument
+        return 'response.{}'.format(self.version) if versioned else 'response'
+
+    def get(self, content):
+        """ Requests a response, which is built with the given content if it is not served from the cache. """
+        view_method = mock.Mock(return_value=FakeResponse(content))
+        response = self.cache_response.process_cache_response(self.view, view_method, self.request, (), {})
+        return response.content, view_method.called
+
+    def lock(self):
+        """ Simulates another worker rebuilding the current version of the response. """
+        cache.add('api_lock.response.{}'.format(self.version), True)
+
+    def test_rebuild(self):
+        """ Verify responses are cached until their version changes. """
+        self.assertEqual(self.get('first'), ('first', True))
+        self.assertEqual(self.get('second'), ('first', False))
+
+        self.version = 2
+        self.assertEqual(self.get('second'), ('second', True))
+        self.assertFalse(cache.get('api_lock.response.2'))
+
+    def test_stale_while_rebuilding(self):
+        """ Verify the previous version of a response is served while another worker rebuilds it. """
+        self.get('first')
+        self.version = 2
+        self.lock()
+
+        self.assertEqual(self.get('second'), ('first', False))
+
+    @override_settings(API_CACHE_WAIT_TIMEOUT=0)
+    def test_stale_timeout(self):
+        """ Verify the previous version of a response is not served once it has been stale for too long. """
+        self.get('first')
+        self.version = 2
+        self.lock()
+        cache.set('api_stale_since.response.2', time.time() - 301)
+
+        with override_settings(API_CACHE_STALE_TIMEOUT=300):
+            self.assertEqual(self.get('second'), ('second', True))
+
+        # The lock of the other worker is left alone.
+        self.assertTrue(cache.get('api_lock.response.2'))
+
+    @override_settings(API_CACHE_STALE_TIMEOUT=300, API_CACHE_LOCK_TIMEOUT=60)
+    def test_stale_since_expires(self):
+        """ Verify the time since which a response is stale expires, even if the response is never rebuilt. """
+        self.get('first')
+        self.version = 2
+        self.lock()
+
+        with mock.patch.object(self.cache_response.cache, 'add', wraps=self.cache_response.cache.add) as mock_add:
+            self.get('second')
+
+        mock_add.assert_any_call('api_stale_since.response.2', mock.ANY, 360)
+
+    def test_wait_for_response(self):
+        """ Verify workers without a previous version to serve wait for the response to be rebuilt. """
+        self.lock()
+
+        def rebuild(seconds):  # pylint: disable=unused-argument
+            cache.set('response.1', FakeResponse('rebuilt'))
+
+        with mock.patch('time.sleep', side_effect=rebuild):
+            self.assertEqual(self.get('second'), ('rebuilt', False))
@@ -0,0 +1,153 @@
+import time
+
+import mock
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.reverse import reverse
+
+from course_discovery.apps.api.cache import set_api_timestamp
+from course_discovery.apps.api.documents import (
+    defer_document_bumps, get_document_version_key, get_document_version_keys
+)
+from course_discovery.apps.api.serializers import MinimalProgramSerializer, ProgramSerializer
+from course_discovery.apps.api.v1.tests.test_views.mixins import APITestCase
+from course_discovery.apps.core.tests.factories import UserFactory
+from course_discovery.apps.course_metadata.models import Course, Program
+from course_discovery.apps.course_metadata.tests.factories import (
+    CourseFactory, CourseRunFactory, OrganizationFactory, ProgramFactory, SeatFactory
+)
+
+
+class DocumentVersionTests(TestCase):
+    def setUp(self):
+        super(DocumentVersionTests, self).setUp()
+        cache.clear()
+        self.course = CourseFactory()
+        self.program = ProgramFactory(courses=[self.course])
+
+    def get_expected_keys(self, programs, courses):
+        keys = {get_document_version_key(Program, program.uuid) for program in programs}
+        for course in courses:
+            keys |= {get_document_version_key(Course, course.key), get_document_version_key(Course, course.uuid)}
+
+        return keys
+
+    def test_get_document_version_keys(self):
+        """ Verify changes invalidate the documents of the programs and courses the changed object is part of. """
+        seat = SeatFactory(course_run=CourseRunFactory(course=self.course))
+        expected = self.get_expected_keys([self.program], [self.course])
+
+        self.assertEqual(set(get_document_version_keys(self.program)), expected)
+        self.assertEqual(set(get_document_version_keys(seat)), expected)
+        self.assertEqual(get_document_version_keys(OrganizationFactory()), [])
+
+    def test_get_document_version_keys_queries(self):
+        """ Verify the keys of many instances, e.g. those written in bulk by a data loader, are found at once. """
+        seats = [SeatFactory(course_run=CourseRunFactory(course=course)) for course in [self.course, CourseFactory()]]
+        expected = self.get_expected_keys([self.program], [seat.course_run.course for seat in seats])
+
+        with self.assertNumQueries(3):
+            self.assertEqual(set(get_document_version_keys(*seats)), expected)
+
+    def test_m2m_changed(self):
+        """ Verify courses added to a program invalidate their own documents, as well as those of the program. """
+        course = CourseFactory()
+        keys = self.get_expected_keys([self.program], [self.course, course])
+        versions = cache.get_many(keys)
+
+        with mock.patch('time.time', return_value=max(versions.values(), default=0) + 1):
+            self.program.courses.add(course)
+
+        updated_versions = cache.get_many(keys)
+        self.assertEqual(set(updated_versions), keys)
+        for key, version in versions.items():
+            self.assertNotEqual(updated_versions[key], version)
+
+    def test_defer_document_bumps(self):
+        """ Verify documents invalidated while data loaders run are invalidated at once, when they finish. """
+        course = CourseFactory()
+        seat = SeatFactory(course_run=CourseRunFactory(course=self.course))
+        keys = self.get_expected_keys([self.program], [self.course, course])
+        cache.clear()
+
+        path = 'course_discovery.apps.api.documents.get_document_version_keys'
+        with mock.patch(path, wraps=get_document_version_keys) as mock_get_keys:
+            with defer_document_bumps():
+                seat.save()
+                self.program.courses.add(course)
+
+                self.assertFalse(mock_get_keys.called)
+                self.assertEqual(cache.get_many(keys), {})
+
+            self.assertEqual(mock_get_keys.call_count, 1)
+
+        self.assertEqual(set(cache.get_many(keys)), keys)
+
+
+class ApiDocumentMixinTests(APITestCase):
+    def setUp(self):
+        super(ApiDocumentMixinTests, self).setUp()
+        cache.clear()
+        self.client.force_authenticate(UserFactory(is_staff=True))
+        self.courses = CourseFactory.create_batch(2, partner=self.partner)
+        self.programs = [ProgramFactory(courses=[course], partner=self.partner) for course in self.courses]
+
+    def test_list(self):
+        """ Verify only the documents of the programs a changed course is part of are rebuilt. """
+        url = reverse('api:v1:program-list')
+        self.client.get(url)
+
+        course = self.courses[0]
+        course.title = 'Updated'
+        course.save()
+
+        with mock.patch.object(MinimalProgramSerializer, 'to_representation', autospec=True,
+                               side_effect=MinimalProgramSerializer.to_representation) as mock_to_representation:
+            response = self.client.get(url)
+
+        self.assertEqual(mock_to_representation.call_count, 1)
+        results = {result['uuid']: result for result in response.data['results']}
+        self.assertEqual(results[str(self.programs[0].uuid)]['courses'][0]['title'], 'Updated')
+        self.assertEqual(len(results), 2)
+
+    def test_untracked_change(self):
+        """ Verify changes to untracked models rebuild the documents of their partner. """
+        url = reverse('api:v1:program-list')
+        self.client.get(url)
+        organization = OrganizationFactory(partner=self.partner)
+
+        with mock.patch('time.time', return_value=time.time() + 1):
+            organization.save()
+
+        with mock.patch.object(MinimalProgramSerializer, 'to_representation', autospec=True,
+                               side_effect=MinimalProgramSerializer.to_representation) as mock_to_representation:
+            self.client.get(url)
+
+        self.assertEqual(mock_to_representation.call_count, 2)
+
+    def test_api_timestamp(self):
+        """ Verify documents outlive the API timestamp, which is updated once course metadata is refreshed. """
+        url = reverse('api:v1:program-list')
+        expected = self.client.get(url).data
+        set_api_timestamp(time.time() + 1)
+
+        with mock.patch.object(MinimalProgramSerializer, 'to_representation', autospec=True) as mock_to_representation:
+            response = self.client.get(url)
+
+        self.assertFalse(mock_to_representation.called)
+        self.assertEqual(response.data, expected)
+
+    def test_retrieve(self):
+        """ Verify a program is served from its document, while the programs it is not part of change. """
+        url = reverse('api:v1:program-detail', kwargs={'uuid': self.programs[0].uuid})
+        expected = self.client.get(url).data
+
+        course = self.courses[1]
+        course.title = 'Updated'
+        course.save()
+
+        with mock.patch.object(ProgramSerializer, 'to_representation', autospec=True) as mock_to_representation:
+            response = self.client.get(url)
+
+        self.assertFalse(mock_to_representation.called)
+        self.assertEqual(response.data, expected)
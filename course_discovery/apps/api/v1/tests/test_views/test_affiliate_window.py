@@ -4,12 +4,15 @@ import xml.etree.ElementTree as ET
 from os.path import abspath, dirname, join
 
 import ddt
+import mock
 import pytz
+from django.core.cache import cache
 from lxml import etree
 from rest_framework.reverse import reverse
 
 from course_discovery.apps.api.serializers import AffiliateWindowSerializer
 from course_discovery.apps.api.v1.tests.test_views.mixins import APITestCase, SerializationMixin
+from course_discovery.apps.catalogs.models import Catalog
 from course_discovery.apps.catalogs.tests.factories import CatalogFactory
 from course_discovery.apps.core.tests.factories import UserFactory
 from course_discovery.apps.core.tests.mixins import ElasticsearchTestMixin
@@ -36,6 +39,7 @@ class AffiliateWindowViewSetTests(ElasticsearchTestMixin, SerializationMixin, AP
         self.course = self.course_run.course
         self.affiliate_url = reverse('api:v1:partners:affiliate_window-detail', kwargs={'pk': self.catalog.id})
         self.refresh_index()
+        cache.clear()
 
     def test_without_authentication(self):
         """ Verify authentication is required when accessing the endpoint. """
@@ -137,11 +141,30 @@ class AffiliateWindowViewSetTests(ElasticsearchTestMixin, SerializationMixin, AP
         response = self.client.get(url)
         self.assertEqual(response.status_code, 403)
 
+        # Measure the queries of an uncached response.
+        cache.clear()
         catalog.viewers = [self.user]
         with self.assertNumQueries(8):
             response = self.client.get(url)
             self.assertEqual(response.status_code, 200)
 
+    def test_cached(self):
+        """ Verify responses are cached until the catalog's contents change, and permissions are still checked. """
+        with mock.patch.object(Catalog, 'courses', autospec=True, side_effect=Catalog.courses) as mock_courses:
+            response = self.client.get(self.affiliate_url)
+            self.assertEqual(self.client.get(self.affiliate_url).content, response.content)
+            self.assertEqual(mock_courses.call_count, 1)
+
+            self.client.force_authenticate(UserFactory())
+            response = self.client.get(self.affiliate_url)
+            self.assertEqual(response.status_code, 403)
+
+            self.client.force_authenticate(self.user)
+            SeatFactory(course_run=self.course_run, type=Seat.PROFESSIONAL)
+            response = self.client.get(self.affiliate_url)
+            self.assertEqual(mock_courses.call_count, 2)
+            self.assertEqual(2, len(ET.fromstring(response.content).findall('product')))
+
     def test_unpublished_status(self):
         """ Verify the endpoint does not return CourseRuns in a non-published state. """
         self.course_run.status = CourseRunStatus.Unpublished
@@ -5,6 +5,7 @@ import urllib
 from io import StringIO
 
 import ddt
+import mock
 import pytest
 import pytz
 import responses
@@ -199,6 +200,21 @@ class CatalogViewSetTests(ElasticsearchTestMixin, SerializationMixin, OAuth2Mixi
             assert response.status_code == 200
             assert response.data['results'] == []
 
+    def test_courses_cached(self):
+        """ Verify responses are cached until the catalog changes. """
+        url = reverse('api:v1:catalog-courses', kwargs={'id': self.catalog.id})
+
+        with mock.patch.object(Catalog, 'courses', autospec=True, side_effect=Catalog.courses) as mock_courses:
+            self.client.get(url)
+            self.client.get(url)
+            assert mock_courses.call_count == 1
+
+            self.catalog.query = 'title:xyz*'
+            self.catalog.save()
+            response = self.client.get(url)
+            assert mock_courses.call_count == 2
+            assert response.data['results'] == []
+
     def test_contains_for_course_key(self):
         """
         Verify the endpoint returns a filtered list of courses contained in
@@ -3,8 +3,11 @@ import datetime
 import urllib
 
 import ddt
+import mock
 import pytz
+from django.core.cache import cache
 from django.db.models.functions import Lower
+from rest_framework.mixins import RetrieveModelMixin
 from rest_framework.reverse import reverse
 from rest_framework.test import APIRequestFactory
 
@@ -27,6 +30,7 @@ class CourseRunViewSetTests(SerializationMixin, ElasticsearchTestMixin, APITestC
         self.refresh_index()
         self.request = APIRequestFactory().get('/')
         self.request.user = self.user
+        cache.clear()
 
     def test_get(self):
         """ Verify the endpoint returns the details for a single course. """
@@ -113,6 +117,23 @@ class CourseRunViewSetTests(SerializationMixin, ElasticsearchTestMixin, APITestC
         assert self.course_run.max_effort == expected_max_effort
         assert self.course_run.min_effort == expected_min_effort
 
+    def test_get_cached(self):
+        """ Verify responses are cached until the course run changes. """
+        url = reverse('api:v1:course_run-detail', kwargs={'key': self.course_run.key})
+
+        with mock.patch.object(RetrieveModelMixin, 'retrieve', autospec=True,
+                               side_effect=RetrieveModelMixin.retrieve) as mock_retrieve:
+            self.client.get(url)
+            self.client.get(url)
+            assert mock_retrieve.call_count == 1
+
+            response = self.client.patch(url, {'min_effort': 3}, format='json')
+            assert response.status_code == 200
+
+            response = self.client.get(url)
+            assert mock_retrieve.call_count == 2
+            assert response.data['min_effort'] == 3
+
     def test_partial_update_bad_permission(self):
         """ Verify partially updating will fail if user doesn't have permission. """
         user = UserFactory(is_staff=False, is_superuser=False)
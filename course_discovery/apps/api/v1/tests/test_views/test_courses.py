@@ -1,11 +1,13 @@
 import datetime
 
 import ddt
+import mock
 import pytz
 from django.core.cache import cache
 from django.db.models.functions import Lower
 from rest_framework.reverse import reverse
 
+from course_discovery.apps.api.documents import ApiDocumentMixin
 from course_discovery.apps.api.v1.tests.test_views.mixins import APITestCase, SerializationMixin
 from course_discovery.apps.core.tests.factories import USER_PASSWORD, UserFactory
 from course_discovery.apps.course_metadata.choices import CourseRunStatus, ProgramStatus
@@ -198,7 +200,7 @@ class CourseViewSetTests(SerializationMixin, APITestCase):
         """ Verify the endpoint returns a list of all courses. """
         url = reverse('api:v1:course-list')
 
-        with self.assertNumQueries(29):
+        with self.assertNumQueries(30):
             response = self.client.get(url)
             self.assertEqual(response.status_code, 200)
             self.assertListEqual(
@@ -206,6 +208,32 @@ class CourseViewSetTests(SerializationMixin, APITestCase):
                 self.serialize_course(Course.objects.all().order_by(Lower('key')), many=True)
             )
 
+    def test_list_cached(self):
+        """ Verify responses are cached per user, until a course of the partner changes. """
+        url = reverse('api:v1:course-list')
+        other_user = UserFactory()
+
+        with mock.patch.object(ApiDocumentMixin, 'list', autospec=True, side_effect=ApiDocumentMixin.list) as mock_list:
+            self.client.get(url)
+            self.client.get(url)
+            self.assertEqual(mock_list.call_count, 1)
+
+            # Marketing URLs include UTM parameters specific to the user, unless they are excluded.
+            self.client.login(username=other_user.username, password=USER_PASSWORD)
+            self.client.get(url)
+            self.assertEqual(mock_list.call_count, 2)
+
+            self.client.get(url + '?exclude_utm=1')
+            self.client.login(username=self.user.username, password=USER_PASSWORD)
+            self.client.get(url + '?exclude_utm=1')
+            self.assertEqual(mock_list.call_count, 3)
+
+            self.course.title = 'Updated'
+            self.course.save()
+            response = self.client.get(url)
+            self.assertEqual(mock_list.call_count, 4)
+            self.assertEqual(response.data['results'][0]['title'], 'Updated')
+
     def test_list_query(self):
         """ Verify the endpoint returns a filtered list of courses """
         title = 'Some random title'
@@ -225,7 +253,7 @@ class CourseViewSetTests(SerializationMixin, APITestCase):
         keys = ','.join([course.key for course in courses])
         url = '{root}?keys={keys}'.format(root=reverse('api:v1:course-list'), keys=keys)
 
-        with self.assertNumQueries(46):
+        with self.assertNumQueries(47):
             response = self.client.get(url)
             self.assertListEqual(response.data['results'], self.serialize_course(courses, many=True))
 
@@ -236,7 +264,7 @@ class CourseViewSetTests(SerializationMixin, APITestCase):
         uuids = ','.join([str(course.uuid) for course in courses])
         url = '{root}?uuids={uuids}'.format(root=reverse('api:v1:course-list'), uuids=uuids)
 
-        with self.assertNumQueries(46):
+        with self.assertNumQueries(47):
             response = self.client.get(url)
             self.assertListEqual(response.data['results'], self.serialize_course(courses, many=True))
 
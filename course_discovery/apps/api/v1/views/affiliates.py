@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from course_discovery.apps.api import serializers
+from course_discovery.apps.api.cache import api_cache_response, get_api_models, timestamped_route_key_constructor
 from course_discovery.apps.api.pagination import ProxiedPagination
 from course_discovery.apps.api.renderers import AffiliateWindowXMLRenderer
 from course_discovery.apps.catalogs.models import Catalog
@@ -21,6 +22,14 @@ class AffiliateWindowViewSet(viewsets.ViewSet):
     # versions of this API should only support the system default, PageNumberPagination.
     pagination_class = ProxiedPagination
 
+    # Catalogs contain courses of every partner, selected by their query, which is run against the search index.
+    cache_across_partners = True
+    cache_search_index = True
+
+    @property
+    def cache_dependencies(self):
+        return list(get_api_models()) + [Catalog]
+
     def retrieve(self, request, pk=None):  # pylint: disable=redefined-builtin,unused-argument
         """
         Return verified and professional seats of courses against provided catalog id.
@@ -34,7 +43,14 @@ class AffiliateWindowViewSet(viewsets.ViewSet):
         if not catalog.has_object_read_permission(request):
             raise PermissionDenied
 
-        courses = catalog.courses()
+        # Permissions are checked before the cache is used, since viewers of a catalog may change without
+        # invalidating its cached responses.
+        self.catalog = catalog
+        return self.list_seats(request, pk=pk)
+
+    @api_cache_response(key_func=timestamped_route_key_constructor)
+    def list_seats(self, request, pk=None):  # pylint: disable=unused-argument
+        courses = self.catalog.courses()
         course_runs = CourseRun.objects.filter(course__in=courses).active().marketable()
         seats = Seat.objects.filter(type__in=[Seat.VERIFIED, Seat.PROFESSIONAL]).filter(course_run__in=course_runs)
         seats = seats.select_related(
@@ -8,6 +8,7 @@ from rest_framework.decorators import detail_route
 from rest_framework.response import Response
 
 from course_discovery.apps.api import filters, serializers
+from course_discovery.apps.api.cache import api_cache_response, get_api_models, user_timestamped_route_key_constructor
 from course_discovery.apps.api.pagination import ProxiedPagination
 from course_discovery.apps.api.renderers import CourseRunCSVRenderer
 from course_discovery.apps.api.v1.views import User
@@ -29,6 +30,14 @@ class CatalogViewSet(viewsets.ModelViewSet):
     # versions of this API should only support the system default, PageNumberPagination.
     pagination_class = ProxiedPagination
 
+    # Catalogs contain courses of every partner, selected by their query, which is run against the search index.
+    cache_across_partners = True
+    cache_search_index = True
+
+    @property
+    def cache_dependencies(self):
+        return list(get_api_models()) + [Catalog]
+
     @transaction.atomic
     def create(self, request, *args, **kwargs):
         """ Create a new catalog. """
@@ -89,8 +98,14 @@ class CatalogViewSet(viewsets.ModelViewSet):
         ---
         serializer: serializers.CatalogCourseSerializer
         """
-        catalog = self.get_object()
-        queryset = catalog.courses().available()
+        # Permissions are checked before the cache is used, since viewers of a catalog may change without
+        # invalidating its cached responses.
+        self.catalog = self.get_object()
+        return self.list_courses(request, id=id)
+
+    @api_cache_response(key_func=user_timestamped_route_key_constructor)
+    def list_courses(self, request, id=None):  # pylint: disable=redefined-builtin,unused-argument
+        queryset = self.catalog.courses().available()
         course_runs = CourseRun.objects.active().enrollable().marketable()
 
         queryset = serializers.CatalogCourseSerializer.prefetch_queryset(
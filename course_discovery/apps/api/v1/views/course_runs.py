@@ -1,4 +1,3 @@
-from django.db.models.functions import Lower
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import list_route
@@ -7,6 +6,7 @@ from rest_framework.permissions import DjangoModelPermissions, IsAuthenticated
 from rest_framework.response import Response
 
 from course_discovery.apps.api import filters, serializers
+from course_discovery.apps.api.cache import ApiCacheResponseMixin
 from course_discovery.apps.api.pagination import ProxiedPagination
 from course_discovery.apps.api.utils import get_query_param
 from course_discovery.apps.core.utils import SearchQuerySetWrapper
@@ -15,7 +15,7 @@ from course_discovery.apps.course_metadata.models import CourseRun
 
 
 # pylint: disable=no-member
-class CourseRunViewSet(viewsets.ModelViewSet):
+class CourseRunViewSet(ApiCacheResponseMixin, viewsets.ModelViewSet):
     """ CourseRun resource. """
     filter_backends = (DjangoFilterBackend, OrderingFilter)
     filter_class = filters.CourseRunFilter
@@ -23,7 +23,7 @@ class CourseRunViewSet(viewsets.ModelViewSet):
     lookup_value_regex = COURSE_RUN_ID_REGEX
     ordering_fields = ('start',)
     permission_classes = (IsAuthenticated, DjangoModelPermissions)
-    queryset = CourseRun.objects.all().order_by(Lower('key'))
+    queryset = CourseRun.objects.all().order_by('lowercase_key')
     serializer_class = serializers.CourseRunWithProgramsSerializer
 
     # Explicitly support PageNumberPagination and LimitOffsetPagination. Future
@@ -1,12 +1,13 @@
 import re
 
-from django.db.models.functions import Lower
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 
 from course_discovery.apps.api import filters, serializers
+from course_discovery.apps.api.cache import ApiCacheResponseMixin
+from course_discovery.apps.api.documents import ApiDocumentMixin
 from course_discovery.apps.api.pagination import ProxiedPagination
 from course_discovery.apps.api.utils import get_query_param
 from course_discovery.apps.course_metadata.choices import CourseRunStatus
@@ -15,7 +16,7 @@ from course_discovery.apps.course_metadata.models import Course, CourseRun
 
 
 # pylint: disable=no-member
-class CourseViewSet(viewsets.ReadOnlyModelViewSet):
+class CourseViewSet(ApiCacheResponseMixin, ApiDocumentMixin, viewsets.ReadOnlyModelViewSet):
     """ Course resource. """
     filter_backends = (DjangoFilterBackend,)
     filter_class = filters.CourseFilter
@@ -77,7 +78,16 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
                 partner=partner
             )
 
-        return queryset.order_by(Lower('key'))
+        return queryset.order_by('lowercase_key')
+
+    def get_document_queryset(self):
+        return Course.objects.filter(partner=self.request.site.partner).order_by('lowercase_key')
+
+    def get_document_identifier(self, lookup_value):
+        if self.course_key_regex.match(lookup_value):
+            return lookup_value
+
+        return super().get_document_identifier(lookup_value)
 
     def get_serializer_context(self, *args, **kwargs):
         context = super().get_serializer_context(*args, **kwargs)
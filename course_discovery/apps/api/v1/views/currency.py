@@ -7,6 +7,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_extensions.cache.decorators import cache_response
 
+from course_discovery.apps.core.http import get_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,7 +24,7 @@ class CurrencyView(views.APIView):
             return {}
 
         try:
-            response = requests.get(self.EXTERNAL_API_URL, params={'app_id': app_id}, timeout=2)
+            response = get_session().get(self.EXTERNAL_API_URL, params={'app_id': app_id}, timeout=2)
 
             if response.status_code == requests.codes.ok:  # pylint: disable=no-member
                 response_json = response.json()
@@ -2,16 +2,17 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_extensions.cache.mixins import CacheResponseMixin
 
 from course_discovery.apps.api import filters, serializers
+from course_discovery.apps.api.cache import ApiCacheResponseMixin
+from course_discovery.apps.api.documents import ApiDocumentMixin
 from course_discovery.apps.api.pagination import ProxiedPagination
 from course_discovery.apps.api.utils import get_query_param
 from course_discovery.apps.course_metadata.models import Program
 
 
 # pylint: disable=no-member
-class ProgramViewSet(CacheResponseMixin, viewsets.ReadOnlyModelViewSet):
+class ProgramViewSet(ApiCacheResponseMixin, ApiDocumentMixin, viewsets.ReadOnlyModelViewSet):
     """ Program resource. """
     lookup_field = 'uuid'
     lookup_value_regex = '[0-9a-f-]+'
@@ -35,6 +36,9 @@ class ProgramViewSet(CacheResponseMixin, viewsets.ReadOnlyModelViewSet):
         partner = self.request.site.partner
         return self.get_serializer_class().prefetch_queryset(partner)
 
+    def get_document_queryset(self):
+        return Program.objects.filter(partner=self.request.site.partner)
+
     def get_serializer_context(self, *args, **kwargs):
         context = super().get_serializer_context(*args, **kwargs)
         query_params = ['exclude_utm', 'use_full_course_serializer', 'published_course_runs_only',
@@ -0,0 +1 @@
+default_app_config = 'course_discovery.apps.catalogs.apps.CatalogsConfig'
@@ -0,0 +1,8 @@
+from django.db.models.signals import post_delete, post_save
+
+from course_discovery.apps.api.cache import api_change_receiver
+from course_discovery.apps.catalogs.models import Catalog
+
+# Invalidate cached API responses listing the contents of catalogs when a catalog's query changes.
+for signal in (post_save, post_delete):
+    signal.connect(api_change_receiver, sender=Catalog)
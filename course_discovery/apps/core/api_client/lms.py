@@ -9,6 +9,7 @@ from edx_rest_api_client.exceptions import SlumberBaseException
 from requests.exceptions import ConnectionError, Timeout  # pylint: disable=redefined-builtin
 
 from course_discovery.apps.api.utils import get_cache_key
+from course_discovery.apps.core.http import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +24,7 @@ class LMSAPIClient(object):
     """
 
     def __init__(self, site):
-        self.client = EdxRestApiClient(site.partner.lms_url, jwt=site.partner.access_token)
+        self.client = EdxRestApiClient(site.partner.lms_url, session=get_session(), jwt=site.partner.access_token)
 
     def get_api_access_request(self, user):
         """
@@ -0,0 +1,116 @@
+"""
+Shared HTTP sessions for calls to upstream services.
+
+Every session returned by get_session() uses the same transport adapter, so connections to a host are pooled, kept
+alive and reused by all of the clients in the process, rather than each client opening (and negotiating TLS for) its
+own connections.
+"""
+import contextlib
+import os
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry  # pylint: disable=import-error
+
+_adapters = {}
+_lock = threading.Lock()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """ Transport adapter which applies a default timeout, and retries failed connections with a backoff.
+
+    Only connection errors and read timeouts of idempotent requests are retried. Throttled responses (429 and 503) are
+    left to the caller, since the data loaders already retry them through their rate limiter.
+
+    The adapter is shared by many sessions, so closing one of them does not close the pooled connections.
+    """
+
+    def __init__(self, timeout=None, max_retries=0, backoff_factor=0, **kwargs):
+        self.timeout = timeout
+        retries = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            redirect=False,
+            backoff_factor=backoff_factor,
+        )
+        super(PooledHTTPAdapter, self).__init__(max_retries=retries, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):  # pylint: disable=arguments-differ
+        return super(PooledHTTPAdapter, self).send(request, timeout=timeout or self.timeout, **kwargs)
+
+    def close(self):
+        pass
+
+
+def get_http_adapter():
+    """
+    Returns the transport adapter shared by all sessions in this process.
+
+    Connection pools cannot be shared across processes, so a forked process (e.g. a data loader run in a process pool)
+    gets its own adapter the first time it calls this function.
+
+    Returns:
+        PooledHTTPAdapter
+    """
+    pid = os.getpid()
+
+    with _lock:
+        adapter = _adapters.get(pid)
+
+        if adapter is None:
+            # Drop any adapter inherited from the parent process.
+            _adapters.clear()
+            adapter = _adapters[pid] = PooledHTTPAdapter(
+                timeout=settings.HTTP_CLIENT_TIMEOUT,
+                max_retries=settings.HTTP_CLIENT_MAX_RETRIES,
+                backoff_factor=settings.HTTP_CLIENT_BACKOFF_FACTOR,
+                pool_connections=settings.HTTP_CLIENT_POOL_SIZE,
+                pool_maxsize=settings.HTTP_CLIENT_POOL_SIZE,
+            )
+
+    return adapter
+
+
+@contextlib.contextmanager
+def override_http_adapter(adapter):
+    """
+    Routes the requests of sessions created by get_session() in this process through the given adapter, e.g. to
+    record or replay upstream responses. Sessions created before entering the context keep their adapter.
+
+    Args:
+        adapter (requests.adapters.BaseAdapter): Adapter used in place of the shared adapter.
+    """
+    pid = os.getpid()
+
+    with _lock:
+        previous = _adapters.get(pid)
+        _adapters[pid] = adapter
+
+    try:
+        yield adapter
+    finally:
+        with _lock:
+            if previous is None:
+                _adapters.pop(pid, None)
+            else:
+                _adapters[pid] = previous
+
+
+def get_session():
+    """
+    Returns a new session which reuses the pooled connections of the shared transport adapter.
+
+    Sessions are cheap, and each client should use its own, since clients set their own authentication and headers on
+    the session.
+
+    Returns:
+        requests.Session
+    """
+    session = requests.Session()
+    adapter = get_http_adapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
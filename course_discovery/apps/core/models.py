@@ -11,6 +11,8 @@ from django_extensions.db.models import TimeStampedModel
 from edx_rest_api_client.client import EdxRestApiClient
 from guardian.mixins import GuardianUserMixin
 
+from course_discovery.apps.core.http import get_session
+
 
 class User(GuardianUserMixin, AbstractUser):
     """Custom user model for use with OpenID Connect."""
@@ -124,4 +126,4 @@ class Partner(TimeStampedModel):
     @cached_property
     def studio_api_client(self):
         studio_api_url = '{root}/api/v1/'.format(root=self.studio_url.strip('/'))
-        return EdxRestApiClient(studio_api_url, jwt=self.access_token)
+        return EdxRestApiClient(studio_api_url, session=get_session(), jwt=self.access_token)
@@ -0,0 +1,68 @@
+import mock
+import responses
+from django.test import TestCase, override_settings
+from requests.adapters import HTTPAdapter
+
+from course_discovery.apps.core import http
+from course_discovery.apps.core.http import PooledHTTPAdapter, get_http_adapter, get_session
+
+
+@override_settings(HTTP_CLIENT_POOL_SIZE=7, HTTP_CLIENT_MAX_RETRIES=2, HTTP_CLIENT_TIMEOUT=(1, 2))
+class HttpTests(TestCase):
+    def setUp(self):
+        super(HttpTests, self).setUp()
+        http._adapters.clear()  # pylint: disable=protected-access
+        self.addCleanup(http._adapters.clear)  # pylint: disable=protected-access
+
+    def test_get_http_adapter(self):
+        """ Verify the adapter is configured from settings, and shared within a process. """
+        adapter = get_http_adapter()
+
+        self.assertIsInstance(adapter, PooledHTTPAdapter)
+        self.assertEqual(adapter.timeout, (1, 2))
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertEqual(adapter._pool_maxsize, 7)  # pylint: disable=protected-access
+        self.assertIs(get_http_adapter(), adapter)
+
+    def test_get_http_adapter_forked(self):
+        """ Verify a new adapter is created when called from another process. """
+        adapter = get_http_adapter()
+
+        with mock.patch('os.getpid', return_value=-1):
+            self.assertIsNot(get_http_adapter(), adapter)
+
+    def test_get_session(self):
+        """ Verify each session is new, but shares the pooled adapter. """
+        session = get_session()
+        other_session = get_session()
+
+        self.assertIsNot(session, other_session)
+        for url in ('http://example.com', 'https://example.com'):
+            self.assertIs(session.get_adapter(url), get_http_adapter())
+            self.assertIs(other_session.get_adapter(url), get_http_adapter())
+
+        # Closing a session must not close the connections used by the other sessions.
+        with mock.patch.object(HTTPAdapter, 'close') as mock_close:
+            session.close()
+            self.assertFalse(mock_close.called)
+
+    def test_default_timeout(self):
+        """ Verify the default timeout is applied to requests which do not set their own. """
+        adapter = get_http_adapter()
+        request = mock.Mock()
+
+        with mock.patch.object(HTTPAdapter, 'send') as mock_send:
+            adapter.send(request, timeout=None)
+            mock_send.assert_called_with(request, timeout=(1, 2))
+
+            adapter.send(request, timeout=10)
+            mock_send.assert_called_with(request, timeout=10)
+
+    @responses.activate
+    def test_request(self):
+        url = 'https://example.com/'
+        responses.add(responses.GET, url, body='ok')
+
+        response = get_session().get(url)
+
+        self.assertEqual(response.text, 'ok')
@@ -278,6 +278,13 @@ class NamedModelAdmin(admin.ModelAdmin):
     search_fields = ('name',)
 
 
+@admin.register(DataLoaderRun)
+class DataLoaderRunAdmin(admin.ModelAdmin):
+    list_display = ('loader', 'partner', 'succeeded', 'duration', 'created',)
+    list_filter = ('partner', 'loader', 'succeeded',)
+    readonly_fields = ('partner', 'loader', 'succeeded', 'duration', 'metrics',)
+
+
 # Register children of AbstractNamedModel
 for model in (LevelType, Prerequisite,):
     admin.site.register(model, NamedModelAdmin)
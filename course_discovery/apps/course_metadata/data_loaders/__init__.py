@@ -1,15 +1,34 @@
 import abc
-import re
-
-import html2text
-import markdown
+import concurrent.futures
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import math
+
+import pytz
 from dateutil.parser import parse
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import IntegrityError, models, transaction
 from django.utils.functional import cached_property
 from edx_rest_api_client.client import EdxRestApiClient
 from opaque_keys.edx.keys import CourseKey
 
+from course_discovery.apps.core.http import get_http_adapter, get_session
 from course_discovery.apps.core.utils import delete_orphans
-from course_discovery.apps.course_metadata.models import Image, Video
+from course_discovery.apps.course_metadata.data_loaders import html_cleaning
+from course_discovery.apps.course_metadata.data_loaders.benchmark import QueryCounter
+from course_discovery.apps.course_metadata.data_loaders.metrics import LoaderMetrics
+from course_discovery.apps.course_metadata.data_loaders.prefetch import prefetch
+from course_discovery.apps.course_metadata.data_loaders.rate_limiter import RateLimitedAdapter, get_rate_limiter
+from course_discovery.apps.course_metadata.data_loaders.reference_data import ReferenceDataCache
+from course_discovery.apps.course_metadata.data_loaders.transactions import TransactionBatch
+from course_discovery.apps.course_metadata.models import (
+    DataLoaderCheckpoint, DataLoaderConfig, DataLoaderFingerprint, Image, Video
+)
+
+logger = logging.getLogger(__name__)
 
 
 class AbstractDataLoader(metaclass=abc.ABCMeta):
@@ -20,10 +39,18 @@ class AbstractDataLoader(metaclass=abc.ABCMeta):
         partner (Partner): Partner which owns the data for this data loader
         access_token (str): OAuth2 access token
         PAGE_SIZE (int): Number of items to load per API call
+        SINCE_QUERY_PARAM (str): Query parameter used to ask the upstream API for records changed after a given
+            time. None if the upstream API does not support such filtering. APIs which ignore the parameter return
+            every record, and those whose payload has not changed are still skipped by their fingerprint.
+        DEPENDENCIES (tuple): Names of the data loader classes which must finish before this loader runs.
+        PREFETCH_WINDOW (int): Number of page requests kept in flight when max_workers is not set.
     """
 
     PAGE_SIZE = 50
-    MARKDOWN_CLEANUP_REGEX = re.compile(r'^<p>(.*)</p>$')
+    SINCE_QUERY_PARAM = None
+    DEPENDENCIES = ()
+    PREFETCH_WINDOW = 5
+    FINGERPRINT_BATCH_SIZE = 500
 
     def __init__(self, partner, api_url, access_token=None, token_type=None, max_workers=None,
                  is_threadsafe=False, **kwargs):
@@ -35,6 +62,10 @@ class AbstractDataLoader(metaclass=abc.ABCMeta):
             token_type (str): The type of access token passed in (e.g. Bearer, JWT)
             max_workers (int): Number of worker threads to use when traversing paginated responses.
             is_threadsafe (bool): True if multiple threads can be used to write data.
+            username (str): Username of the service user making requests.
+            incremental (bool): True if records whose upstream data has not changed since the last run should be
+                skipped.
+            since (datetime): Only load records changed after this time. Implies incremental.
         """
         if token_type:
             token_type = token_type.lower()
@@ -47,6 +78,18 @@ class AbstractDataLoader(metaclass=abc.ABCMeta):
         self.max_workers = max_workers
         self.is_threadsafe = is_threadsafe
         self.username = kwargs.get('username')
+        self.since = kwargs.get('since')
+        self.incremental = bool(kwargs.get('incremental') or self.since)
+
+        self.started = datetime.datetime.now(pytz.UTC)
+        self.changed_fingerprints = {}
+
+        # Counts of pages fetched, and of records created, updated, left unchanged, skipped without being processed,
+        # or which failed to load, along with request latencies and the time spent in expensive steps.
+        self.metrics = LoaderMetrics()
+        self.stats = self.metrics.counters
+
+        self.reference_data = ReferenceDataCache(partner)
 
     @cached_property
     def api_client(self):
@@ -63,7 +106,343 @@ class AbstractDataLoader(metaclass=abc.ABCMeta):
         else:
             kwargs['oauth_access_token'] = self.access_token
 
-        return EdxRestApiClient(self.api_url, **kwargs)
+        session = self.mount_rate_limiter(get_session())
+
+        return EdxRestApiClient(self.api_url, session=session, **kwargs)
+
+    @cached_property
+    def config(self):
+        """ Returns the DataLoaderConfig in effect when this loader was created. """
+        return DataLoaderConfig.get_solo()
+
+    @cached_property
+    def rate_limiter(self):
+        """
+        Returns the rate limiter shared by all loaders which call the same upstream host.
+
+        Returns:
+            RateLimiter
+        """
+        return get_rate_limiter(self.api_url, self.config)
+
+    @cached_property
+    def http_session(self):
+        """
+        Returns an unauthenticated session for downloading assets (e.g. images) referenced by the API.
+
+        Returns:
+            requests.Session
+        """
+        return get_session()
+
+    def mount_rate_limiter(self, session):
+        """
+        Routes all requests made by the given session through this loader's rate limiter, and records each response
+        in the loader's metrics.
+
+        Args:
+            session (requests.Session): Session used to call the upstream API.
+
+        Returns:
+            requests.Session
+        """
+        adapter = RateLimitedAdapter(
+            self.rate_limiter, adapter=get_http_adapter(), max_retries=self.config.rate_limit_max_retries
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.hooks['response'].append(self._record_response)
+        return session
+
+    def _record_response(self, response, **kwargs):  # pylint: disable=unused-argument
+        # The elapsed time includes time spent waiting for the rate limiter, and retrying throttled requests.
+        self.increment_stat('pages_fetched')
+        self.metrics.record_latency(response.elapsed.total_seconds())
+
+    @property
+    def loader_name(self):
+        return self.__class__.__name__
+
+    @cached_property
+    def checkpoint(self):
+        """ Returns the checkpoint recorded by the last successful run of this loader for the partner. """
+        checkpoint, __ = DataLoaderCheckpoint.objects.get_or_create(partner=self.partner, loader=self.loader_name)
+        return checkpoint
+
+    def get_since(self):
+        """
+        Returns the time after which upstream records must have changed to be loaded.
+
+        Returns:
+            datetime, or None if all records should be loaded.
+        """
+        if self.since:
+            return self.since
+
+        if self.incremental:
+            return self.checkpoint.high_water_mark
+
+        return None
+
+    def get_since_query_kwargs(self):
+        """
+        Returns the query parameters used to ask the upstream API for changed records only.
+
+        Loaders which reconcile deletions against the set of records they have seen must not set SINCE_QUERY_PARAM.
+
+        Returns:
+            dict
+        """
+        since = self.get_since()
+
+        if since and self.SINCE_QUERY_PARAM:
+            return {self.SINCE_QUERY_PARAM: since.isoformat()}
+
+        return {}
+
+    def transaction_batch(self):
+        """
+        Returns a batch in which the records of a page are written, in transactions of up to
+        DataLoaderConfig.transaction_batch_size records, each record in a savepoint of its own. Each thread writing
+        pages must use its own batch.
+
+        Returns:
+            TransactionBatch
+        """
+        # Rows cached while writing a record which is rolled back may no longer exist.
+        return TransactionBatch(self.config.transaction_batch_size, on_rollback=self.reference_data.invalidate)
+
+    @cached_property
+    def fingerprints(self):
+        """ Returns a dict mapping record keys to the fingerprints of the payloads ingested by the last run. """
+        queryset = DataLoaderFingerprint.objects.filter(partner=self.partner, loader=self.loader_name)
+        return dict(queryset.values_list('key', 'fingerprint'))
+
+    @classmethod
+    def get_fingerprint(cls, body):
+        """
+        Returns a hash of the (cleaned) upstream payload for a record.
+
+        Args:
+            body (dict): Upstream payload.
+
+        Returns:
+            str
+        """
+        serialized = json.dumps(body, sort_keys=True, default=str)
+        return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+    def is_unchanged(self, key, fingerprint):
+        """
+        Returns True if the record can be skipped because this is an incremental run, and the record's payload
+        matches the payload ingested by the last run.
+        """
+        unchanged = self.incremental and self.fingerprints.get(key) == fingerprint
+
+        if unchanged:
+            self.increment_stat('skipped')
+
+        return unchanged
+
+    def record_fingerprint(self, key, fingerprint, batch=None):
+        """
+        Records the fingerprint of a successfully ingested record. It is persisted by save_checkpoint().
+
+        Args:
+            batch (TransactionBatch): Batch in which the record was written. The fingerprint is only recorded once
+                the batch's transaction is committed, so it is discarded if the whole batch is rolled back.
+        """
+        if self.fingerprints.get(key) == fingerprint:
+            return
+
+        if batch:
+            batch.on_commit(functools.partial(self.changed_fingerprints.__setitem__, key, fingerprint))
+        else:
+            self.changed_fingerprints[key] = fingerprint
+
+    def save_checkpoint(self):
+        """
+        Persists the fingerprints of the records ingested during this run and, unless any record failed to load, moves
+        the high-water mark to the start of the run. The fingerprints of records which failed are not recorded, and
+        the high-water mark stays before their changes, so the next incremental run loads them again.
+        """
+        changed = list(self.changed_fingerprints.items())
+
+        for start in range(0, len(changed), self.FINGERPRINT_BATCH_SIZE):
+            batch = changed[start:start + self.FINGERPRINT_BATCH_SIZE]
+            DataLoaderFingerprint.objects.filter(
+                partner=self.partner, loader=self.loader_name, key__in=[key for key, __ in batch]
+            ).delete()
+            DataLoaderFingerprint.objects.bulk_create([
+                DataLoaderFingerprint(partner=self.partner, loader=self.loader_name, key=key, fingerprint=fingerprint)
+                for key, fingerprint in batch
+            ])
+
+        self.fingerprints.update(self.changed_fingerprints)
+        self.changed_fingerprints = {}
+
+        if self.stats['failed']:
+            logger.warning(
+                'Not moving the high-water mark of %s for partner [%s], since %d records failed to load.',
+                self.loader_name, self.partner.short_code, self.stats['failed']
+            )
+            return
+
+        self.checkpoint.high_water_mark = self.started
+        self.checkpoint.save()
+
+    def prefetch_pages(self, request, pages):
+        """
+        Requests the given pages, keeping up to max_workers requests in flight, and yields each response as soon as
+        it arrives. The next page is only requested once a response has been taken, so at most max_workers responses
+        are held in memory however many pages there are.
+
+        Args:
+            request (callable): Function which requests a page, given its number.
+            pages (iterable): Numbers of the pages to request.
+
+        Yields:
+            Each response returned by request, in the order the responses arrive.
+        """
+        window = self.max_workers or self.PREFETCH_WINDOW
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=window) as executor:
+            for __, response in prefetch(executor, request, pages, window, ordered=False):
+                yield response
+
+    @classmethod
+    def get_page_count(cls, response):
+        """
+        Returns the number of pages of a paginated response with count, next, and results keys. The page size is
+        taken from the response, since the upstream API may cap the page size requested.
+        """
+        if not response['next'] or not response['results']:
+            return 1
+
+        return math.ceil(response['count'] / len(response['results']))
+
+    def increment_stat(self, name, amount=1):
+        """ Increments one of the counters reported at the end of a run. Safe to call from multiple threads. """
+        self.metrics.increment(name, amount)
+
+    def log_stats(self):
+        logger.info(
+            '%s for partner [%s] created %d, updated %d, and left %d records unchanged. %d records were skipped, '
+            'and %d failed.',
+            self.loader_name, self.partner.short_code, self.stats['created'], self.stats['updated'],
+            self.stats['unchanged'], self.stats['skipped'], self.stats['failed']
+        )
+
+    def run(self):
+        """
+        Loads the data, measuring the time and database queries it takes.
+
+        Only the queries made on the calling thread's database connection are counted. Queries made by worker threads
+        (i.e. when is_threadsafe is set) are not.
+
+        Returns:
+            OrderedDict: Metrics collected while loading the data.
+        """
+        counter = QueryCounter()
+
+        try:
+            with self.metrics.timer('total'), counter:
+                self.ingest()
+        finally:
+            self.increment_stat('db_queries', counter.queries)
+            self.increment_stat('db_rows_written', counter.rows_written)
+
+        return self.metrics.as_dict()
+
+    @classmethod
+    def _has_changed(cls, instance, attr, value):
+        """
+        Returns True if setting the attribute to the given value would change the instance.
+
+        Values are normalized by the model field before comparison (e.g. UUID strings are converted to UUIDs), and
+        foreign keys are compared by primary key to avoid fetching the related object.
+        """
+        try:
+            field = instance._meta.get_field(attr)  # pylint: disable=protected-access
+        except FieldDoesNotExist:
+            # Not a concrete model field (e.g. a translated field which has no value in the current language)
+            return getattr(instance, attr, None) != value
+
+        if field.is_relation:
+            if not (field.concrete and (field.many_to_one or field.one_to_one)):
+                return True
+
+            if isinstance(value, models.Model):
+                value = value.pk
+
+            return getattr(instance, field.attname) != value
+
+        try:
+            value = field.to_python(value)
+        except ValidationError:
+            return True
+
+        return getattr(instance, field.attname) != value
+
+    @classmethod
+    def _get_changed_values(cls, instance, validated_data):
+        """ Returns the subset of the validated data which differs from the instance's current values. """
+        return {attr: value for attr, value in validated_data.items() if cls._has_changed(instance, attr, value)}
+
+    def _update_instance(self, instance, validated_data, **kwargs):
+        """
+        Sets the validated data on the instance, and saves it only if at least one value changed. Skipping
+        no-op saves avoids post_save signal handlers and bumping the modified timestamp, which would otherwise
+        cause the record to be reindexed.
+
+        Args:
+            instance (Model): Instance to update.
+            validated_data (dict): Attribute values to set.
+            **kwargs: Keyword arguments passed to the instance's save() method.
+
+        Returns:
+            bool: True if the instance was saved.
+        """
+        changed = self._get_changed_values(instance, validated_data)
+
+        if not changed:
+            self.increment_stat('unchanged')
+            return False
+
+        for attr, value in changed.items():
+            setattr(instance, attr, value)
+
+        instance.save(**kwargs)
+        self.increment_stat('updated')
+        return True
+
+    def _update_or_create(self, model, defaults, **kwargs):
+        """
+        Equivalent of QuerySet.update_or_create() which skips the save when the existing instance already matches
+        the defaults.
+
+        Returns:
+            tuple: The instance, and a boolean indicating whether it was created.
+        """
+        try:
+            instance = model.objects.get(**kwargs)
+        except model.DoesNotExist:
+            params = {key: value for key, value in kwargs.items() if '__' not in key}
+            params.update(defaults)
+
+            try:
+                with transaction.atomic():
+                    instance = model.objects.create(**params)
+            except IntegrityError:
+                # Another thread created the instance after we looked for it.
+                instance = model.objects.get(**kwargs)
+            else:
+                self.increment_stat('created')
+                self.reference_data.invalidate(model)
+                return instance, True
+
+        self._update_instance(instance, defaults)
+        return instance, False
 
     @abc.abstractmethod
     def ingest(self):  # pragma: no cover
@@ -89,21 +468,10 @@ class AbstractDataLoader(metaclass=abc.ABCMeta):
         """Cleans HTML from a string.
 
         This method converts the HTML to a Markdown string (to remove styles, classes, and other unsupported
-        attributes), and converts the Markdown back to HTML.
+        attributes), and converts the Markdown back to HTML. Cleaned HTML is memoized, so content which has been
+        cleaned before, by this or a previous refresh, is not cleaned again.
         """
-        cleaned = content.replace('&nbsp;', '')
-        html_converter = html2text.HTML2Text()
-        html_converter.wrap_links = False
-        html_converter.body_width = None
-        cleaned = html_converter.handle(cleaned).strip()
-        cleaned = markdown.markdown(cleaned)
-        cleaned = cls.MARKDOWN_CLEANUP_REGEX.sub(r'\1', cleaned)
-
-        # html2text does not handle ampersands properly.
-        # See https://github.com/Alir3z4/html2text/issues/109.
-        cleaned = cleaned.replace('&amp;', '&')
-
-        return cleaned
+        return html_cleaning.clean_html(content)
 
     @classmethod
     def parse_date(cls, date_string):
@@ -1,51 +1,72 @@
 import concurrent.futures
+import datetime
+import functools
 import logging
 import math
-import time
+import operator
+from collections import defaultdict
 from decimal import Decimal
-from io import BytesIO
+from uuid import UUID
 
-import requests
-from django.core.files import File
+import pytz
+from django.db import transaction
+from django.db.models import Q
 from opaque_keys.edx.keys import CourseKey
 
-from course_discovery.apps.core.models import Currency
+from course_discovery.apps.api.documents import bump_documents
 from course_discovery.apps.course_metadata.choices import CourseRunPacing, CourseRunStatus
 from course_discovery.apps.course_metadata.data_loaders import AbstractDataLoader
+from course_discovery.apps.course_metadata.data_loaders.images import ImagePipeline
 from course_discovery.apps.course_metadata.models import (
-    Course, CourseEntitlement, CourseRun, Organization, Program, ProgramType, Seat, SeatType, Video
+    Course, CourseEntitlement, CourseRun, Organization, Program, ProgramType, Seat, Video
 )
+from course_discovery.apps.course_metadata.utils import sync_many_to_many
 
 logger = logging.getLogger(__name__)
 
 
 class OrganizationsApiDataLoader(AbstractDataLoader):
     """ Loads organizations from the Organizations API. """
+    # Schools and sponsors are matched to existing organizations by key, so they must be created first.
+    DEPENDENCIES = ('SchoolMarketingSiteDataLoader', 'SponsorMarketingSiteDataLoader')
 
     def ingest(self):
         api_url = self.partner.organizations_api_url
-        count = None
-        page = 1
 
         logger.info('Refreshing Organizations from %s...', api_url)
 
-        while page:
-            response = self.api_client.organizations().get(page=page, page_size=self.PAGE_SIZE)
-            count = response['count']
-            results = response['results']
-            logger.info('Retrieved %d organizations...', len(results))
+        response = self._make_request(1)
+        count = response['count']
+        self._process_response(response)
 
-            if response['next']:
-                page += 1
-            else:
-                page = None
-            for body in results:
-                body = self.clean_strings(body)
-                self.update_organization(body)
+        for response in self.prefetch_pages(self._make_request, range(2, self.get_page_count(response) + 1)):
+            self._process_response(response)
 
         logger.info('Retrieved %d organizations from %s.', count, api_url)
 
         self.delete_orphans()
+        self.save_checkpoint()
+        self.log_stats()
+
+    def _make_request(self, page):
+        return self.api_client.organizations().get(
+            page=page, page_size=self.PAGE_SIZE, **self.get_since_query_kwargs()
+        )
+
+    def _process_response(self, response):
+        results = response['results']
+        logger.info('Retrieved %d organizations...', len(results))
+
+        with self.transaction_batch() as batch:
+            for body in results:
+                body = self.clean_strings(body)
+                fingerprint = self.get_fingerprint(body)
+                if self.is_unchanged(body['short_name'], fingerprint):
+                    continue
+
+                with batch.record():
+                    self.update_organization(body)
+                self.record_fingerprint(body['short_name'], fingerprint, batch)
 
     def update_organization(self, body):
         key = body['short_name']
@@ -64,12 +85,14 @@ class OrganizationsApiDataLoader(AbstractDataLoader):
                 'logo_image_url': logo,
             })
 
-        Organization.objects.update_or_create(key__iexact=key, partner=self.partner, defaults=defaults)
-        logger.info('Processed organization "%s"', key)
+        self._update_or_create(Organization, defaults, lowercase_key=key.lower(), partner=self.partner)
+        logger.debug('Processed organization "%s"', key)
 
 
 class CoursesApiDataLoader(AbstractDataLoader):
     """ Loads course runs from the Courses API. """
+    DEPENDENCIES = ('CourseMarketingSiteDataLoader', 'OrganizationsApiDataLoader')
+    SINCE_QUERY_PARAM = 'modified_since'
 
     def ingest(self):
         logger.info('Refreshing Courses and CourseRuns from %s...', self.partner.courses_api_url)
@@ -82,30 +105,21 @@ class CoursesApiDataLoader(AbstractDataLoader):
 
         pagerange = range(initial_page + 1, pages + 1)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:  # pragma: no cover
-            if self.is_threadsafe:
+        # NOTE: Requests are throttled by the loader's rate limiter, which backs off when the Courses API
+        # responds with a 429, so pages can be submitted as fast as the executor accepts them.
+        if self.is_threadsafe:  # pragma: no cover
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 for page in pagerange:
-                    # This time.sleep is to make it very likely that this method does not encounter a 429 status
-                    # code by increasing the amount of time between each code. More details at LEARNER-5560
-                    # The current crude estimation is for ~3000 courses with a PAGE_SIZE=50 which means this method
-                    # will take ~30 minutes.
-                    # TODO Ticket to gracefully handle 429 https://openedx.atlassian.net/browse/LEARNER-5565
-                    time.sleep(30)
                     executor.submit(self._load_data, page)
-            else:
-                for future in [executor.submit(self._make_request, page) for page in pagerange]:
-                    # This time.sleep is to make it very likely that this method does not encounter a 429 status
-                    # code by increasing the amount of time between each code. More details at LEARNER-5560
-                    # The current crude estimation is for ~3000 courses with a PAGE_SIZE=50 which means this method
-                    # will take ~30 minutes.
-                    # TODO Ticket to gracefully handle 429 https://openedx.atlassian.net/browse/LEARNER-5565
-                    time.sleep(30)
-                    response = future.result()
-                    self._process_response(response)
+        else:
+            for response in self.prefetch_pages(self._make_request, pagerange):
+                self._process_response(response)
 
         logger.info('Retrieved %d course runs from %s.', count, self.partner.courses_api_url)
 
         self.delete_orphans()
+        self.save_checkpoint()
+        self.log_stats()
 
     def _load_data(self, page):  # pragma: no cover
         """Make a request for the given page and process the response."""
@@ -113,44 +127,55 @@ class CoursesApiDataLoader(AbstractDataLoader):
         self._process_response(response)
 
     def _make_request(self, page):
-        return self.api_client.courses().get(page=page, page_size=self.PAGE_SIZE, username=self.username)
+        return self.api_client.courses().get(
+            page=page, page_size=self.PAGE_SIZE, username=self.username, **self.get_since_query_kwargs()
+        )
 
     def _process_response(self, response):
         results = response['results']
         logger.info('Retrieved %d course runs...', len(results))
 
-        for body in results:
-            course_run_id = body['id']
-
-            try:
-                body = self.clean_strings(body)
-                course_run = self.get_course_run(body)
-                if course_run:
-                    self.update_course_run(course_run, body)
-                    course = getattr(course_run, 'canonical_for_course', False)
-                    if course and not self.partner.has_marketing_site:
-                        # If the partner have marketing site,
-                        # we should only update the course information from the marketing site.
-                        # Therefore, we don't need to do the statements below
-                        course = self.update_course(course, body)
-                        logger.info('Processed course with key [%s].', course.key)
-                else:
-                    course, created = self.get_or_create_course(body)
-                    course_run = self.create_course_run(course, body)
-                    if created:
-                        course.canonical_course_run = course_run
-                        course.save()
-            except:  # pylint: disable=bare-except
-                msg = 'An error occurred while updating {course_run} from {api_url}'.format(
-                    course_run=course_run_id,
-                    api_url=self.partner.courses_api_url
-                )
-                logger.exception(msg)
+        with self.transaction_batch() as batch:
+            for body in results:
+                course_run_id = body['id']
+
+                try:
+                    body = self.clean_strings(body)
+                    fingerprint = self.get_fingerprint(body)
+                    if self.is_unchanged(course_run_id, fingerprint):
+                        continue
+
+                    with batch.record():
+                        course_run = self.get_course_run(body)
+                        if course_run:
+                            self.update_course_run(course_run, body)
+                            course = getattr(course_run, 'canonical_for_course', False)
+                            if course and not self.partner.has_marketing_site:
+                                # If the partner have marketing site,
+                                # we should only update the course information from the marketing site.
+                                # Therefore, we don't need to do the statements below
+                                course = self.update_course(course, body)
+                                logger.debug('Processed course with key [%s].', course.key)
+                        else:
+                            course, created = self.get_or_create_course(body)
+                            course_run = self.create_course_run(course, body)
+                            if created:
+                                course.canonical_course_run = course_run
+                                course.save()
+
+                    self.record_fingerprint(course_run_id, fingerprint, batch)
+                except:  # pylint: disable=bare-except
+                    msg = 'An error occurred while updating {course_run} from {api_url}'.format(
+                        course_run=course_run_id,
+                        api_url=self.partner.courses_api_url
+                    )
+                    logger.exception(msg)
+                    self.increment_stat('failed')
 
     def get_course_run(self, body):
         course_run_key = body['id']
         try:
-            return CourseRun.objects.get(key__iexact=course_run_key)
+            return CourseRun.objects.get(lowercase_key=course_run_key.lower())
         except CourseRun.DoesNotExist:
             return None
 
@@ -158,31 +183,33 @@ class CoursesApiDataLoader(AbstractDataLoader):
         validated_data = self.format_course_run_data(body)
         self._update_instance(course_run, validated_data, suppress_publication=True)
 
-        logger.info('Processed course run with UUID [%s].', course_run.uuid)
+        logger.debug('Processed course run with UUID [%s].', course_run.uuid)
 
     def create_course_run(self, course, body):
         defaults = self.format_course_run_data(body, course=course)
+        course_run = CourseRun.objects.create(**defaults)
+        self.increment_stat('created')
 
-        return CourseRun.objects.create(**defaults)
+        return course_run
 
     def get_or_create_course(self, body):
         course_run_key = CourseKey.from_string(body['id'])
         course_key = self.get_course_key_from_course_run_key(course_run_key)
         defaults = self.format_course_data(body)
-        # We need to add the key to the defaults because django ignores kwargs with __
-        # separators when constructing the create request
+        # The key is not part of the lookup, so it must be included in the defaults used to create the course.
         defaults['key'] = course_key
         defaults['partner'] = self.partner
 
-        course, created = Course.objects.get_or_create(key__iexact=course_key, partner=self.partner, defaults=defaults)
+        course, created = Course.objects.get_or_create(
+            lowercase_key=course_key.lower(), partner=self.partner, defaults=defaults
+        )
 
         if created:
+            self.increment_stat('created')
+
             # NOTE (CCB): Use the data from the CourseKey since the Course API exposes display names for org and number,
             # which may not be unique for an organization.
-            key = course_run_key.org
-            defaults = {'key': key}
-            organization, __ = Organization.objects.get_or_create(key__iexact=key, partner=self.partner,
-                                                                  defaults=defaults)
+            organization, __ = self.reference_data.get_or_create_organization(course_run_key.org)
 
             course.authoring_organizations.add(organization)
 
@@ -192,16 +219,10 @@ class CoursesApiDataLoader(AbstractDataLoader):
         validated_data = self.format_course_data(body)
         self._update_instance(course, validated_data)
 
-        logger.info('Processed course with key [%s].', course.key)
+        logger.debug('Processed course with key [%s].', course.key)
 
         return course
 
-    def _update_instance(self, instance, validated_data, **kwargs):
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-
-        instance.save(**kwargs)
-
     def format_course_run_data(self, body, course=None):
         defaults = {
             'key': body['id'],
@@ -264,6 +285,7 @@ class CoursesApiDataLoader(AbstractDataLoader):
 
 class EcommerceApiDataLoader(AbstractDataLoader):
     """ Loads course seats, entitlements, and enrollment codes from the E-Commerce API. """
+    DEPENDENCIES = ('CoursesApiDataLoader',)
 
     def __init__(self, partner, api_url, access_token=None, token_type=None, max_workers=None,
                  is_threadsafe=False, **kwargs):
@@ -285,36 +307,30 @@ class EcommerceApiDataLoader(AbstractDataLoader):
         self._process_entitlements(entitlements)
         self._process_enrollment_codes(enrollment_codes)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:  # pragma: no cover
-            # Create pageranges to iterate over all existing pages for each product type
-            pageranges = {
-                'course_runs': self._pagerange(course_runs['count']),
-                'entitlements': self._pagerange(entitlements['count']),
-                'enrollment_codes': self._pagerange(enrollment_codes['count'])
-            }
+        # Create pageranges to iterate over all existing pages for each product type
+        pageranges = {
+            'course_runs': self._pagerange(course_runs['count']),
+            'entitlements': self._pagerange(entitlements['count']),
+            'enrollment_codes': self._pagerange(enrollment_codes['count'])
+        }
 
-            if self.is_threadsafe:
+        if self.is_threadsafe:  # pragma: no cover
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 for page in pageranges['course_runs']:
                     executor.submit(self._load_course_runs_data, page)
                 for page in pageranges['entitlements']:
                     executor.submit(self._load_entitlements_data, page)
                 for page in pageranges['enrollment_codes']:
                     executor.submit(self._load_enrollment_codes_data, page)
-            else:
-                pagerange = pageranges['course_runs']
-                for future in [executor.submit(self._request_course_runs, page) for page in pagerange]:
-                    response = future.result()
-                    self._process_course_runs(response)
+        else:
+            for response in self.prefetch_pages(self._request_course_runs, pageranges['course_runs']):
+                self._process_course_runs(response)
 
-                pagerange = pageranges['entitlements']
-                for future in [executor.submit(self._request_entitlments, page) for page in pagerange]:
-                    response = future.result()
-                    self._process_entitlements(response)
+            for response in self.prefetch_pages(self._request_entitlments, pageranges['entitlements']):
+                self._process_entitlements(response)
 
-                pagerange = pageranges['enrollment_codes']
-                for future in [executor.submit(self._request_enrollment_codes, page) for page in pagerange]:
-                    response = future.result()
-                    self._process_enrollment_codes(response)
+            for response in self.prefetch_pages(self._request_enrollment_codes, pageranges['enrollment_codes']):
+                self._process_enrollment_codes(response)
 
         logger.info('Retrieved %d course seats, %d course entitlements, and %d course enrollment codes from %s.',
                     course_runs['count'], entitlements['count'],
@@ -322,6 +338,8 @@ class EcommerceApiDataLoader(AbstractDataLoader):
 
         self.delete_orphans()
         self._delete_entitlements()
+        self.save_checkpoint()
+        self.log_stats()
 
     def _pagerange(self, count):
         pages = math.ceil(count / self.PAGE_SIZE)
@@ -355,25 +373,33 @@ class EcommerceApiDataLoader(AbstractDataLoader):
         results = response['results']
         logger.info('Retrieved %d course seats...', len(results))
 
+        bodies = {}
         for body in results:
             body = self.clean_strings(body)
-            self.update_seats(body)
+            fingerprint = self.get_fingerprint(body)
+            if self.is_unchanged(body['id'], fingerprint):
+                continue
+
+            bodies[body['id']] = (body, fingerprint)
+
+        loaded_keys = self.update_seats([body for body, __ in bodies.values()])
+
+        for key in loaded_keys:
+            self.record_fingerprint(key, bodies[key][1])
 
     def _process_entitlements(self, response):
         results = response['results']
         logger.info('Retrieved %d course entitlements...', len(results))
 
-        for body in results:
-            body = self.clean_strings(body)
-            self.entitlement_skus.append(self.update_entitlement(body))
+        bodies = [self.clean_strings(body) for body in results]
+        self.entitlement_skus.extend(self.update_entitlements(bodies))
 
     def _process_enrollment_codes(self, response):
         results = response['results']
         logger.info('Retrieved %d course enrollment codes...', len(results))
 
-        for body in results:
-            body = self.clean_strings(body)
-            self.enrollment_skus.append(self.update_enrollment_code(body))
+        bodies = [self.clean_strings(body) for body in results]
+        self.enrollment_skus.extend(self.update_enrollment_codes(bodies))
 
     def _delete_entitlements(self):
         entitlements_to_delete = CourseEntitlement.objects.filter(
@@ -387,66 +413,147 @@ class EcommerceApiDataLoader(AbstractDataLoader):
             logger.info(msg)
         entitlements_to_delete.delete()
 
-    def update_seats(self, body):
-        course_run_key = body['id']
-        try:
-            course_run = CourseRun.objects.get(key__iexact=course_run_key)
-        except CourseRun.DoesNotExist:
-            logger.warning('Could not find course run [%s]', course_run_key)
-            return None
+    @classmethod
+    def _get_course_runs(cls, keys):
+        """ Returns a dict mapping lowercase keys to CourseRuns, matching the keys case-insensitively in a single
+        query. """
+        lowercase_keys = {key.lower() for key in keys}
+        course_runs = CourseRun.objects.filter(lowercase_key__in=lowercase_keys)
+        return {course_run.lowercase_key: course_run for course_run in course_runs}
+
+    def _bulk_update(self, model, updates):
+        """
+        Applies per-row updates, skipping rows without changes. Rows with the same changes (e.g. seats whose price
+        changed to the same amount) are updated together, with one UPDATE query per distinct set of changes.
+
+        Args:
+            model (Model): Model class of the rows being updated.
+            updates (list): List of (instance, validated_data) tuples.
+        """
+        now = datetime.datetime.now(pytz.UTC)
+        groups = defaultdict(list)
+        updated = []
 
-        for product_body in body['products']:
-            if product_body['structure'] != 'child':
+        for instance, validated_data in updates:
+            changed = self._get_changed_values(instance, validated_data)
+
+            if changed:
+                groups[tuple(sorted(changed.items()))].append(instance.pk)
+                updated.append(instance)
+                self.increment_stat('updated')
+            else:
+                self.increment_stat('unchanged')
+
+        for changed, pks in groups.items():
+            model.objects.filter(pk__in=pks).update(modified=now, **dict(changed))
+
+        # Updates do not send signals, so the documents of the updated rows are invalidated here.
+        bump_documents(model, updated)
+
+    def _bulk_create(self, model, instances):
+        model.objects.bulk_create(instances)
+        bump_documents(model, instances)
+        self.increment_stat('created', len(instances))
+
+    def update_seats(self, bodies):
+        """
+        Creates, updates, and deletes the seats for a page of course runs from the E-Commerce API. Course runs,
+        currencies, and existing seats are each retrieved with one query, and stale seats are deleted with one query.
+
+        Arguments:
+            bodies (list): course run data from ecommerce, including the products of each course run
+        Returns:
+            list of the keys of the course runs whose seats were loaded
+        """
+        course_runs = self._get_course_runs(body['id'] for body in bodies)
+        loaded_keys = []
+        products = []
+        certificate_types = {}
+
+        for body in bodies:
+            course_run_key = body['id']
+            course_run = course_runs.get(course_run_key.lower())
+            if not course_run:
+                logger.warning('Could not find course run [%s]', course_run_key)
                 continue
-            product_body = self.clean_strings(product_body)
-            self.update_seat(course_run, product_body)
 
-        # Remove seats which no longer exist for that course run
-        certificate_types = [self.get_certificate_type(product) for product in body['products']
-                             if product['structure'] == 'child']
-        course_run.seats.exclude(type__in=certificate_types).delete()
+            loaded_keys.append(course_run_key)
+            child_products = [product for product in body['products'] if product['structure'] == 'child']
+            products.extend((course_run, self.clean_strings(product)) for product in child_products)
+            certificate_types[course_run] = [self.get_certificate_type(product) for product in child_products]
 
-    def update_seat(self, course_run, product_body):
+        currencies = self.reference_data.get_currencies(
+            product['stockrecords'][0]['price_currency'] for __, product in products
+        )
+        existing_seats = {
+            (seat.course_run_id, seat.type, seat.currency_id, seat.credit_provider): seat
+            for seat in Seat.objects.filter(course_run__in=list(certificate_types))
+        }
+        new_seats = {}
+        updates = []
+
+        for course_run, product_body in products:
+            seat_data = self.format_seat_data(product_body, currencies)
+            if not seat_data:
+                continue
+
+            lookup = (course_run.id, seat_data['type'], seat_data['currency'].code, seat_data['credit_provider'])
+            seat = existing_seats.get(lookup)
+
+            if seat:
+                updates.append((seat, seat_data))
+            else:
+                new_seats[lookup] = Seat(course_run=course_run, **seat_data)
+
+        # Remove seats which no longer exist for those course runs
+        stale_seats = [
+            Q(course_run=course_run) & ~Q(type__in=types) for course_run, types in certificate_types.items()
+        ]
+
+        with transaction.atomic():
+            self._bulk_update(Seat, updates)
+            self._bulk_create(Seat, list(new_seats.values()))
+
+            if stale_seats:
+                Seat.objects.filter(functools.reduce(operator.or_, stale_seats)).delete()
+
+        return loaded_keys
+
+    def format_seat_data(self, product_body, currencies):
         stock_record = product_body['stockrecords'][0]
         currency_code = stock_record['price_currency']
-        price = Decimal(stock_record['price_excl_tax'])
-        sku = stock_record['partner_sku']
 
-        try:
-            currency = Currency.objects.get(code=currency_code)
-        except Currency.DoesNotExist:
+        currency = currencies.get(currency_code)
+        if not currency:
             logger.warning("Could not find currency [%s]", currency_code)
             return None
 
         attributes = {attribute['name']: attribute['value'] for attribute in product_body['attribute_values']}
 
-        seat_type = attributes.get('certificate_type', Seat.AUDIT)
-        credit_provider = attributes.get('credit_provider')
-
         credit_hours = attributes.get('credit_hours')
         if credit_hours:
             credit_hours = int(credit_hours)
 
-        defaults = {
-            'price': price,
-            'sku': sku,
+        return {
+            'type': attributes.get('certificate_type', Seat.AUDIT),
+            'credit_provider': attributes.get('credit_provider'),
+            'currency': currency,
+            'price': Decimal(stock_record['price_excl_tax']),
+            'sku': stock_record['partner_sku'],
             'upgrade_deadline': self.parse_date(product_body.get('expires')),
             'credit_hours': credit_hours,
         }
 
-        course_run.seats.update_or_create(
-            type=seat_type,
-            credit_provider=credit_provider,
-            currency=currency,
-            defaults=defaults
-        )
-
-    def validate_stockrecord(self, stockrecords, title, product_class):
+    def validate_stockrecord(self, stockrecords, title, product_class, currencies):
         """
         Argument:
-            body (dict): product data from ecommerce, either entitlement or enrollment code
+            stockrecords (list): stockrecords of the product data from ecommerce, either entitlement or
+                enrollment code
+            title (str): title of the product
+            product_class (str): entitlement or enrollment_code
+            currencies (dict): currencies of the products being loaded, keyed by code
         Returns:
-            product sku if no exceptions, else None
+            True if no exceptions, else None
         """
         # Map product_class keys with how they should be displayed in the exception messages.
         product_classes = {
@@ -491,9 +598,7 @@ class EcommerceApiDataLoader(AbstractDataLoader):
             logger.warning(msg)
             return None
 
-        try:
-            Currency.objects.get(code=currency_code)
-        except Currency.DoesNotExist:
+        if currency_code not in currencies:
             msg = 'Could not find currency {code} while loading {product} {title} with sku {sku}'.format(
                 product=product_class['value'], code=currency_code, title=title, sku=sku
             )
@@ -503,114 +608,171 @@ class EcommerceApiDataLoader(AbstractDataLoader):
         # All validation checks passed!
         return True
 
-    def update_entitlement(self, body):
+    def _get_stockrecord_currencies(self, bodies):
+        """ Returns the currencies referenced by the first stockrecord of each product. """
+        codes = [body['stockrecords'][0].get('price_currency') for body in bodies if body['stockrecords']]
+        return self.reference_data.get_currencies(codes)
+
+    def update_entitlements(self, bodies):
         """
+        Creates and updates the entitlements for a page of products from the E-Commerce API. Courses, currencies,
+        modes, and existing entitlements are each retrieved with one query.
+
         Argument:
-            body (dict): entitlement product data from ecommerce
+            bodies (list): entitlement product data from ecommerce
         Returns:
-            entitlement product sku if no exceptions, else None
+            list of the skus of the entitlements which were loaded
         """
-        attributes = {attribute['name']: attribute['value'] for attribute in body['attribute_values']}
-        course_uuid = attributes.get('UUID')
-        title = body['title']
-        stockrecords = body['stockrecords']
+        currencies = self._get_stockrecord_currencies(bodies)
+        products = []
 
-        if not self.validate_stockrecord(stockrecords, title, 'entitlement'):
-            return None
+        for body in bodies:
+            attributes = {attribute['name']: attribute['value'] for attribute in body['attribute_values']}
+            if self.validate_stockrecord(body['stockrecords'], body['title'], 'entitlement', currencies):
+                products.append((body, attributes))
 
-        stock_record = stockrecords[0]
-        currency_code = stock_record['price_currency']
-        price = Decimal(stock_record['price_excl_tax'])
-        sku = stock_record['partner_sku']
+        course_uuids = set()
+        for __, attributes in products:
+            try:
+                course_uuids.add(UUID(attributes.get('UUID')))
+            except (TypeError, ValueError):
+                pass
+
+        courses = {course.uuid: course for course in Course.objects.filter(uuid__in=course_uuids)}
+        mode_names = {attributes.get('certificate_type') for __, attributes in products}
+        modes = self.reference_data.get_seat_types(mode_names)
+        existing_entitlements = {
+            (entitlement.course_id, entitlement.mode_id): entitlement
+            for entitlement in CourseEntitlement.objects.filter(course__in=list(courses.values()))
+        }
+        new_entitlements = {}
+        updates = []
+        skus = []
+
+        for body, attributes in products:
+            course_uuid = attributes.get('UUID')
+            title = body['title']
+            stock_record = body['stockrecords'][0]
+            sku = stock_record['partner_sku']
 
-        try:
-            course = Course.objects.get(uuid=course_uuid)
-        except Course.DoesNotExist:
-            msg = 'Could not find course {uuid} while loading entitlement {title} with sku {sku}'.format(
-                uuid=course_uuid, title=title, sku=sku
-            )
-            logger.warning(msg)
-            return None
+            try:
+                course = courses.get(UUID(course_uuid))
+            except (TypeError, ValueError):
+                course = None
 
-        try:
-            currency = Currency.objects.get(code=currency_code)
-        except Currency.DoesNotExist:
-            msg = 'Could not find currency {code} while loading entitlement {title} with sku {sku}'.format(
-                code=currency_code, title=title, sku=sku
-            )
-            logger.warning(msg)
-            return None
+            if not course:
+                msg = 'Could not find course {uuid} while loading entitlement {title} with sku {sku}'.format(
+                    uuid=course_uuid, title=title, sku=sku
+                )
+                logger.warning(msg)
+                continue
 
-        mode_name = attributes.get('certificate_type')
-        try:
-            mode = SeatType.objects.get(slug=mode_name)
-        except SeatType.DoesNotExist:
-            msg = 'Could not find mode {mode} while loading entitlement {title} with sku {sku}'.format(
-                mode=mode_name, title=title, sku=sku
+            mode_name = attributes.get('certificate_type')
+            mode = modes.get(mode_name)
+            if not mode:
+                msg = 'Could not find mode {mode} while loading entitlement {title} with sku {sku}'.format(
+                    mode=mode_name, title=title, sku=sku
+                )
+                logger.warning(msg)
+                continue
+
+            defaults = {
+                'partner': self.partner,
+                'price': Decimal(stock_record['price_excl_tax']),
+                'currency': currencies[stock_record['price_currency']],
+                'sku': sku,
+                'expires': self.parse_date(body['expires'])
+            }
+            msg = 'Creating entitlement {title} with sku {sku} for partner {partner}'.format(
+                title=title, sku=sku, partner=self.partner
             )
-            logger.warning(msg)
-            return None
+            logger.debug(msg)
 
-        defaults = {
-            'partner': self.partner,
-            'price': price,
-            'currency': currency,
-            'sku': sku,
-            'expires': self.parse_date(body['expires'])
-        }
-        msg = 'Creating entitlement {title} with sku {sku} for partner {partner}'.format(
-            title=title, sku=sku, partner=self.partner
-        )
-        logger.info(msg)
-        course.entitlements.update_or_create(mode=mode, defaults=defaults)
-        return sku
+            lookup = (course.id, mode.id)
+            entitlement = existing_entitlements.get(lookup)
+            if entitlement:
+                updates.append((entitlement, defaults))
+            else:
+                new_entitlements[lookup] = CourseEntitlement(course=course, mode=mode, **defaults)
+
+            skus.append(sku)
+
+        with transaction.atomic():
+            self._bulk_update(CourseEntitlement, updates)
+            self._bulk_create(CourseEntitlement, list(new_entitlements.values()))
+
+        return skus
 
-    def update_enrollment_code(self, body):
+    def update_enrollment_codes(self, bodies):
         """
+        Sets the bulk skus of the seats for a page of enrollment code products from the E-Commerce API. Course runs,
+        currencies, and seats are each retrieved with one query.
+
         Argument:
-            body (dict): enrollment code product data from ecommerce
+            bodies (list): enrollment code product data from ecommerce
         Returns:
-            enrollment code product sku if no exceptions, else None
+            list of the skus of the enrollment codes which were loaded
         """
-        attributes = {attribute['code']: attribute['value'] for attribute in body['attribute_values']}
-        course_key = attributes.get('course_key')
-        title = body['title']
-        stockrecords = body['stockrecords']
-
-        if not self.validate_stockrecord(stockrecords, title, "enrollment_code"):
-            return None
+        currencies = self._get_stockrecord_currencies(bodies)
+        products = []
+
+        for body in bodies:
+            attributes = {attribute['code']: attribute['value'] for attribute in body['attribute_values']}
+            if self.validate_stockrecord(body['stockrecords'], body['title'], 'enrollment_code', currencies):
+                products.append((body, attributes))
+
+        course_keys = {attributes.get('course_key') for __, attributes in products}
+        course_runs = {course_run.key: course_run for course_run in CourseRun.objects.filter(key__in=course_keys)}
+        seats = defaultdict(list)
+        for seat in Seat.objects.filter(course_run__in=list(course_runs.values())):
+            seats[(seat.course_run_id, seat.type)].append(seat)
+
+        seats_by_bulk_sku = defaultdict(list)
+        skus = []
+
+        for body, attributes in products:
+            course_key = attributes.get('course_key')
+            title = body['title']
+            sku = body['stockrecords'][0]['partner_sku']
+
+            course_run = course_runs.get(course_key)
+            if not course_run:
+                msg = 'Could not find course run {key} while loading enrollment code {title} with sku {sku}'.format(
+                    key=course_key, title=title, sku=sku
+                )
+                logger.warning(msg)
+                continue
 
-        stock_record = stockrecords[0]
-        sku = stock_record['partner_sku']
+            seat_type = attributes.get('seat_type')
+            course_run_seats = seats.get((course_run.id, seat_type))
+            if not course_run_seats:
+                msg = 'Could not find seat type {type} while loading enrollment code {title} with sku {sku}'.format(
+                    type=seat_type, title=title, sku=sku
+                )
+                logger.warning(msg)
+                continue
 
-        try:
-            course_run = CourseRun.objects.get(key=course_key)
-        except CourseRun.DoesNotExist:
-            msg = 'Could not find course run {key} while loading enrollment code {title} with sku {sku}'.format(
-                key=course_key, title=title, sku=sku
+            msg = 'Creating enrollment code {title} with sku {sku} for partner {partner}'.format(
+                title=title, sku=sku, partner=self.partner
             )
-            logger.warning(msg)
-            return None
+            logger.debug(msg)
 
-        seat_type = attributes.get('seat_type')
-        try:
-            Seat.objects.get(course_run=course_run, type=seat_type)
-        except Seat.DoesNotExist:
-            msg = 'Could not find seat type {type} while loading enrollment code {title} with sku {sku}'.format(
-                type=seat_type, title=title, sku=sku
-            )
-            logger.warning(msg)
-            return None
+            for seat in course_run_seats:
+                if seat.bulk_sku == sku:
+                    self.increment_stat('unchanged')
+                else:
+                    seats_by_bulk_sku[sku].append(seat)
 
-        defaults = {
-            'bulk_sku': sku
-        }
-        msg = 'Creating enrollment code {title} with sku {sku} for partner {partner}'.format(
-            title=title, sku=sku, partner=self.partner
-        )
-        logger.info(msg)
-        course_run.seats.update_or_create(type=seat_type, defaults=defaults)
-        return sku
+            skus.append(sku)
+
+        with transaction.atomic():
+            now = datetime.datetime.now(pytz.UTC)
+            for sku, sku_seats in seats_by_bulk_sku.items():
+                Seat.objects.filter(pk__in=[seat.pk for seat in sku_seats]).update(bulk_sku=sku, modified=now)
+                bump_documents(Seat, sku_seats)
+                self.increment_stat('updated', len(sku_seats))
+
+        return skus
 
     def get_certificate_type(self, product):
         return next(
@@ -621,9 +783,13 @@ class EcommerceApiDataLoader(AbstractDataLoader):
 
 class ProgramsApiDataLoader(AbstractDataLoader):
     """ Loads programs from the Programs API. """
+    DEPENDENCIES = ('CoursesApiDataLoader', 'OrganizationsApiDataLoader')
+    SINCE_QUERY_PARAM = 'modified_since'
     image_width = 1440
     image_height = 480
     XSERIES = None
+    # Number of banner images downloaded, or whose variations are rendered, at the same time.
+    IMAGE_WORKERS = 4
 
     def __init__(self, partner, api_url, access_token=None, token_type=None, max_workers=None,
                  is_threadsafe=False, **kwargs):
@@ -631,58 +797,81 @@ class ProgramsApiDataLoader(AbstractDataLoader):
             partner, api_url, access_token, token_type, max_workers, is_threadsafe, **kwargs
         )
         self.XSERIES = ProgramType.objects.get(name='XSeries')
+        self.banner_images = None
 
     def ingest(self):
         api_url = self.partner.programs_api_url
-        count = None
-        page = 1
 
         logger.info('Refreshing programs from %s...', api_url)
 
-        while page:
-            response = self.api_client.programs.get(page=page, page_size=self.PAGE_SIZE)
+        # Banner images are downloaded in the background, and saved as they arrive.
+        self.banner_images = ImagePipeline(self.http_session, self.IMAGE_WORKERS, self.metrics)
+
+        try:
+            response = self._make_request(1)
             count = response['count']
-            results = response['results']
-            logger.info('Retrieved %d programs...', len(results))
+            self._process_response(response)
 
-            if response['next']:
-                page += 1
-            else:
-                page = None
+            for response in self.prefetch_pages(self._make_request, range(2, self.get_page_count(response) + 1)):
+                self._process_response(response)
+                self.banner_images.process()
+        finally:
+            self.banner_images.close()
+
+        logger.info('Retrieved %d programs from %s.', count, api_url)
+
+        self.save_checkpoint()
+        self.log_stats()
+
+    def _make_request(self, page):
+        return self.api_client.programs.get(page=page, page_size=self.PAGE_SIZE, **self.get_since_query_kwargs())
 
+    def _process_response(self, response):
+        results = response['results']
+        logger.info('Retrieved %d programs...', len(results))
+
+        with self.transaction_batch() as batch:
             for program in results:
                 program = self.clean_strings(program)
-                self.update_program(program)
+                uuid = self._get_uuid(program)
+                fingerprint = self.get_fingerprint(program)
+                if self.is_unchanged(uuid, fingerprint):
+                    continue
 
-        logger.info('Retrieved %d programs from %s.', count, api_url)
+                if self.update_program(program, batch):
+                    self.record_fingerprint(uuid, fingerprint, batch)
 
     def _get_uuid(self, body):
         return body['uuid']
 
-    def update_program(self, body):
+    def update_program(self, body, batch):
         uuid = self._get_uuid(body)
 
         try:
-            defaults = {
-                'uuid': uuid,
-                'title': body['name'],
-                'subtitle': body['subtitle'],
-                'type': self.XSERIES,
-                'status': body['status'],
-                'banner_image_url': self._get_banner_image_url(body),
-            }
-
-            program, __ = Program.objects.update_or_create(
-                marketing_slug=body['marketing_slug'],
-                partner=self.partner,
-                defaults=defaults
-            )
-            self._update_program_organizations(body, program)
-            self._update_program_courses_and_runs(body, program)
-            self._update_program_banner_image(body, program)
-            program.save()
+            with batch.record():
+                defaults = {
+                    'uuid': uuid,
+                    'title': body['name'],
+                    'subtitle': body['subtitle'],
+                    'type': self.XSERIES,
+                    'status': body['status'],
+                }
+
+                program, __ = self._update_or_create(
+                    Program,
+                    defaults,
+                    marketing_slug=body['marketing_slug'],
+                    partner=self.partner
+                )
+                self._update_program_organizations(body, program)
+                self._update_program_courses_and_runs(body, program)
+                self._update_program_banner_image(body, program)
+                program.save()
+            return program
         except Exception:  # pylint: disable=broad-except
             logger.exception('Failed to load program %s', uuid)
+            self.increment_stat('failed')
+            return None
 
     def _update_program_courses_and_runs(self, body, program):
         course_run_keys = set()
@@ -692,14 +881,12 @@ class ProgramsApiDataLoader(AbstractDataLoader):
         # The course_code key field is technically useless, so we must build the course list from the
         # associated course runs.
         courses = Course.objects.filter(course_runs__key__in=course_run_keys).distinct()
-        program.courses.clear()
-        program.courses.add(*courses)
+        sync_many_to_many(program.courses, courses)
 
         # Do a diff of all the course runs and the explicitly-associated course runs to determine
         # which course runs should be explicitly excluded.
         excluded_course_runs = CourseRun.objects.filter(course__in=courses).exclude(key__in=course_run_keys)
-        program.excluded_course_runs.clear()
-        program.excluded_course_runs.add(*excluded_course_runs)
+        sync_many_to_many(program.excluded_course_runs, excluded_course_runs)
 
     def _update_program_organizations(self, body, program):
         uuid = self._get_uuid(body)
@@ -709,8 +896,7 @@ class ProgramsApiDataLoader(AbstractDataLoader):
         if len(org_keys) != organizations.count():
             logger.error('Organizations for program [%s] are invalid!', uuid)
 
-        program.authoring_organizations.clear()
-        program.authoring_organizations.add(*organizations)
+        sync_many_to_many(program.authoring_organizations, organizations)
 
     def _get_banner_image_url(self, body):
         image_key = 'w{width}h{height}'.format(width=self.image_width, height=self.image_height)
@@ -718,18 +904,13 @@ class ProgramsApiDataLoader(AbstractDataLoader):
         return image_url
 
     def _update_program_banner_image(self, body, program):
+        # The URL is updated here, rather than with the other fields, so the URL of the current image is known.
+        previous_url = program.banner_image_url
         image_url = self._get_banner_image_url(body)
+        program.banner_image_url = image_url
+
         if not image_url:
             logger.warning('There are no banner image url for program %s', program.title)
             return
 
-        r = requests.get(image_url)
-        if r.status_code == 200:
-            banner_downloaded = File(BytesIO(r.content))
-            program.banner_image.save(
-                'banner.jpg',
-                banner_downloaded
-            )
-            program.save()
-        else:
-            logger.exception('Loading the banner image %s for program %s failed', image_url, program.title)
+        self.banner_images.submit(program, 'banner_image', image_url, 'banner.jpg', previous_url=previous_url)
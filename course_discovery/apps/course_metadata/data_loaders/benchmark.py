@@ -0,0 +1,95 @@
+"""
+Measurements of the resources used by data loaders, for benchmarking.
+"""
+import os
+import resource
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.utils import CursorDebugWrapper, CursorWrapper
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def get_peak_rss():
+    """
+    Returns the peak resident set size of this process since it started, in kilobytes (on Linux). The peak never
+    decreases, so it cannot be attributed to the code which ran last.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def get_rss():
+    """ Returns the current resident set size of this process, in kilobytes, or None if it cannot be read. """
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (IOError, OSError, IndexError, ValueError):
+        return None
+
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+class CountingCursorMixin(object):
+    def execute(self, sql, params=None):
+        try:
+            return super(CountingCursorMixin, self).execute(sql, params)
+        finally:
+            self._count(sql)
+
+    def executemany(self, sql, param_list):
+        try:
+            return super(CountingCursorMixin, self).executemany(sql, param_list)
+        finally:
+            self._count(sql)
+
+    def _count(self, sql):
+        for counter in getattr(self.db, 'query_counters', ()):
+            counter.count(sql, self.cursor.rowcount)
+
+
+class CountingCursorWrapper(CountingCursorMixin, CursorWrapper):
+    pass
+
+
+class CountingCursorDebugWrapper(CountingCursorMixin, CursorDebugWrapper):
+    pass
+
+
+class QueryCounter(object):
+    """ Context manager which counts the queries run, and the rows written, on a database connection.
+
+    Counters may be nested. Only the connection of the current thread is measured, so loaders writing from worker
+    threads (i.e. is_threadsafe loaders) are not fully measured.
+    """
+
+    def __init__(self, connection=None):
+        self.connection = connection or connections[DEFAULT_DB_ALIAS]
+        self.queries = 0
+        self.rows_written = 0
+
+    def count(self, sql, rowcount):
+        self.queries += 1
+
+        if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+            self.rows_written += max(rowcount or 0, 0)
+
+    def __enter__(self):
+        connection = self.connection
+
+        if not getattr(connection, 'query_counters', None):
+            # The instance attributes shadow the connection's methods until the last counter is exited.
+            connection.query_counters = []
+            connection.make_cursor = lambda cursor: CountingCursorWrapper(cursor, connection)
+            connection.make_debug_cursor = lambda cursor: CountingCursorDebugWrapper(cursor, connection)
+
+        connection.query_counters.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        connection = self.connection
+        connection.query_counters.remove(self)
+
+        if not connection.query_counters:
+            del connection.query_counters
+            del connection.make_cursor
+            del connection.make_debug_cursor
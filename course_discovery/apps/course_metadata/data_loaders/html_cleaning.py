@@ -0,0 +1,113 @@
+"""
+Cleaning of the HTML loaded from upstream services.
+
+Cleaning HTML is one of the most expensive steps of loading marketing site data, and most content does not change
+between refreshes. Cleaned HTML is therefore memoized in memory, and in the database so it survives across refreshes,
+keyed by a hash of the raw HTML. Rows older than RETENTION are pruned after each refresh, so HTML which is no longer
+loaded does not accumulate. HTML which is still loaded is cleaned again once per retention period.
+"""
+import datetime
+import functools
+import hashlib
+import logging
+import re
+import threading
+
+import html2text
+import markdown
+from django.utils import timezone
+
+from course_discovery.apps.course_metadata.models import CleanedHtml
+
+logger = logging.getLogger(__name__)
+
+# Change this whenever the output of convert_html changes, so HTML cleaned by previous versions is not reused.
+VERSION = '1'
+CACHE_SIZE = 4096
+RETENTION = datetime.timedelta(days=30)
+MARKDOWN_CLEANUP_REGEX = re.compile(r'^<p>(.*)</p>$')
+
+_local = threading.local()
+
+
+def get_markdown_converter():
+    """
+    Returns a Markdown converter for the calling thread, reset so it can convert a new document.
+
+    Markdown converters are expensive to create, and are designed to be reused once reset. They are not thread-safe, so
+    each thread has its own.
+    """
+    converter = getattr(_local, 'markdown', None)
+
+    if converter is None:
+        converter = _local.markdown = markdown.Markdown()
+
+    converter.reset()
+    return converter
+
+
+def get_html_converter():
+    # HTML2Text keeps parser state (e.g. open blockquotes, abbreviations and pending line breaks) from one document
+    # to the next, so a converter cannot be reused. Creating one is cheap compared to converting a document.
+    converter = html2text.HTML2Text()
+    converter.wrap_links = False
+    converter.body_width = None
+    return converter
+
+
+def convert_html(content):
+    """Cleans HTML from a string.
+
+    This method converts the HTML to a Markdown string (to remove styles, classes, and other unsupported
+    attributes), and converts the Markdown back to HTML.
+    """
+    cleaned = content.replace('&nbsp;', '')
+    cleaned = get_html_converter().handle(cleaned).strip()
+    cleaned = get_markdown_converter().convert(cleaned)
+    cleaned = MARKDOWN_CLEANUP_REGEX.sub(r'\1', cleaned)
+
+    # html2text does not handle ampersands properly.
+    # See https://github.com/Alir3z4/html2text/issues/109.
+    cleaned = cleaned.replace('&amp;', '&')
+
+    return cleaned
+
+
+def get_hash(content):
+    return hashlib.sha1((VERSION + content).encode('utf8')).hexdigest()
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def clean_html(content):
+    """
+    Returns the cleaned version of the HTML, only cleaning it if it has not been cleaned before.
+
+    Args:
+        content (str): HTML to clean.
+
+    Returns:
+        str
+    """
+    if not content:
+        return convert_html(content)
+
+    content_hash = get_hash(content)
+    cleaned = CleanedHtml.objects.filter(hash=content_hash).values_list('html', flat=True).first()
+
+    if cleaned is None:
+        cleaned = convert_html(content)
+        CleanedHtml.objects.get_or_create(hash=content_hash, defaults={'html': cleaned})
+
+    return cleaned
+
+
+def prune_cleaned_html():
+    """
+    Deletes the cleaned HTML saved more than RETENTION ago.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    deleted, __ = CleanedHtml.objects.filter(created__lt=timezone.now() - RETENTION).delete()
+    logger.info('Pruned [%d] cleaned HTML documents older than [%s].', deleted, RETENTION)
+    return deleted
@@ -0,0 +1,186 @@
+"""
+Downloading of images referenced by upstream services.
+
+Images are downloaded by a bounded pool of threads, so loading records does not wait for them. Conditional requests
+(ETag and Last-Modified) and a hash of the downloaded content are used to skip images which have not changed, and the
+variations of saved images are also rendered by the pool.
+"""
+import hashlib
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.files.base import ContentFile
+
+from course_discovery.apps.api.documents import bump_documents
+from course_discovery.apps.course_metadata.models import DataLoaderImage
+from course_discovery.apps.course_metadata.utils import custom_render_variations
+
+logger = logging.getLogger(__name__)
+
+DownloadedImage = namedtuple(
+    'DownloadedImage', ['url', 'status_code', 'content', 'content_hash', 'etag', 'last_modified']
+)
+
+
+def download_image(session, url, etag=None, last_modified=None):
+    """
+    Downloads an image, unless it has not changed since it was last downloaded.
+
+    Args:
+        session (requests.Session): Session used to download the image.
+        url (str): URL of the image.
+        etag (str): ETag of the image when it was last downloaded.
+        last_modified (str): Last-Modified date of the image when it was last downloaded.
+
+    Returns:
+        DownloadedImage: The content of the image is only set if the response status is 200.
+    """
+    headers = {}
+
+    if etag:
+        headers['If-None-Match'] = etag
+
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    response = session.get(url, headers=headers)
+    content = response.content if response.status_code == 200 else None
+
+    return DownloadedImage(
+        url=url,
+        status_code=response.status_code,
+        content=content,
+        content_hash=hashlib.sha1(content).hexdigest() if content is not None else None,
+        etag=response.headers.get('ETag', ''),
+        last_modified=response.headers.get('Last-Modified', ''),
+    )
+
+
+def render_variations(file_name, variations, storage):
+    try:
+        custom_render_variations(file_name, variations, storage)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception('Failed to render the variations of image [%s].', file_name)
+
+
+class ImagePipeline(object):
+    """ Downloads images in a bounded thread pool, and saves those which have changed to image fields.
+
+    Images are saved by the thread which calls process(), since saving writes to the database. Rendering variations
+    only reads and writes storage, so it is left to the pool.
+    """
+
+    def __init__(self, session, max_workers, metrics):
+        """
+        Arguments:
+            session (requests.Session): Session used to download images.
+            max_workers (int): Number of images downloaded or rendered at the same time.
+            metrics (LoaderMetrics): Metrics of the data loader, to which the number of images downloaded, saved,
+                left unchanged and failed are added.
+        """
+        self.session = session
+        self.metrics = metrics
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.images = {image.url: image for image in DataLoaderImage.objects.all()}
+        self.pending = []
+
+    def submit(self, instance, field_name, url, file_name, previous_url=None):
+        """
+        Downloads an image in the background. The image is saved to the field by a later call to process().
+
+        Args:
+            instance (Model): Model instance to which the image belongs.
+            field_name (str): Name of the image field.
+            url (str): URL of the image.
+            file_name (str): Name given to the saved image.
+            previous_url (str): URL of the image the field was last saved from.
+        """
+        image = self.images.get(url)
+
+        # The image is only compared with the one last downloaded from the URL if the field still holds it. The
+        # same URL may have been downloaded for another instance, or the field may hold an image from another URL.
+        compare = bool(image and previous_url == url and getattr(instance, field_name))
+
+        if compare:
+            future = self.executor.submit(download_image, self.session, url, image.etag, image.last_modified)
+        else:
+            future = self.executor.submit(download_image, self.session, url)
+
+        self.pending.append((future, instance, field_name, file_name, compare))
+
+    def process(self, wait=False):
+        """
+        Saves the images which have been downloaded.
+
+        Args:
+            wait (bool): Wait for every image to be downloaded, instead of only saving those already downloaded.
+        """
+        pending = []
+
+        for item in self.pending:
+            future = item[0]
+            if wait or future.done():
+                self.save(*item)
+            else:
+                pending.append(item)
+
+        self.pending = pending
+
+    def save(self, future, instance, field_name, file_name, compare):
+        try:
+            downloaded = future.result()
+        except requests.RequestException:
+            logger.exception('Loading the image for %s failed', instance)
+            self.metrics.increment('images_failed')
+            return
+
+        if downloaded.status_code == 304:
+            self.metrics.increment('images_unchanged')
+            return
+
+        if downloaded.status_code != 200:
+            logger.error(
+                'Loading the image %s for %s failed with status %d', downloaded.url, instance, downloaded.status_code
+            )
+            self.metrics.increment('images_failed')
+            return
+
+        self.metrics.increment('images_downloaded')
+        field_file = getattr(instance, field_name)
+        image = self.images.get(downloaded.url)
+
+        if not (compare and image and image.content_hash == downloaded.content_hash):
+            field = field_file.field
+            name = field.generate_filename(instance, file_name)
+            name = field_file.storage.save(name, ContentFile(downloaded.content), max_length=field.max_length)
+
+            # Only the image field is updated, so the rest of the instance is not saved again.
+            type(instance)._default_manager.filter(pk=instance.pk).update(**{field_name: name})
+            setattr(instance, field_name, name)
+            bump_documents(type(instance), [instance])
+
+            variations = getattr(field, 'variations', None)
+            if variations:
+                self.executor.submit(render_variations, name, variations, field_file.storage)
+
+            self.metrics.increment('images_saved')
+        else:
+            self.metrics.increment('images_unchanged')
+
+        self.images[downloaded.url], __ = DataLoaderImage.objects.update_or_create(
+            url=downloaded.url,
+            defaults={
+                'etag': downloaded.etag,
+                'last_modified': downloaded.last_modified,
+                'content_hash': downloaded.content_hash,
+            }
+        )
+
+    def close(self):
+        """ Saves the remaining images, and waits for their variations to be rendered. """
+        try:
+            self.process(wait=True)
+        finally:
+            self.executor.shutdown(wait=True)
@@ -13,12 +13,11 @@ from django.utils.functional import cached_property
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
 
+from course_discovery.apps.api.documents import bump_documents
 from course_discovery.apps.course_metadata.choices import CourseRunPacing, CourseRunStatus
 from course_discovery.apps.course_metadata.data_loaders import AbstractDataLoader
-from course_discovery.apps.course_metadata.models import (
-    Course, CourseRun, LevelType, Organization, Person, Position, Subject
-)
-from course_discovery.apps.course_metadata.utils import MarketingSiteAPIClient
+from course_discovery.apps.course_metadata.models import Course, CourseRun, Organization, Person, Position, Subject
+from course_discovery.apps.course_metadata.utils import MarketingSiteAPIClient, sync_many_to_many
 from course_discovery.apps.ietf_language_tags.models import LanguageTag
 
 logger = logging.getLogger(__name__)
@@ -45,14 +44,21 @@ class AbstractMarketingSiteDataLoader(AbstractDataLoader):
             self.api_url
         )
 
-        return marketing_site_api_client.api_session
+        return self.mount_rate_limiter(marketing_site_api_client.api_session)
+
+    def clean_html(self, content):  # pylint: disable=arguments-differ
+        # Converting HTML is one of the most expensive steps of loading marketing site data, so it is timed.
+        with self.metrics.timer('clean_html'):
+            return super(AbstractMarketingSiteDataLoader, self).clean_html(content)
 
     def get_query_kwargs(self):
-        return {
+        kwargs = {
             'type': self.node_type,
             'max-depth': 2,
             'load-entity-refs': 'file',
         }
+        kwargs.update(self.get_since_query_kwargs())
+        return kwargs
 
     def ingest(self):
         """ Load data for all supported objects (e.g. courses, runs). """
@@ -67,14 +73,16 @@ class AbstractMarketingSiteDataLoader(AbstractDataLoader):
             pages = [self._extract_page(url) + 1 for url in (data['first'], data['last'])]
             pagerange = range(*pages)
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                if self.is_threadsafe:  # pragma: no cover
+            if self.is_threadsafe:  # pragma: no cover
+                with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                     for page in pagerange:
                         executor.submit(self._load_data, page)
-                else:
-                    for future in [executor.submit(self._request, page) for page in pagerange]:
-                        response = future.result()
-                        self._process_response(response)
+            else:
+                for response in self.prefetch_pages(self._request, pagerange):
+                    self._process_response(response)
+
+        self.save_checkpoint()
+        self.log_stats()
 
     def _load_data(self, page):  # pragma: no cover
         """Make a request for the given page and process the response."""
@@ -111,13 +119,21 @@ class AbstractMarketingSiteDataLoader(AbstractDataLoader):
         self._check_status_code(response)
 
         data = response.json()
-        for node in data['list']:
-            try:
-                url = node['url']
-                node = self.clean_strings(node)
-                self.process_node(node)
-            except:  # pylint: disable=bare-except
-                logger.exception('Failed to load %s.', url)
+        with self.transaction_batch() as batch:
+            for node in data['list']:
+                try:
+                    url = node['url']
+                    node = self.clean_strings(node)
+                    fingerprint = self.get_fingerprint(node)
+                    if self.is_unchanged(url, fingerprint):
+                        continue
+
+                    with batch.record():
+                        self.process_node(node)
+                    self.record_fingerprint(url, fingerprint, batch)
+                except:  # pylint: disable=bare-except
+                    logger.exception('Failed to load %s.', url)
+                    self.increment_stat('failed')
 
     def _get_nested_url(self, field):
         """ Helper method that retrieves the nested `url` field in the specified field, if it exists.
@@ -159,16 +175,15 @@ class SubjectMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
         try:
             subject = Subject.objects.get(slug=slug, partner=self.partner)
             subject.set_current_language(language_code)
-            for key, value in defaults.items():
-                setattr(subject, key, value)
-            subject.save()
+            self._update_instance(subject, defaults)
         except Subject.DoesNotExist:
             new_values = {'slug': slug, 'partner': self.partner, '_current_language': language_code}
             new_values.update(defaults)
             subject = Subject(**new_values)
             subject.save()
+            self.increment_stat('created')
 
-        logger.info('Processed subject with slug [%s].', slug)
+        logger.debug('Processed subject with slug [%s].', slug)
         return subject
 
 
@@ -194,8 +209,15 @@ class SchoolMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
 
         try:
             school = Organization.objects.get(uuid=uuid, partner=self.partner)
-            Organization.objects.filter(pk=school.pk).update(**defaults)
-            logger.info('Updated school with key [%s].', school.key)
+            changed = self._get_changed_values(school, defaults)
+
+            if changed:
+                Organization.objects.filter(pk=school.pk).update(**changed)
+                bump_documents(Organization, [school])
+                self.increment_stat('updated')
+                logger.debug('Updated school with key [%s].', school.key)
+            else:
+                self.increment_stat('unchanged')
         except Organization.DoesNotExist:
             # NOTE: Some organizations' keys do not match the title. For example, "UC BerkeleyX" courses use
             # BerkeleyX as the key. Those fixes will be made manually after initial import, and we don't want to
@@ -203,11 +225,13 @@ class SchoolMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
             defaults['key'] = key
             defaults['uuid'] = uuid
             school = Organization.objects.create(**defaults)
-            logger.info('Created school with key [%s].', school.key)
+            self.increment_stat('created')
+            self.reference_data.invalidate(Organization)
+            logger.debug('Created school with key [%s].', school.key)
 
         self.set_tags(school, data)
 
-        logger.info('Processed school with key [%s].', school.key)
+        logger.debug('Processed school with key [%s].', school.key)
         return school
 
     def set_tags(self, school, data):
@@ -244,9 +268,9 @@ class SponsorMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
             'description': body,
             'logo_image_url': data['field_sponsorer_image']['url'],
         }
-        sponsor, __ = Organization.objects.update_or_create(uuid=uuid, partner=self.partner, defaults=defaults)
+        sponsor, __ = self._update_or_create(Organization, defaults, uuid=uuid, partner=self.partner)
 
-        logger.info('Processed sponsor with UUID [%s].', uuid)
+        logger.debug('Processed sponsor with UUID [%s].', uuid)
         return sponsor
 
 
@@ -274,7 +298,7 @@ class PersonMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
             'slug': slug,
             'profile_url': data['url'],
         }
-        person, created = Person.objects.update_or_create(uuid=uuid, partner=self.partner, defaults=defaults)
+        person, created = self._update_or_create(Person, defaults, uuid=uuid, partner=self.partner)
 
         # NOTE (CCB): The AutoSlug field kicks in at creation time. We need to apply overrides in a separate
         # operation.
@@ -283,7 +307,7 @@ class PersonMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
             person_given_name = data['field_person_first_middle_name']
             person_family_name = data['field_person_last_name']
 
-            logger.info(
+            logger.debug(
                 u'Person created in marketing data loader, %s %s %s with uuid: %s and slug: %s',
                 person_salutation,
                 person_family_name,
@@ -296,7 +320,7 @@ class PersonMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
 
         self.set_position(person, data)
 
-        logger.info('Processed person with UUID [%s].', uuid)
+        logger.debug('Processed person with UUID [%s].', uuid)
         return person
 
     def set_position(self, person, data):
@@ -319,7 +343,7 @@ class PersonMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
 
                     if organization_name:
                         organization = Organization.objects.filter(
-                            Q(name__iexact=organization_name) | Q(key__iexact=organization_name) & Q(
+                            Q(name__iexact=organization_name) | Q(lowercase_key=organization_name.lower()) & Q(
                                 partner=self.partner)).first()
 
                     defaults = {
@@ -339,6 +363,10 @@ class PersonMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
 
 
 class CourseMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
+    DEPENDENCIES = (
+        'SubjectMarketingSiteDataLoader', 'SchoolMarketingSiteDataLoader', 'SponsorMarketingSiteDataLoader',
+        'PersonMarketingSiteDataLoader',
+    )
     LANGUAGE_MAP = {
         'English': 'en-us',
         '日本語': 'ja',
@@ -389,7 +417,7 @@ class CourseMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
                         course = self.update_course(course_run.course, data)
                         self.set_subjects(course, data)
                         self.set_authoring_organizations(course, data)
-                        logger.info(
+                        logger.debug(
                             'Processed course with key [%s] based on the data from courserun [%s]',
                             course.key,
                             course_run.key
@@ -397,7 +425,7 @@ class CourseMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
                     except AttributeError:
                         pass
                 else:
-                    logger.info(
+                    logger.debug(
                         'Course_run [%s] is unpublished, so the course [%s] related is not updated.',
                         data['field_course_id'],
                         course_run.course.number
@@ -416,7 +444,7 @@ class CourseMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
                     course.canonical_course_run = course_run
                     course.save()
         else:
-            logger.info(
+            logger.debug(
                 'Course_run [%s] has uuid [%s] already on course about page. No need to ingest',
                 data['field_course_id'],
                 data['field_course_uuid']
@@ -425,7 +453,7 @@ class CourseMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
     def get_course_run(self, data):
         course_run_key = data['field_course_id']
         try:
-            return CourseRun.objects.get(key__iexact=course_run_key)
+            return CourseRun.objects.get(lowercase_key=course_run_key.lower())
         except CourseRun.DoesNotExist:
             return None
 
@@ -435,12 +463,13 @@ class CourseMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
         self.set_course_run_staff(course_run, data)
         self.set_course_run_transcript_languages(course_run, data)
 
-        logger.info('Processed course run with UUID [%s].', course_run.uuid)
+        logger.debug('Processed course run with UUID [%s].', course_run.uuid)
 
     def create_course_run(self, course, data):
         defaults = self.format_course_run_data(data, course)
 
         course_run = CourseRun.objects.create(**defaults)
+        self.increment_stat('created')
         self.set_course_run_staff(course_run, data)
         self.set_course_run_transcript_languages(course_run, data)
 
@@ -451,9 +480,12 @@ class CourseMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
         key = self.get_course_key_from_course_run_key(course_run_key)
         defaults = self.format_course_data(data, key=key)
 
-        course, created = Course.objects.get_or_create(key__iexact=key, partner=self.partner, defaults=defaults)
+        course, created = Course.objects.get_or_create(
+            lowercase_key=key.lower(), partner=self.partner, defaults=defaults
+        )
 
         if created:
+            self.increment_stat('created')
             self.set_subjects(course, data)
             self.set_authoring_organizations(course, data)
 
@@ -465,11 +497,6 @@ class CourseMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
 
         return course
 
-    def _update_instance(self, instance, validated_data, **kwargs):
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save(**kwargs)
-
     def format_course_run_data(self, data, course):
         uuid = data['uuid']
         key = data['field_course_id']
@@ -548,7 +575,7 @@ class CourseMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
         level_type = None
 
         if name:
-            level_type, __ = LevelType.objects.get_or_create(name=name)
+            level_type = self.reference_data.get_or_create_level_type(name)
 
         return level_type
 
@@ -592,24 +619,21 @@ class CourseMarketingSiteDataLoader(AbstractMarketingSiteDataLoader):
 
     def _extract_language_tags(self, raw_objects_data):
         language_names = [_object['name'].strip() for _object in raw_objects_data]
-        return self.get_language_tags_from_names(language_names)
+        language_codes = [self.LANGUAGE_MAP.get(name) for name in language_names]
+        return self.reference_data.get_language_tags(language_codes)
 
     def set_authoring_organizations(self, course, data):
         schools = self._get_objects_by_uuid(Organization, data['field_course_school_node'])
-        course.authoring_organizations.clear()
-        course.authoring_organizations.add(*schools)
+        sync_many_to_many(course.authoring_organizations, schools)
 
     def set_subjects(self, course, data):
         subjects = self._get_objects_by_uuid(Subject, data['field_course_subject'])
-        course.subjects.clear()
-        course.subjects.add(*subjects)  # pylint: disable=not-an-iterable
+        sync_many_to_many(course.subjects, subjects)
 
     def set_course_run_staff(self, course_run, data):
         staff = self._get_objects_by_uuid(Person, data['field_course_staff'])
-        course_run.staff.clear()
-        course_run.staff.add(*staff)
+        sync_many_to_many(course_run.staff, staff)
 
     def set_course_run_transcript_languages(self, course_run, data):
         language_tags = self._extract_language_tags(data['field_course_video_locale_lang'])
-        course_run.transcript_languages.clear()
-        course_run.transcript_languages.add(*language_tags)
+        sync_many_to_many(course_run.transcript_languages, language_tags)
@@ -0,0 +1,109 @@
+import contextlib
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+
+PERCENTILES = (50, 90, 99)
+
+
+def get_percentile(values, percentile):
+    """ Returns the nearest-rank percentile of the sorted values, or None if there are no values. """
+    if not values:
+        return None
+
+    index = max(int(math.ceil(percentile / 100 * len(values))) - 1, 0)
+    return values[index]
+
+
+class LoaderMetrics(object):
+    """ Counters and timings collected by a data loader during a run. Safe to update from multiple threads. """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.timings = Counter()
+        self.latencies = []
+        self.lock = threading.Lock()
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            self.timings[name] += seconds
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """ Context manager which adds the time spent in its block to the named timing. """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.monotonic() - start)
+
+    def record_latency(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def get_latency_summary(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+
+        summary = OrderedDict([('count', len(latencies))])
+        for percentile in PERCENTILES:
+            value = get_percentile(latencies, percentile)
+            summary['p{}'.format(percentile)] = round(value, 3) if value is not None else None
+        summary['max'] = round(latencies[-1], 3) if latencies else None
+
+        return summary
+
+    def as_dict(self):
+        with self.lock:
+            counters = OrderedDict(sorted(self.counters.items()))
+            timings = OrderedDict((name, round(seconds, 3)) for name, seconds in sorted(self.timings.items()))
+
+        return OrderedDict([
+            ('counters', counters),
+            ('timings', timings),
+            ('latency', self.get_latency_summary()),
+        ])
+
+
+def build_report(results):
+    """
+    Aggregates the results of data loader runs into a report.
+
+    Arguments:
+        results (list): Dicts returned by execute_loader, with partner, loader, succeeded and metrics keys.
+
+    Returns:
+        OrderedDict: Results of each loader, and the sum of their counters and timings, grouped by partner.
+    """
+    partners = OrderedDict()
+
+    for result in results:
+        partner = partners.setdefault(result['partner'], OrderedDict([
+            ('succeeded', True),
+            ('counters', Counter()),
+            ('timings', Counter()),
+            ('loaders', OrderedDict()),
+        ]))
+
+        partner['succeeded'] = partner['succeeded'] and result['succeeded']
+        partner['loaders'][result['loader']] = result
+
+        metrics = result.get('metrics') or {}
+        partner['counters'].update(metrics.get('counters', {}))
+        partner['timings'].update(metrics.get('timings', {}))
+
+    for partner in partners.values():
+        partner['counters'] = OrderedDict(sorted(partner['counters'].items()))
+        partner['timings'] = OrderedDict(
+            (name, round(seconds, 3)) for name, seconds in sorted(partner['timings'].items())
+        )
+
+    return OrderedDict([
+        ('succeeded', all(partner['succeeded'] for partner in partners.values())),
+        ('partners', partners),
+    ])
@@ -0,0 +1,61 @@
+import collections
+import concurrent.futures
+
+
+def prefetch(executor, func, items, window, ordered=True):
+    """
+    Calls func for each item using the executor, keeping at most `window` calls in flight, and yields the results.
+
+    A new call is only started when the caller takes a result, so a slow consumer (e.g. one writing each page of
+    results to the database) holds back the producer, and no more than `window` results are ever held in memory.
+    Calls keep running while the caller processes a result, which overlaps network and database time.
+
+    Exceptions raised by func are raised when the corresponding result is reached. Calls which have not started are
+    cancelled if the caller stops iterating early.
+
+    Args:
+        executor (concurrent.futures.Executor): Executor used to run the calls.
+        func (callable): Function called with each item.
+        items (iterable): Items to pass to func. Items are consumed lazily.
+        window (int): Maximum number of calls in flight.
+        ordered (bool): If True, results are yielded in the order of the items. Otherwise, results are yielded as
+            soon as they are ready, so one slow call does not hold back the others.
+
+    Yields:
+        tuple: The item, and the value returned by func for it.
+    """
+    items = iter(items)
+    window = max(window, 1)
+    pending = collections.OrderedDict()
+
+    def submit_next():
+        try:
+            item = next(items)
+        except StopIteration:
+            return False
+
+        pending[executor.submit(func, item)] = item
+        return True
+
+    try:
+        while len(pending) < window and submit_next():
+            pass
+
+        while pending:
+            if ordered:
+                future = next(iter(pending))
+            else:
+                done, __ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                # Yield the earliest item among those which are done, to keep the order stable where possible.
+                future = next(future for future in pending if future in done)
+
+            item = pending.pop(future)
+            result = future.result()
+
+            # Replace the call before handing the result over, so it runs while the caller processes the result.
+            submit_next()
+
+            yield item, result
+    finally:
+        for future in pending:
+            future.cancel()
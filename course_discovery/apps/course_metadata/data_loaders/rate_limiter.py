@@ -0,0 +1,238 @@
+import email.utils
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+THROTTLED_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value):
+    """
+    Parses the value of a Retry-After header.
+
+    Args:
+        value (str): Either a number of seconds or an HTTP date.
+
+    Returns:
+        float: Number of seconds to wait, or None if the value cannot be parsed.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+
+    return max(email.utils.mktime_tz(parsed) - time.time(), 0.0)
+
+
+class RateLimiter(object):
+    """ Adaptive rate limiter shared by all requests made to a single upstream host.
+
+    Requests are limited in two ways:
+
+    * A token bucket caps the number of requests started per second.
+    * An additive-increase/multiplicative-decrease (AIMD) window caps the number of requests in flight. The window
+      grows by roughly one slot for every window's worth of healthy responses, and is cut back whenever the
+      upstream responds with a 429 or 503.
+
+    When a throttled response carries a Retry-After header, no new requests are started until it has elapsed.
+
+    The limiter only coordinates the threads of a single process. When several processes call the same host, a
+    semaphore shared between them can be used to cap the total number of requests in flight.
+    """
+
+    def __init__(self, requests_per_second=0, initial_concurrency=1, max_concurrency=1, backoff_factor=0.5,
+                 default_retry_after=30, semaphore=None):
+        """
+        Arguments:
+            requests_per_second (int): Maximum number of requests started per second. 0 disables the token bucket.
+            initial_concurrency (int): Number of requests allowed in flight before any responses are seen.
+            max_concurrency (int): Upper bound for the number of requests in flight.
+            backoff_factor (float): Factor applied to the concurrency window when a request is throttled.
+            default_retry_after (int): Seconds to pause when a throttled response has no Retry-After header.
+            semaphore (Semaphore): Semaphore shared with other processes which call the same host.
+        """
+        self.requests_per_second = requests_per_second
+        self.max_concurrency = max(max_concurrency, 1)
+        self.concurrency = float(min(max(initial_concurrency, 1), self.max_concurrency))
+        self.backoff_factor = backoff_factor
+        self.default_retry_after = default_retry_after
+        self.semaphore = semaphore
+
+        self.in_flight = 0
+        self.tokens = float(requests_per_second or 0)
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config, semaphore=None):
+        """ Builds a rate limiter from a DataLoaderConfig. """
+        return cls(
+            requests_per_second=config.rate_limit_requests_per_second,
+            initial_concurrency=config.rate_limit_initial_concurrency,
+            max_concurrency=config.rate_limit_max_concurrency,
+            default_retry_after=config.rate_limit_default_retry_after,
+            semaphore=semaphore,
+        )
+
+    def _refill(self, now):
+        if self.requests_per_second:
+            elapsed = now - self.last_refill
+            self.tokens = min(self.tokens + elapsed * self.requests_per_second, float(self.requests_per_second))
+        self.last_refill = now
+
+    def _get_wait_time(self, now):
+        """ Returns the number of seconds to wait before a request can start, or 0 if it can start now. """
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        if self.in_flight >= int(self.concurrency):
+            # We will be woken up when a request completes.
+            return None
+
+        if self.requests_per_second and self.tokens < 1:
+            return (1 - self.tokens) / self.requests_per_second
+
+        return 0
+
+    def acquire(self):
+        """ Blocks until a new request may be started. """
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._get_wait_time(now)
+
+                if wait == 0:
+                    if self.requests_per_second:
+                        self.tokens -= 1
+                    self.in_flight += 1
+                    break
+
+                self.condition.wait(wait)
+
+        # Wait for the other processes outside of the condition, so this process' other threads can still release.
+        if self.semaphore is not None:
+            self.semaphore.acquire()
+
+    def release(self, throttled=False, retry_after=None):
+        """ Records the completion of a request started after calling acquire().
+
+        Arguments:
+            throttled (bool): True if the upstream responded with a 429 or 503.
+            retry_after (float): Seconds the upstream asked us to wait before retrying.
+        """
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+        with self.condition:
+            self.in_flight -= 1
+
+            if throttled:
+                self.concurrency = max(self.concurrency * self.backoff_factor, 1.0)
+                pause = self.default_retry_after if retry_after is None else retry_after
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+                logger.warning(
+                    'Upstream is throttling requests. Pausing for %.1f seconds and reducing concurrency to %d.',
+                    pause, int(self.concurrency)
+                )
+            else:
+                self.concurrency = min(self.concurrency + 1 / self.concurrency, float(self.max_concurrency))
+
+            self.condition.notify_all()
+
+
+class RateLimitedAdapter(BaseAdapter):
+    """ Transport adapter that routes every request through a RateLimiter.
+
+    Throttled responses (429 and 503) are retried, honoring the Retry-After header, up to max_retries times. The last
+    throttled response is returned to the caller if the upstream never recovers.
+    """
+
+    def __init__(self, rate_limiter, adapter=None, max_retries=5):
+        super(RateLimitedAdapter, self).__init__()
+        self.rate_limiter = rate_limiter
+        self.adapter = adapter or HTTPAdapter()
+        self.max_retries = max_retries
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        attempt = 0
+
+        while True:
+            self.rate_limiter.acquire()
+            throttled = False
+            retry_after = None
+
+            try:
+                response = self.adapter.send(request, **kwargs)
+                throttled = response.status_code in THROTTLED_STATUS_CODES
+                if throttled:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            finally:
+                self.rate_limiter.release(throttled=throttled, retry_after=retry_after)
+
+            if not throttled or attempt >= self.max_retries:
+                return response
+
+            # Release the connection back to the pool before retrying.
+            response.close()
+            attempt += 1
+            logger.info('Request to [%s] was throttled with status [%d]. Retrying (attempt %d of %d)...',
+                        request.url, response.status_code, attempt, self.max_retries)
+
+    def close(self):
+        self.adapter.close()
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+_host_semaphores = {}
+
+
+def get_host(url):
+    return urlparse(url).netloc
+
+
+def set_host_semaphores(semaphores):
+    """
+    Registers semaphores, shared with other processes, which cap the number of concurrent requests made to each host.
+    Rate limiters created after this call use them.
+
+    Args:
+        semaphores (dict): Semaphores keyed by host.
+    """
+    with _rate_limiters_lock:
+        _host_semaphores.clear()
+        _host_semaphores.update(semaphores)
+        _rate_limiters.clear()
+
+
+def get_rate_limiter(url, config):
+    """
+    Returns the RateLimiter shared by all loaders in this process that make requests to the host of the given URL.
+
+    Args:
+        url (str): Any URL on the upstream host.
+        config (DataLoaderConfig): Configuration used to build the rate limiter, if one does not yet exist.
+
+    Returns:
+        RateLimiter
+    """
+    host = get_host(url)
+
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            _rate_limiters[host] = RateLimiter.from_config(config, semaphore=_host_semaphores.get(host))
+
+        return _rate_limiters[host]
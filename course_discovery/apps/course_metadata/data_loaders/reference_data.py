@@ -0,0 +1,123 @@
+import logging
+import threading
+
+from course_discovery.apps.core.models import Currency
+from course_discovery.apps.course_metadata.models import LevelType, Organization, SeatType
+from course_discovery.apps.ietf_language_tags.models import LanguageTag
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceDataCache(object):
+    """ In-memory cache of the small reference tables consulted while ingesting data.
+
+    Each table is loaded with a single query the first time it is needed, and is then served from memory for the
+    rest of the loader run. Rows created through the cache are added to it immediately. Loaders that create rows by
+    other means must call invalidate() so the table is reloaded the next time it is needed.
+
+    The cache is safe to share between the threads of a single loader.
+    """
+
+    def __init__(self, partner):
+        """
+        Arguments:
+            partner (Partner): Partner whose organizations are cached
+        """
+        self.partner = partner
+        self.lock = threading.RLock()
+        self.tables = {}
+
+    def _load(self, model):
+        """ Returns a dict of all rows of the given model, keyed as the lookups for the model expect. """
+        if model is Currency:
+            return {currency.code: currency for currency in Currency.objects.all()}
+        elif model is SeatType:
+            return {seat_type.slug: seat_type for seat_type in SeatType.objects.all()}
+        elif model is LevelType:
+            return {level_type.name: level_type for level_type in LevelType.objects.all()}
+        elif model is LanguageTag:
+            return {language_tag.code: language_tag for language_tag in LanguageTag.objects.all()}
+        elif model is Organization:
+            # Organization keys are matched case-insensitively.
+            return {
+                organization.lowercase_key: organization
+                for organization in Organization.objects.filter(partner=self.partner)
+            }
+
+        raise ValueError('Model [{}] is not cached.'.format(model.__name__))
+
+    def _get_table(self, model):
+        with self.lock:
+            table = self.tables.get(model)
+
+            if table is None:
+                table = self.tables[model] = self._load(model)
+                logger.debug('Cached %d %s rows.', len(table), model.__name__)
+
+            return table
+
+    def invalidate(self, model=None):
+        """
+        Discards the cached rows of the given model, or of all models if none is given. Models which are not cached
+        are ignored.
+
+        Arguments:
+            model (Model): Model whose rows have changed
+        """
+        with self.lock:
+            if model is None:
+                self.tables.clear()
+            else:
+                self.tables.pop(model, None)
+
+    def get_currency(self, code):
+        return self._get_table(Currency).get(code)
+
+    def get_currencies(self, codes):
+        """ Returns a dict mapping each of the given codes that exists to its Currency. """
+        table = self._get_table(Currency)
+        return {code: table[code] for code in codes if code in table}
+
+    def get_seat_type(self, slug):
+        return self._get_table(SeatType).get(slug)
+
+    def get_seat_types(self, slugs):
+        """ Returns a dict mapping each of the given slugs that exists to its SeatType. """
+        table = self._get_table(SeatType)
+        return {slug: table[slug] for slug in slugs if slug in table}
+
+    def get_language_tags(self, codes):
+        """ Returns the LanguageTags with the given codes, ordered by code. Unknown codes are ignored. """
+        table = self._get_table(LanguageTag)
+        return [table[code] for code in sorted({code for code in codes if code in table})]
+
+    def get_or_create_level_type(self, name):
+        with self.lock:
+            table = self._get_table(LevelType)
+            level_type = table.get(name)
+
+            if level_type is None:
+                level_type, __ = LevelType.objects.get_or_create(name=name)
+                table[name] = level_type
+
+            return level_type
+
+    def get_or_create_organization(self, key):
+        """
+        Returns the partner's organization with the given key, matched case-insensitively, creating it if necessary.
+
+        Returns:
+            tuple: (Organization, created)
+        """
+        with self.lock:
+            table = self._get_table(Organization)
+            organization = table.get(key.lower())
+            created = False
+
+            if organization is None:
+                organization, created = Organization.objects.get_or_create(
+                    lowercase_key=key.lower(), partner=self.partner, defaults={'key': key}
+                )
+                table[key.lower()] = organization
+
+            return organization, created
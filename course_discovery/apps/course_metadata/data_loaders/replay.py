@@ -0,0 +1,253 @@
+"""
+Record and replay upstream HTTP responses, so data loading can be benchmarked without access to the upstream services.
+
+A corpus is recorded by routing a real refresh through a RecordingAdapter, and saved as gzipped JSON lines (one
+response per line). A ReplayAdapter then serves the recorded responses, optionally adding latency, throttled (429)
+responses and extra pages, to simulate slower or larger upstream services.
+
+Corpora contain the data returned by the upstream services, including unpublished content, and must be handled
+accordingly.
+"""
+import base64
+import gzip
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+# Query parameters whose values change on every request (e.g. to bypass the marketing site's cache), or which identify
+# the service user, who is not known when responses are replayed.
+IGNORED_QUERY_PARAMS = ('cachebust', 'username')
+# Headers which do not apply to the decoded body stored in the corpus, or which should not be stored.
+IGNORED_HEADERS = ('content-encoding', 'content-length', 'set-cookie', 'transfer-encoding')
+
+
+def split_url(url):
+    """
+    Normalizes a URL, and separates its page number.
+
+    Returns:
+        tuple: The normalized URL without the page query parameter, and the page number (or None).
+    """
+    parsed = urlsplit(url)
+    query = []
+    page = None
+
+    for name, value in parse_qsl(parsed.query, keep_blank_values=True):
+        if name == 'page':
+            page = int(value)
+        elif name not in IGNORED_QUERY_PARAMS:
+            query.append((name, value))
+
+    url = urlunsplit((parsed.scheme, parsed.netloc, parsed.path, urlencode(sorted(query)), ''))
+    return url, page
+
+
+def get_page_url(url, page):
+    """ Returns the normalized URL of the given page. """
+    parsed = urlsplit(url)
+    query = sorted(parse_qsl(parsed.query, keep_blank_values=True) + [('page', str(page))])
+    return urlunsplit((parsed.scheme, parsed.netloc, parsed.path, urlencode(query), ''))
+
+
+def get_request_key(method, url):
+    url, page = split_url(url)
+
+    if page is not None:
+        url = get_page_url(url, page)
+
+    return '{method} {url}'.format(method=method.upper(), url=url)
+
+
+class Corpus(object):
+    """ Upstream responses, keyed by request method and normalized URL. """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.pages = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def load(cls, path):
+        corpus = cls()
+
+        with gzip.open(path, 'rt', encoding='utf8') as f:
+            for line in f:
+                corpus.add(json.loads(line))
+
+        return corpus
+
+    def save(self, path):
+        with self.lock, gzip.open(path, 'wt', encoding='utf8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, sort_keys=True) + '\n')
+
+    def add(self, entry):
+        url, page = split_url(entry['url'])
+
+        with self.lock:
+            # Later responses replace earlier ones, e.g. when a throttled request was retried.
+            self.entries[get_request_key(entry['method'], entry['url'])] = entry
+
+            if page is not None:
+                self.pages[(entry['method'].upper(), url)].add(page)
+
+    def record(self, request, response):
+        headers = {
+            name: value for name, value in response.headers.items() if name.lower() not in IGNORED_HEADERS
+        }
+
+        self.add({
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'headers': headers,
+            'body': base64.b64encode(response.content).decode('ascii'),
+        })
+
+    def get(self, method, url):
+        """
+        Returns the response recorded for the given request.
+
+        Returns:
+            dict: Status, headers and base64 encoded body of the response, or None if it was not recorded.
+        """
+        return self.entries.get(get_request_key(method, url))
+
+    def get_pages(self, method, url):
+        """ Returns the sorted page numbers recorded for the given URL, ignoring its page query parameter. """
+        url, __ = split_url(url)
+        return sorted(self.pages.get((method.upper(), url), ()))
+
+
+class RecordingAdapter(BaseAdapter):
+    """ Transport adapter which records every response received by the wrapped adapter in a corpus. """
+
+    def __init__(self, adapter, corpus):
+        super(RecordingAdapter, self).__init__()
+        self.adapter = adapter
+        self.corpus = corpus
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        response = self.adapter.send(request, **kwargs)
+        self.corpus.record(request, response)
+        return response
+
+    def close(self):
+        # The wrapped adapter is shared by many sessions.
+        pass
+
+
+class ReplayAdapter(BaseAdapter):
+    """ Transport adapter which serves recorded responses instead of calling the upstream services.
+
+    Requests which were not recorded receive a 404 response.
+    """
+
+    def __init__(self, corpus, latency=0, throttle_rate=0, page_multiplier=1, seed=None):
+        """
+        Arguments:
+            corpus (Corpus): Recorded responses.
+            latency (float): Seconds added to every request.
+            throttle_rate (float): Fraction of requests, between 0 and 1, answered with a 429 response.
+            page_multiplier (int): Number of times the recorded pages of paginated API responses are repeated, to
+                simulate a larger catalog. Only applies to responses with 'count' and 'next' pagination keys.
+            seed (int): Seed of the random number generator used to select throttled requests.
+        """
+        super(ReplayAdapter, self).__init__()
+        self.corpus = corpus
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.page_multiplier = max(page_multiplier, 1)
+        self.random = random.Random(seed)
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    def send(self, request, **_kwargs):  # pylint: disable=arguments-differ
+        with self.lock:
+            self.stats['requests'] += 1
+            throttled = self.random.random() < self.throttle_rate
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if throttled:
+            self.increment_stat('throttled')
+            return self.build_response(request, 429, {'Retry-After': '0'}, b'')
+
+        entry, body = self.get_response(request.method, request.url)
+
+        if entry is None:
+            self.increment_stat('missing')
+            logger.warning('No response was recorded for [%s %s].', request.method, request.url)
+            return self.build_response(request, 404, {}, b'')
+
+        return self.build_response(request, entry['status'], entry['headers'], body)
+
+    def increment_stat(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def get_response(self, method, url):
+        """
+        Returns the recorded response for the given request, and its body. Requests for pages beyond those recorded
+        are answered with one of the recorded pages if page_multiplier is set.
+        """
+        base_url, page = split_url(url)
+        pages = self.corpus.get_pages(method, url) if page and self.page_multiplier > 1 else []
+
+        if not pages:
+            entry = self.corpus.get(method, url)
+            return entry, base64.b64decode(entry['body']) if entry else None
+
+        entry = self.corpus.get(method, get_page_url(base_url, pages[(page - 1) % len(pages)]))
+        if entry is None:
+            return None, None
+
+        body = base64.b64decode(entry['body'])
+
+        try:
+            data = json.loads(body.decode('utf8'))
+        except ValueError:
+            return entry, body
+
+        # The Courses API nests its pagination details, other APIs include them with the results.
+        pagination = data.get('pagination', data) if isinstance(data, dict) else None
+        if not (isinstance(pagination, dict) and 'count' in pagination and 'next' in pagination):
+            return entry, body
+
+        page_count = len(pages) * self.page_multiplier
+        pagination['count'] *= self.page_multiplier
+        pagination['next'] = get_page_url(base_url, page + 1) if page < page_count else None
+        pagination['previous'] = get_page_url(base_url, page - 1) if page > 1 else None
+        if 'num_pages' in pagination:
+            pagination['num_pages'] = page_count
+
+        return entry, json.dumps(data).encode('utf8')
+
+    def build_response(self, request, status, headers, body):
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body  # pylint: disable=protected-access
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
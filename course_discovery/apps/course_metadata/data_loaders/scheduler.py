@@ -0,0 +1,204 @@
+import concurrent.futures
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class Task(object):
+    """ A unit of work run by the DependencyScheduler. """
+
+    def __init__(self, name, func, args, kwargs, dependencies):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.dependencies = tuple(dependencies)
+
+        self.result = None
+        self.started = None
+        self.finished = None
+
+    @property
+    def duration(self):
+        if self.started is None or self.finished is None:
+            return None
+
+        return self.finished - self.started
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+
+class DependencyScheduler(object):
+    """ Runs tasks as soon as all of the tasks they depend on have finished.
+
+    Tasks are started in the order they were added whenever more than one is ready. A task is started even if one of
+    its dependencies failed, since the data loaders are expected to cope with incomplete data. Dependencies on tasks
+    which were never added are ignored, which allows callers to skip tasks that do not apply (e.g. loaders for APIs
+    a partner does not have).
+    """
+
+    def __init__(self, max_workers=1, executor_class=None):
+        """
+        Arguments:
+            max_workers (int): Maximum number of tasks run at the same time.
+            executor_class (type): concurrent.futures.Executor subclass used to run tasks. If None, tasks are run
+                serially in the calling thread.
+        """
+        self.max_workers = max(max_workers or 1, 1)
+        self.executor_class = executor_class
+        self.tasks = OrderedDict()
+        self.start = None
+
+    def add(self, name, func, *args, dependencies=(), **kwargs):
+        """
+        Adds a task to be run.
+
+        Arguments:
+            name (str): Unique name of the task.
+            func (callable): Callable run by the task. It must be picklable if tasks are run in separate processes.
+            dependencies (iterable): Names of the tasks which must finish before this task is started.
+            args, kwargs: Arguments passed to func.
+        """
+        if name in self.tasks:
+            raise ValueError('Task [{}] has already been added.'.format(name))
+
+        self.tasks[name] = Task(name, func, args, kwargs, dependencies)
+
+    def _get_dependencies(self, task):
+        return [dependency for dependency in task.dependencies if dependency in self.tasks]
+
+    def _get_ready_tasks(self, pending, finished):
+        return [
+            task for task in pending.values()
+            if all(dependency in finished for dependency in self._get_dependencies(task))
+        ]
+
+    def run(self):
+        """
+        Runs all tasks, respecting their dependencies.
+
+        Returns:
+            dict: Result returned by each task, keyed by task name. The result is None for tasks which raised.
+        """
+        self.start = time.monotonic()
+        pending = OrderedDict(self.tasks)
+        finished = set()
+
+        if self.executor_class:
+            self._run_parallel(pending, finished)
+        else:
+            self._run_serial(pending, finished)
+
+        self.log_timings()
+
+        return OrderedDict((name, task.result) for name, task in self.tasks.items())
+
+    def _start(self, task, pending):
+        del pending[task.name]
+        task.started = time.monotonic()
+        logger.info('Starting %s...', task.name)
+
+    def _finish(self, task, finished, result=None):
+        task.finished = time.monotonic()
+        task.result = result
+        finished.add(task.name)
+        logger.info('Finished %s in %.1f seconds.', task.name, task.duration)
+
+    def _check_progress(self, ready, running, pending):
+        if pending and not ready and not running:
+            raise ValueError(
+                'Tasks [{}] have circular dependencies and cannot be run.'.format(', '.join(pending))
+            )
+
+    def _run_serial(self, pending, finished):
+        while pending:
+            ready = self._get_ready_tasks(pending, finished)
+            self._check_progress(ready, None, pending)
+
+            task = ready[0]
+            self._start(task, pending)
+
+            try:
+                result = task()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('%s failed!', task.name)
+                result = None
+
+            self._finish(task, finished, result)
+
+    def _run_parallel(self, pending, finished):
+        running = {}
+
+        with self.executor_class(max_workers=self.max_workers) as executor:
+            while pending or running:
+                ready = self._get_ready_tasks(pending, finished)
+                self._check_progress(ready, running, pending)
+
+                # Only submit as many tasks as there are workers, so tasks do not sit in the executor's queue and the
+                # recorded timings reflect the time spent running each task.
+                for task in ready[:self.max_workers - len(running)]:
+                    self._start(task, pending)
+                    running[executor.submit(task.func, *task.args, **task.kwargs)] = task
+
+                done, __ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in done:
+                    task = running.pop(future)
+
+                    try:
+                        result = future.result()
+                    except Exception:  # pylint: disable=broad-except
+                        logger.exception('%s failed!', task.name)
+                        result = None
+
+                    self._finish(task, finished, result)
+
+    def get_critical_path(self):
+        """
+        Returns the chain of dependent tasks with the longest total running time. This is the minimum wall time of
+        the run, regardless of the number of workers.
+
+        Returns:
+            tuple: List of task names, and the total duration in seconds.
+        """
+        paths = {}
+
+        def longest_path(task):
+            if task.name not in paths:
+                best = ([], 0.0)
+
+                for dependency in self._get_dependencies(task):
+                    path = longest_path(self.tasks[dependency])
+                    if path[1] > best[1]:
+                        best = path
+
+                paths[task.name] = (best[0] + [task.name], best[1] + (task.duration or 0.0))
+
+            return paths[task.name]
+
+        critical_path = ([], 0.0)
+        for task in self.tasks.values():
+            path = longest_path(task)
+            if path[1] > critical_path[1] or not critical_path[0]:
+                critical_path = path
+
+        return critical_path
+
+    def log_timings(self):
+        if not self.tasks:
+            return
+
+        for task in self.tasks.values():
+            logger.info(
+                '%s started after %.1f seconds and ran for %.1f seconds.',
+                task.name, task.started - self.start, task.duration
+            )
+
+        names, duration = self.get_critical_path()
+        logger.info(
+            'Ran %d tasks in %.1f seconds. The critical path took %.1f seconds: %s.',
+            len(self.tasks), time.monotonic() - self.start, duration, ' -> '.join(names)
+        )
@@ -2,6 +2,8 @@ import responses
 from edx_rest_api_client.auth import SuppliedJwtAuth
 from edx_rest_api_client.client import EdxRestApiClient
 
+from course_discovery.apps.core.http import get_http_adapter
+from course_discovery.apps.course_metadata.data_loaders.rate_limiter import RateLimitedAdapter
 from course_discovery.apps.course_metadata.tests.factories import PartnerFactory
 
 ACCESS_TOKEN = 'secret'
@@ -19,6 +21,12 @@ class ApiClientTestMixin(object):
         # may break if we ever change the underlying request class of EdxRestApiClient.
         self.assertIsInstance(client._store['session'].auth, SuppliedJwtAuth)  # pylint: disable=protected-access
 
+        # Verify requests are routed through the loader's rate limiter.
+        adapter = client._store['session'].get_adapter(self.api_url)  # pylint: disable=protected-access
+        self.assertIsInstance(adapter, RateLimitedAdapter)
+        self.assertIs(adapter.rate_limiter, loader.rate_limiter)
+        self.assertIs(adapter.adapter, get_http_adapter())
+
 
 # pylint: disable=not-callable
 class DataLoaderTestMixin(object):
@@ -5,27 +5,37 @@ from decimal import Decimal
 import ddt
 import mock
 import responses
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from pytz import UTC
 
+from course_discovery.apps.api.cache import api_change_receiver
+from course_discovery.apps.api.documents import defer_document_bumps
 from course_discovery.apps.core.tests.utils import mock_api_callback, mock_jpeg_callback
 from course_discovery.apps.course_metadata.choices import CourseRunPacing, CourseRunStatus
 from course_discovery.apps.course_metadata.data_loaders.api import (
     AbstractDataLoader, CoursesApiDataLoader, EcommerceApiDataLoader, OrganizationsApiDataLoader, ProgramsApiDataLoader
 )
 from course_discovery.apps.course_metadata.data_loaders.tests import JPEG, JSON, mock_data
-from course_discovery.apps.course_metadata.data_loaders.tests.mixins import ApiClientTestMixin, DataLoaderTestMixin
+from course_discovery.apps.course_metadata.data_loaders.tests.mixins import (
+    ACCESS_TOKEN, ACCESS_TOKEN_TYPE, ApiClientTestMixin, DataLoaderTestMixin
+)
+from course_discovery.apps.course_metadata.data_loaders.transactions import TransactionBatch
 from course_discovery.apps.course_metadata.models import (
-    Course, CourseEntitlement, CourseRun, Organization, Program, ProgramType, Seat, SeatType
+    Course, CourseEntitlement, CourseRun, DataLoaderCheckpoint, DataLoaderFingerprint, Organization, Program,
+    ProgramType, Seat, SeatType
 )
 from course_discovery.apps.course_metadata.tests.factories import (
-    CourseEntitlementFactory, CourseFactory, CourseRunFactory, ImageFactory, OrganizationFactory, SeatFactory,
-    VideoFactory
+    CourseEntitlementFactory, CourseFactory, CourseRunFactory, ImageFactory, OrganizationFactory, PartnerFactory,
+    SeatFactory, VideoFactory
 )
 
 LOGGER_PATH = 'course_discovery.apps.course_metadata.data_loaders.api.logger'
 
 
+@ddt.ddt
 class AbstractDataLoaderTest(TestCase):
     def test_clean_string(self):
         """ Verify the method leading and trailing spaces, and returns None for empty strings. """
@@ -72,6 +82,91 @@ class AbstractDataLoaderTest(TestCase):
         for content, expected in data:
             self.assertEqual(AbstractDataLoader.clean_html(content), expected)
 
+    def test_get_fingerprint(self):
+        """ Verify the fingerprint does not depend on key order, but does depend on values. """
+        fingerprint = AbstractDataLoader.get_fingerprint({'a': 1, 'b': 'two'})
+        self.assertEqual(AbstractDataLoader.get_fingerprint({'b': 'two', 'a': 1}), fingerprint)
+        self.assertNotEqual(AbstractDataLoader.get_fingerprint({'a': 1, 'b': 'three'}), fingerprint)
+
+    def test_update_instance(self):
+        """ Verify instances are only saved if the validated data changes them. """
+        course_run = CourseRunFactory(title_override='Title')
+        partner = course_run.course.partner
+        loader = CoursesApiDataLoader(partner, partner.courses_api_url)
+        validated_data = {
+            'key': course_run.key,
+            'uuid': str(course_run.uuid),
+            'course': course_run.course,
+            'start': course_run.start,
+            'title_override': 'Title',
+        }
+
+        with mock.patch.object(course_run, 'save') as mock_save:
+            self.assertFalse(loader._update_instance(course_run, validated_data))  # pylint: disable=protected-access
+            self.assertFalse(mock_save.called)
+
+            validated_data['title_override'] = 'New Title'
+            self.assertTrue(loader._update_instance(course_run, validated_data))  # pylint: disable=protected-access
+            mock_save.assert_called_once_with()
+
+        self.assertEqual(course_run.title_override, 'New Title')
+        self.assertEqual(loader.stats['unchanged'], 1)
+        self.assertEqual(loader.stats['updated'], 1)
+
+    @ddt.data(True, False)
+    def test_save_checkpoint(self, incremental):
+        """ Verify fingerprints and the high-water mark are persisted, and only used by incremental runs. """
+        partner = PartnerFactory()
+        loader = OrganizationsApiDataLoader(partner, partner.organizations_api_url, incremental=incremental)
+        fingerprint = loader.get_fingerprint({'short_name': 'edX'})
+        self.assertFalse(loader.is_unchanged('edX', fingerprint))
+
+        loader.record_fingerprint('edX', fingerprint)
+        loader.save_checkpoint()
+
+        checkpoint = DataLoaderCheckpoint.objects.get(partner=partner, loader='OrganizationsApiDataLoader')
+        self.assertEqual(checkpoint.high_water_mark, loader.started)
+        self.assertEqual(
+            DataLoaderFingerprint.objects.get(partner=partner, key='edX').fingerprint,
+            fingerprint
+        )
+
+        loader = OrganizationsApiDataLoader(partner, partner.organizations_api_url, incremental=incremental)
+        self.assertEqual(loader.is_unchanged('edX', fingerprint), incremental)
+        self.assertEqual(loader.get_since(), checkpoint.high_water_mark if incremental else None)
+
+    def test_save_checkpoint_with_failures(self):
+        """ Verify the high-water mark is not moved past records which failed to load. """
+        partner = PartnerFactory()
+        loader = OrganizationsApiDataLoader(partner, partner.organizations_api_url, incremental=True)
+        fingerprint = loader.get_fingerprint({'short_name': 'edX'})
+
+        loader.record_fingerprint('edX', fingerprint)
+        loader.increment_stat('failed')
+        loader.save_checkpoint()
+
+        checkpoints = DataLoaderCheckpoint.objects.filter(partner=partner, high_water_mark__isnull=False)
+        self.assertFalse(checkpoints.exists())
+        self.assertTrue(DataLoaderFingerprint.objects.filter(partner=partner, key='edX').exists())
+
+    def test_record_fingerprint_rolled_back(self):
+        """ Verify fingerprints of records whose batch is rolled back are not saved. """
+        partner = PartnerFactory()
+        loader = OrganizationsApiDataLoader(partner, partner.organizations_api_url, incremental=True)
+        fingerprint = loader.get_fingerprint({'short_name': 'edX'})
+
+        with self.assertRaises(ValueError):
+            with TransactionBatch(10) as batch:
+                with batch.record():
+                    OrganizationFactory(partner=partner, key='edX')
+                loader.record_fingerprint('edX', fingerprint, batch)
+                raise ValueError
+
+        loader.save_checkpoint()
+
+        self.assertEqual(loader.changed_fingerprints, {})
+        self.assertFalse(DataLoaderFingerprint.objects.filter(partner=partner, key='edX').exists())
+
 
 @ddt.ddt
 class OrganizationsApiDataLoaderTests(ApiClientTestMixin, DataLoaderTestMixin, TestCase):
@@ -127,6 +222,21 @@ class OrganizationsApiDataLoaderTests(ApiClientTestMixin, DataLoaderTestMixin, T
         # Verify multiple calls to ingest data do NOT result in data integrity errors.
         self.loader.ingest()
 
+    @responses.activate
+    def test_run(self):
+        """ Verify the method ingests data, and returns the metrics collected while doing so. """
+        api_data = self.mock_api()
+
+        metrics = self.loader.run()
+
+        self.assertEqual(Organization.objects.count(), len(api_data))
+        self.assertEqual(metrics['counters']['pages_fetched'], 1)
+        self.assertEqual(metrics['counters']['created'], len(api_data))
+        self.assertGreater(metrics['counters']['db_queries'], 0)
+        self.assertGreater(metrics['counters']['db_rows_written'], 0)
+        self.assertIn('total', metrics['timings'])
+        self.assertEqual(metrics['latency']['count'], 1)
+
     @responses.activate
     def test_ingest_respects_partner(self):
         """
@@ -145,6 +255,23 @@ class OrganizationsApiDataLoaderTests(ApiClientTestMixin, DataLoaderTestMixin, T
 
         assert Organization.objects.count() == len(api_data) + 1
 
+    @responses.activate
+    def test_ingest_incremental(self):
+        """ Verify incremental runs skip organizations whose data has not changed since the last run. """
+        api_data = self.mock_api()
+        self.loader.ingest()
+
+        loader = self.loader_class(self.partner, self.api_url, ACCESS_TOKEN, ACCESS_TOKEN_TYPE, incremental=True)
+        with mock.patch.object(loader, 'update_organization') as mock_update:
+            loader.ingest()
+            self.assertFalse(mock_update.called)
+
+        # Full refreshes process every organization.
+        loader = self.loader_class(self.partner, self.api_url, ACCESS_TOKEN, ACCESS_TOKEN_TYPE)
+        with mock.patch.object(loader, 'update_organization') as mock_update:
+            loader.ingest()
+            self.assertEqual(mock_update.call_count, len(api_data))
+
 
 @ddt.ddt
 class CoursesApiDataLoaderTests(ApiClientTestMixin, DataLoaderTestMixin, TestCase):
@@ -237,6 +364,31 @@ class CoursesApiDataLoaderTests(ApiClientTestMixin, DataLoaderTestMixin, TestCas
         # Verify multiple calls to ingest data do NOT result in data integrity errors.
         self.loader.ingest()
 
+    @responses.activate
+    def test_ingest_skips_unchanged_course_runs(self):
+        """ Verify course runs are not saved again if the API data has not changed. """
+        api_data = self.mock_api()
+        self.loader.ingest()
+
+        loader = self.loader_class(self.partner, self.api_url, ACCESS_TOKEN, ACCESS_TOKEN_TYPE)
+        with mock.patch.object(CourseRun, 'save') as mock_save:
+            loader.ingest()
+            self.assertFalse(mock_save.called)
+
+        self.assertEqual(loader.stats['updated'], 0)
+        self.assertEqual(loader.stats['unchanged'], len(api_data))
+
+    @responses.activate
+    def test_ingest_since(self):
+        """ Verify the Courses API is only asked for the course runs changed after the given time. """
+        self.mock_api()
+        since = datetime.datetime(2018, 1, 1, tzinfo=UTC)
+        loader = self.loader_class(self.partner, self.api_url, ACCESS_TOKEN, ACCESS_TOKEN_TYPE, since=since)
+        loader.ingest()
+
+        for call in responses.calls:
+            self.assertIn('modified_since=2018-01-01T00%3A00%3A00%2B00%3A00', call.request.url)
+
     @responses.activate
     def test_ingest_exception_handling(self):
         """ Verify the data loader properly handles exceptions during processing of the data from the API. """
@@ -621,6 +773,49 @@ class EcommerceApiDataLoaderTests(ApiClientTestMixin, DataLoaderTestMixin, TestC
         # Verify multiple calls to ingest data do NOT result in data integrity errors.
         self.loader.ingest()
 
+    def test_update_seats_queries(self):
+        """
+        Verify the number of queries made to load a page of seats does not grow with the size of the page, when it is
+        loaded as refresh_course_metadata loads it: without API change receivers, and with deferred document
+        invalidations.
+        """
+        bodies = self.mock_courses_api()[:-2]
+        for signal in (post_save, post_delete):
+            signal.disconnect(api_change_receiver, sender=Seat)
+            self.addCleanup(signal.connect, api_change_receiver, sender=Seat)
+
+        with CaptureQueriesContext(connection) as single_run_queries, defer_document_bumps():
+            self.assertEqual(self.loader.update_seats(bodies[:1]), [bodies[0]['id']])
+
+        with CaptureQueriesContext(connection) as page_queries, defer_document_bumps():
+            self.assertEqual(self.loader.update_seats(bodies), [body['id'] for body in bodies])
+
+        self.assertLessEqual(len(page_queries), len(single_run_queries))
+
+        # Loading the same page again should find every seat unchanged.
+        self.loader.stats.clear()
+        self.loader.update_seats(bodies)
+        self.assertEqual(self.loader.stats['created'], 0)
+        self.assertEqual(self.loader.stats['updated'], 0)
+
+    def test_bulk_update(self):
+        """ Verify rows with the same changes are updated with a single query, and unchanged rows are skipped. """
+        seats = SeatFactory.create_batch(3, price=Decimal('10.00'))
+        updates = [
+            (seats[0], {'price': Decimal('20.00')}),
+            (seats[1], {'price': Decimal('20.00')}),
+            (seats[2], {'price': Decimal('10.00')}),
+        ]
+
+        with mock.patch('course_discovery.apps.course_metadata.data_loaders.api.bump_documents') as mock_bump:
+            with self.assertNumQueries(1):
+                self.loader._bulk_update(Seat, updates)  # pylint: disable=protected-access
+
+        mock_bump.assert_called_once_with(Seat, seats[:2])
+        self.assertEqual([seat.price for seat in Seat.objects.order_by('pk')], [20, 20, 10])
+        self.assertEqual(self.loader.stats['updated'], 2)
+        self.assertEqual(self.loader.stats['unchanged'], 1)
+
     @responses.activate
     @mock.patch(LOGGER_PATH)
     def test_ingest_deletes(self, mock_logger):
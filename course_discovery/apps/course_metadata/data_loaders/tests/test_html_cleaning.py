@@ -0,0 +1,78 @@
+import datetime
+import threading
+
+import mock
+from django.test import TestCase
+from django.utils import timezone
+
+from course_discovery.apps.course_metadata.data_loaders import html_cleaning
+from course_discovery.apps.course_metadata.models import CleanedHtml
+
+CONTENT = '<p class="lead">Hello&amp;world&nbsp;!</p>'
+CLEANED = 'Hello&world!'
+
+
+class CleanHtmlTests(TestCase):
+    def setUp(self):
+        super(CleanHtmlTests, self).setUp()
+        html_cleaning.clean_html.cache_clear()
+        self.addCleanup(html_cleaning.clean_html.cache_clear)
+
+    def test_clean_html(self):
+        """ Verify cleaned HTML is saved, keyed by the hash of the original HTML. """
+        self.assertEqual(html_cleaning.clean_html(CONTENT), CLEANED)
+
+        cleaned_html = CleanedHtml.objects.get()
+        self.assertEqual(cleaned_html.hash, html_cleaning.get_hash(CONTENT))
+        self.assertEqual(cleaned_html.html, CLEANED)
+
+    def test_clean_html_memoized(self):
+        """ Verify HTML cleaned before, in this process or by a previous refresh, is not cleaned again. """
+        with mock.patch.object(html_cleaning, 'convert_html', wraps=html_cleaning.convert_html) as mock_convert:
+            html_cleaning.clean_html(CONTENT)
+            html_cleaning.clean_html(CONTENT)
+            self.assertEqual(mock_convert.call_count, 1)
+
+            html_cleaning.clean_html.cache_clear()
+
+            with self.assertNumQueries(1):
+                self.assertEqual(html_cleaning.clean_html(CONTENT), CLEANED)
+            self.assertEqual(mock_convert.call_count, 1)
+
+    def test_clean_html_version(self):
+        """ Verify HTML cleaned by a previous version of the cleaning code is cleaned again. """
+        CleanedHtml.objects.create(hash=html_cleaning.get_hash(CONTENT), html='Stale')
+
+        with mock.patch.object(html_cleaning, 'VERSION', 'next'):
+            self.assertEqual(html_cleaning.clean_html(CONTENT), CLEANED)
+
+        self.assertEqual(CleanedHtml.objects.count(), 2)
+
+    def test_prune_cleaned_html(self):
+        """ Verify cleaned HTML is deleted once it is older than the retention period. """
+        html_cleaning.clean_html(CONTENT)
+        stale = CleanedHtml.objects.create(hash='stale', html='Stale')
+        CleanedHtml.objects.filter(pk=stale.pk).update(
+            created=timezone.now() - html_cleaning.RETENTION - datetime.timedelta(seconds=1)
+        )
+
+        self.assertEqual(html_cleaning.prune_cleaned_html(), 1)
+        self.assertEqual(list(CleanedHtml.objects.values_list('hash', flat=True)), [html_cleaning.get_hash(CONTENT)])
+
+    def test_get_markdown_converter(self):
+        """ Verify each thread reuses its own Markdown converter. """
+        converter = html_cleaning.get_markdown_converter()
+        self.assertIs(html_cleaning.get_markdown_converter(), converter)
+
+        converters = []
+        thread = threading.Thread(target=lambda: converters.append(html_cleaning.get_markdown_converter()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(converters[0], converter)
+
+    def test_convert_html_independent(self):
+        """ Verify converting a document is not affected by the documents converted before it. """
+        html_cleaning.convert_html('<blockquote><p>Quoted')
+        html_cleaning.convert_html('<p>Footnote[^1]</p>')
+
+        self.assertEqual(html_cleaning.convert_html('<p>Hello!</p>'), 'Hello!')
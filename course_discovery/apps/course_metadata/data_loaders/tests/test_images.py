@@ -0,0 +1,116 @@
+import mock
+import responses
+from django.test import TestCase
+
+from course_discovery.apps.core.http import get_session
+from course_discovery.apps.core.tests.helpers import make_image_stream
+from course_discovery.apps.course_metadata.data_loaders.images import ImagePipeline
+from course_discovery.apps.course_metadata.data_loaders.metrics import LoaderMetrics
+from course_discovery.apps.course_metadata.models import DataLoaderImage, Program
+from course_discovery.apps.course_metadata.tests.factories import ProgramFactory
+
+IMAGE_URL = 'https://example.com/banner.jpg'
+ETAG = '"abc"'
+
+
+class ImagePipelineTests(TestCase):
+    def setUp(self):
+        super(ImagePipelineTests, self).setUp()
+        self.program = ProgramFactory()
+        self.image = make_image_stream(1440, 480).getvalue()
+        self.requests = []
+
+    def mock_image(self, status=200, content=None):
+        def request_callback(request):
+            self.requests.append(request)
+            return status, {'ETag': ETAG}, content or self.image
+
+        responses.add_callback(responses.GET, IMAGE_URL, callback=request_callback, content_type='image/jpeg')
+
+    def load_image(self, previous_url=IMAGE_URL):
+        metrics = LoaderMetrics()
+        pipeline = ImagePipeline(get_session(), 2, metrics)
+
+        with mock.patch('course_discovery.apps.course_metadata.data_loaders.images.custom_render_variations') as \
+                mock_render:
+            pipeline.submit(self.program, 'banner_image', IMAGE_URL, 'banner.jpg', previous_url=previous_url)
+            pipeline.close()
+
+        self.program.refresh_from_db()
+        return metrics.counters, mock_render
+
+    @responses.activate
+    def test_save(self):
+        """ Verify downloaded images are saved, their variations rendered, and their validators recorded. """
+        self.mock_image()
+        counters, mock_render = self.load_image()
+
+        self.assertTrue(self.program.banner_image)
+        self.assertEqual(counters['images_saved'], 1)
+        mock_render.assert_called_once_with(
+            self.program.banner_image.name, Program.banner_image.field.variations, self.program.banner_image.storage
+        )
+
+        image = DataLoaderImage.objects.get(url=IMAGE_URL)
+        self.assertEqual(image.etag, ETAG)
+        self.assertNotIn('If-None-Match', self.requests[0].headers)
+
+    @responses.activate
+    def test_not_modified(self):
+        """ Verify images which have not changed since they were last downloaded are not saved again. """
+        self.mock_image()
+        self.load_image()
+        name = self.program.banner_image.name
+
+        responses.reset()
+        self.mock_image(status=304, content=b'')
+        counters, mock_render = self.load_image()
+
+        self.assertEqual(self.requests[-1].headers['If-None-Match'], ETAG)
+        self.assertEqual(self.program.banner_image.name, name)
+        self.assertEqual(counters['images_unchanged'], 1)
+        self.assertFalse(mock_render.called)
+
+    @responses.activate
+    def test_same_content(self):
+        """ Verify images whose content has not changed are not saved again, even if they are downloaded. """
+        self.mock_image()
+        self.load_image()
+        name = self.program.banner_image.name
+
+        counters, mock_render = self.load_image()
+
+        self.assertEqual(self.program.banner_image.name, name)
+        self.assertEqual(counters['images_unchanged'], 1)
+        self.assertFalse(mock_render.called)
+
+        responses.reset()
+        self.mock_image(content=make_image_stream(1440, 481).getvalue())
+        counters, mock_render = self.load_image()
+
+        self.assertNotEqual(self.program.banner_image.name, name)
+        self.assertEqual(counters['images_saved'], 1)
+
+    @responses.activate
+    def test_changed_url(self):
+        """ Verify images are saved if the field holds an image from another URL, even if their content is known. """
+        self.mock_image()
+        self.load_image()
+        name = self.program.banner_image.name
+
+        counters, mock_render = self.load_image(previous_url='https://example.com/other.jpg')
+
+        self.assertNotIn('If-None-Match', self.requests[-1].headers)
+        self.assertNotEqual(self.program.banner_image.name, name)
+        self.assertEqual(counters['images_saved'], 1)
+        self.assertTrue(mock_render.called)
+
+    @responses.activate
+    def test_failed(self):
+        """ Verify failed downloads are counted, and leave the instance unchanged. """
+        self.mock_image(status=500)
+        counters, __ = self.load_image()
+
+        self.assertFalse(self.program.banner_image)
+        self.assertEqual(counters['images_failed'], 1)
+        self.assertFalse(DataLoaderImage.objects.exists())
@@ -614,7 +614,7 @@ class CourseMarketingSiteDataLoaderTests(AbstractMarketingSiteDataLoaderTestMixi
             lc.check(
                 (
                     marketing_site_logger.name,
-                    'INFO',
+                    'DEBUG',
                     'Course_run [{}] has uuid [{}] already on course about page. No need to ingest'.format(
                         mock_data.DISCOVERY_CREATED_MARKETING_SITE_API_COURSE_BODY['field_course_id'],
                         mock_data.DISCOVERY_CREATED_MARKETING_SITE_API_COURSE_BODY['field_course_uuid'])
@@ -636,13 +636,13 @@ class CourseMarketingSiteDataLoaderTests(AbstractMarketingSiteDataLoaderTestMixi
             lc.check(
                 (
                     marketing_site_logger.name,
-                    'INFO',
+                    'DEBUG',
                     'Processed course run with UUID [{}].'.format(
                         mock_data.UPDATED_MARKETING_SITE_API_COURSE_BODY['uuid'])
                 ),
                 (
                     marketing_site_logger.name,
-                    'INFO',
+                    'DEBUG',
                     'Course_run [{}] is unpublished, so the course [{}] related is not updated.'.format(
                         mock_data.ORIGINAL_MARKETING_SITE_API_COURSE_BODY['field_course_id'],
                         mock_data.ORIGINAL_MARKETING_SITE_API_COURSE_BODY['field_course_code'])
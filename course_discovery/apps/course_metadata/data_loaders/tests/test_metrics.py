@@ -0,0 +1,53 @@
+import mock
+from django.test import TestCase
+
+from course_discovery.apps.course_metadata.data_loaders.metrics import LoaderMetrics, build_report, get_percentile
+
+
+class LoaderMetricsTests(TestCase):
+    def test_get_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(get_percentile(values, 50), 50)
+        self.assertEqual(get_percentile(values, 99), 99)
+        self.assertEqual(get_percentile([7], 90), 7)
+        self.assertIsNone(get_percentile([], 50))
+
+    def test_as_dict(self):
+        metrics = LoaderMetrics()
+        metrics.increment('created')
+        metrics.increment('created', 2)
+        metrics.add_time('clean_html', 0.25)
+
+        for latency in (0.3, 0.1, 0.2):
+            metrics.record_latency(latency)
+
+        with mock.patch('time.monotonic', side_effect=[10, 11.5]):
+            with metrics.timer('clean_html'):
+                pass
+
+        self.assertEqual(metrics.as_dict(), {
+            'counters': {'created': 3},
+            'timings': {'clean_html': 1.75},
+            'latency': {'count': 3, 'p50': 0.2, 'p90': 0.3, 'p99': 0.3, 'max': 0.3},
+        })
+
+    def test_build_report(self):
+        """ Verify results are grouped by partner, and their counters and timings summed. """
+        metrics = {'counters': {'created': 1, 'failed': 1}, 'timings': {'total': 2.0}}
+        results = [
+            {'partner': 'edx', 'loader': 'CoursesApiDataLoader', 'succeeded': True, 'metrics': metrics},
+            {'partner': 'edx', 'loader': 'ProgramsApiDataLoader', 'succeeded': True, 'metrics': metrics},
+            {'partner': 'mitx', 'loader': 'CoursesApiDataLoader', 'succeeded': False, 'metrics': None},
+        ]
+
+        report = build_report(results)
+
+        self.assertFalse(report['succeeded'])
+        self.assertEqual(list(report['partners']), ['edx', 'mitx'])
+
+        edx = report['partners']['edx']
+        self.assertTrue(edx['succeeded'])
+        self.assertEqual(edx['counters'], {'created': 2, 'failed': 2})
+        self.assertEqual(edx['timings'], {'total': 4.0})
+        self.assertEqual(edx['loaders']['ProgramsApiDataLoader'], results[1])
+        self.assertFalse(report['partners']['mitx']['succeeded'])
@@ -0,0 +1,65 @@
+import concurrent.futures
+import threading
+
+from django.test import TestCase
+
+from course_discovery.apps.course_metadata.data_loaders.prefetch import prefetch
+
+
+class PrefetchTests(TestCase):
+    def setUp(self):
+        super(PrefetchTests, self).setUp()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_ordered(self):
+        """ Verify results are yielded in the order of the items. """
+        results = list(prefetch(self.executor, lambda page: page * 10, range(1, 6), window=2))
+        self.assertEqual(results, [(1, 10), (2, 20), (3, 30), (4, 40), (5, 50)])
+
+    def test_unordered(self):
+        """ Verify a slow call does not hold back the results of later calls. """
+        release_first_page = threading.Event()
+
+        def request(page):
+            if page == 1:
+                release_first_page.wait(5)
+            return page
+
+        results = []
+        for page, __ in prefetch(self.executor, request, [1, 2], window=2, ordered=False):
+            results.append(page)
+            release_first_page.set()
+
+        self.assertEqual(results, [2, 1])
+
+    def test_backpressure(self):
+        """ Verify items are only consumed as results are taken, keeping at most `window` calls in flight. """
+        consumed = []
+
+        def pages():
+            for page in range(1, 11):
+                consumed.append(page)
+                yield page
+
+        iterator = prefetch(self.executor, lambda page: page, pages(), window=3)
+        self.assertEqual(next(iterator), (1, 1))
+
+        # Three pages were requested up front, and the fourth replaced the first when its result was taken.
+        self.assertEqual(consumed, [1, 2, 3, 4])
+
+        iterator.close()
+        self.assertEqual(consumed, [1, 2, 3, 4])
+
+    def test_exception(self):
+        """ Verify exceptions raised by a call are raised when its result is reached. """
+        def request(page):
+            if page == 2:
+                raise ValueError
+            return page
+
+        iterator = prefetch(self.executor, request, range(1, 4), window=2)
+        self.assertEqual(next(iterator), (1, 1))
+
+        with self.assertRaises(ValueError):
+            next(iterator)
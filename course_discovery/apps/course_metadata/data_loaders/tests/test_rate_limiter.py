@@ -0,0 +1,134 @@
+import ddt
+import mock
+import requests
+import responses
+from django.test import TestCase
+
+from course_discovery.apps.course_metadata.data_loaders.rate_limiter import (
+    RateLimitedAdapter, RateLimiter, get_rate_limiter, parse_retry_after, set_host_semaphores
+)
+from course_discovery.apps.course_metadata.models import DataLoaderConfig
+
+URL = 'https://lms.example.com/api/courses/v1/courses/'
+
+
+@ddt.ddt
+class RateLimiterTests(TestCase):
+    @ddt.data(
+        (None, None),
+        ('', None),
+        ('120', 120.0),
+        (' 5 ', 5.0),
+        ('not-a-date', None),
+    )
+    @ddt.unpack
+    def test_parse_retry_after(self, value, expected):
+        """ Verify both delta-seconds and unparseable values are handled. """
+        self.assertEqual(parse_retry_after(value), expected)
+
+    def test_parse_retry_after_http_date(self):
+        """ Verify HTTP dates in the past are converted to a zero-second wait. """
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+
+    def test_concurrency_grows_while_healthy(self):
+        """ Verify the concurrency window grows with healthy responses, but never beyond the maximum. """
+        limiter = RateLimiter(initial_concurrency=1, max_concurrency=3)
+
+        for __ in range(20):
+            limiter.acquire()
+            limiter.release()
+
+        self.assertEqual(limiter.concurrency, 3)
+        self.assertEqual(limiter.in_flight, 0)
+
+    @mock.patch('time.monotonic', return_value=100.0)
+    def test_throttled_response(self, __):
+        """ Verify throttling cuts the concurrency window and pauses new requests for the Retry-After period. """
+        limiter = RateLimiter(initial_concurrency=4, max_concurrency=4)
+        limiter.acquire()
+        limiter.release(throttled=True, retry_after=15)
+
+        self.assertEqual(limiter.concurrency, 2)
+        self.assertEqual(limiter.paused_until, 115.0)
+        self.assertEqual(limiter._get_wait_time(100.0), 15.0)  # pylint: disable=protected-access
+
+    @mock.patch('time.monotonic', return_value=100.0)
+    def test_throttled_response_without_retry_after(self, __):
+        """ Verify the default pause is used when the upstream does not specify one. """
+        limiter = RateLimiter(default_retry_after=30)
+        limiter.acquire()
+        limiter.release(throttled=True)
+
+        self.assertEqual(limiter.paused_until, 130.0)
+
+    def test_token_bucket(self):
+        """ Verify requests wait for a token once the bucket is empty. """
+        limiter = RateLimiter(requests_per_second=2, initial_concurrency=10, max_concurrency=10)
+        now = limiter.last_refill
+
+        self.assertEqual(limiter._get_wait_time(now), 0)  # pylint: disable=protected-access
+        limiter.tokens = 0
+        self.assertEqual(limiter._get_wait_time(now), 0.5)  # pylint: disable=protected-access
+
+    def test_shared_semaphore(self):
+        """ Verify the semaphore shared with other processes is held while a request is in flight. """
+        semaphore = mock.Mock()
+        limiter = RateLimiter(semaphore=semaphore)
+
+        limiter.acquire()
+        semaphore.acquire.assert_called_once_with()
+        self.assertFalse(semaphore.release.called)
+
+        limiter.release()
+        semaphore.release.assert_called_once_with()
+
+    def test_set_host_semaphores(self):
+        """ Verify rate limiters created after registering host semaphores use them. """
+        config = DataLoaderConfig.get_solo()
+        semaphore = mock.Mock()
+
+        try:
+            set_host_semaphores({'lms.example.com': semaphore})
+            self.assertIs(get_rate_limiter(URL, config).semaphore, semaphore)
+            self.assertIsNone(get_rate_limiter('https://ecommerce.example.com/api/v2/', config).semaphore)
+        finally:
+            set_host_semaphores({})
+
+    def test_get_rate_limiter(self):
+        """ Verify loaders calling the same host share a rate limiter. """
+        config = DataLoaderConfig.get_solo()
+        limiter = get_rate_limiter(URL, config)
+
+        self.assertIs(get_rate_limiter('https://lms.example.com/api/organizations/v0/', config), limiter)
+        self.assertIsNot(get_rate_limiter('https://ecommerce.example.com/api/v2/', config), limiter)
+
+
+class RateLimitedAdapterTests(TestCase):
+    def setUp(self):
+        super(RateLimitedAdapterTests, self).setUp()
+        self.limiter = RateLimiter(initial_concurrency=2, max_concurrency=2, default_retry_after=0)
+        self.session = requests.Session()
+        self.session.mount('https://', RateLimitedAdapter(self.limiter, max_retries=2))
+
+    @responses.activate
+    def test_retry_after_throttling(self):
+        """ Verify throttled requests are retried and the successful response is returned. """
+        responses.add(responses.GET, URL, status=429, adding_headers={'Retry-After': '0'})
+        responses.add(responses.GET, URL, status=503)
+        responses.add(responses.GET, URL, status=200, json={})
+
+        response = self.session.get(URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(responses.calls), 3)
+        self.assertEqual(self.limiter.in_flight, 0)
+
+    @responses.activate
+    def test_retries_exhausted(self):
+        """ Verify the throttled response is returned once all retries have been used. """
+        responses.add(responses.GET, URL, status=429, adding_headers={'Retry-After': '0'})
+
+        response = self.session.get(URL)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(responses.calls), 3)
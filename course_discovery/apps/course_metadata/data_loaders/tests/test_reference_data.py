@@ -0,0 +1,78 @@
+from django.test import TestCase
+
+from course_discovery.apps.core.models import Currency
+from course_discovery.apps.core.tests.factories import PartnerFactory
+from course_discovery.apps.course_metadata.data_loaders.reference_data import ReferenceDataCache
+from course_discovery.apps.course_metadata.models import LevelType, Organization, SeatType
+from course_discovery.apps.course_metadata.tests.factories import LevelTypeFactory, OrganizationFactory, SeatTypeFactory
+from course_discovery.apps.ietf_language_tags.models import LanguageTag
+
+
+class ReferenceDataCacheTests(TestCase):
+    def setUp(self):
+        super(ReferenceDataCacheTests, self).setUp()
+        self.partner = PartnerFactory()
+        self.cache = ReferenceDataCache(self.partner)
+
+    def test_get_currencies(self):
+        """ Verify currencies are loaded once, and unknown codes are ignored. """
+        usd = Currency.objects.get(code='USD')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cache.get_currencies(['USD', 'NRC']), {'USD': usd})
+            self.assertEqual(self.cache.get_currency('USD'), usd)
+            self.assertIsNone(self.cache.get_currency('NRC'))
+
+    def test_get_seat_types(self):
+        seat_type = SeatTypeFactory()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cache.get_seat_types([seat_type.slug, 'bogus']), {seat_type.slug: seat_type})
+            self.assertEqual(self.cache.get_seat_type(seat_type.slug), seat_type)
+
+    def test_get_language_tags(self):
+        expected = list(LanguageTag.objects.filter(code__in=('en-us', 'zh-cmn')).order_by('code'))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cache.get_language_tags(['zh-cmn', None, 'en-us', 'zh-cmn']), expected)
+
+    def test_get_or_create_level_type(self):
+        """ Verify existing level types are served from memory, and created level types are added to the cache. """
+        existing = LevelTypeFactory(name='Introductory')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cache.get_or_create_level_type('Introductory'), existing)
+
+        created = self.cache.get_or_create_level_type('Advanced')
+        self.assertEqual(LevelType.objects.get(name='Advanced'), created)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.get_or_create_level_type('Advanced'), created)
+
+    def test_get_or_create_organization(self):
+        """ Verify organizations are matched case-insensitively, and only within the partner. """
+        existing = OrganizationFactory(key='MITx', partner=self.partner)
+        OrganizationFactory(key='HarvardX')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cache.get_or_create_organization('mitx'), (existing, False))
+
+        organization, created = self.cache.get_or_create_organization('HarvardX')
+        self.assertTrue(created)
+        self.assertEqual(organization.partner, self.partner)
+        self.assertEqual(Organization.objects.filter(key='HarvardX').count(), 2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.get_or_create_organization('harvardx'), (organization, False))
+
+    def test_invalidate(self):
+        """ Verify invalidated tables are reloaded the next time they are used. """
+        self.cache.get_seat_type('bogus')
+        seat_type = SeatTypeFactory()
+        self.assertIsNone(self.cache.get_seat_type(seat_type.slug))
+
+        self.cache.invalidate(Organization)
+        self.assertIsNone(self.cache.get_seat_type(seat_type.slug))
+
+        self.cache.invalidate(SeatType)
+        self.assertEqual(self.cache.get_seat_type(seat_type.slug), seat_type)
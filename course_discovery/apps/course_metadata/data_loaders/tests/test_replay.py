@@ -0,0 +1,97 @@
+import base64
+import json
+import os
+import tempfile
+
+import mock
+import requests
+import responses
+from django.test import TestCase
+from requests.adapters import HTTPAdapter
+
+from course_discovery.apps.course_metadata.data_loaders.replay import Corpus, RecordingAdapter, ReplayAdapter
+
+URL = 'https://example.com/api/v1/courses/'
+
+
+class ReplayTests(TestCase):
+    def setUp(self):
+        super(ReplayTests, self).setUp()
+        self.corpus = Corpus()
+
+    def get_session(self, adapter):
+        session = requests.Session()
+        session.mount('https://', adapter)
+        return session
+
+    def add_entry(self, url, body, status=200):
+        self.corpus.add({
+            'method': 'GET',
+            'url': url,
+            'status': status,
+            'headers': {'Content-Type': 'application/json'},
+            'body': base64.b64encode(json.dumps(body).encode('utf8')).decode('ascii'),
+        })
+
+    @responses.activate
+    def test_record(self):
+        """ Verify responses are recorded, keyed by normalized URL, and survive a round trip to disk. """
+        responses.add(responses.GET, URL, json={'results': [1]})
+        session = self.get_session(RecordingAdapter(HTTPAdapter(), self.corpus))
+
+        session.get(URL, params={'page_size': 10, 'cachebust': 'abc', 'page': 1})
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'corpus.jsonl.gz')
+            self.corpus.save(path)
+            corpus = Corpus.load(path)
+
+        entry = corpus.get('get', URL + '?page=1&page_size=10&cachebust=xyz')
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(corpus.get_pages('GET', URL + '?page_size=10'), [1])
+
+        response = self.get_session(ReplayAdapter(corpus)).get(URL + '?page_size=10&page=1')
+        self.assertEqual(response.json(), {'results': [1]})
+
+    def test_replay_missing(self):
+        adapter = ReplayAdapter(self.corpus)
+        response = self.get_session(adapter).get(URL)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(adapter.stats, {'requests': 1, 'missing': 1})
+
+    def test_replay_throttled(self):
+        self.add_entry(URL, {})
+        adapter = ReplayAdapter(self.corpus, throttle_rate=1)
+        response = self.get_session(adapter).get(URL)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '0')
+        self.assertEqual(adapter.stats, {'requests': 1, 'throttled': 1})
+
+    def test_replay_latency(self):
+        self.add_entry(URL, {})
+
+        with mock.patch('time.sleep') as mock_sleep:
+            self.get_session(ReplayAdapter(self.corpus, latency=0.5)).get(URL)
+            mock_sleep.assert_called_once_with(0.5)
+
+    def test_replay_page_multiplier(self):
+        """ Verify the recorded pages are repeated, and the pagination details updated to match. """
+        for page in (1, 2):
+            self.add_entry(
+                URL + '?page={}'.format(page),
+                {'pagination': {'count': 4, 'num_pages': 2, 'next': None, 'previous': None}, 'results': [page]}
+            )
+
+        session = self.get_session(ReplayAdapter(self.corpus, page_multiplier=2))
+
+        data = session.get(URL + '?page=3').json()
+        self.assertEqual(data['results'], [1])
+        self.assertEqual(data['pagination'], {
+            'count': 8, 'num_pages': 4, 'next': URL + '?page=4', 'previous': URL + '?page=2',
+        })
+
+        data = session.get(URL + '?page=4').json()
+        self.assertEqual(data['results'], [2])
+        self.assertIsNone(data['pagination']['next'])
@@ -0,0 +1,106 @@
+import concurrent.futures
+import threading
+
+import mock
+from django.test import TestCase
+
+from course_discovery.apps.course_metadata.data_loaders.scheduler import DependencyScheduler
+
+LOGGER_PATH = 'course_discovery.apps.course_metadata.data_loaders.scheduler.logger'
+
+
+class DependencySchedulerTests(TestCase):
+    def setUp(self):
+        super(DependencySchedulerTests, self).setUp()
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def record(self, name):
+        with self.lock:
+            self.calls.append(name)
+        return name
+
+    def add_tasks(self, scheduler):
+        scheduler.add('programs', self.record, 'programs', dependencies=['courses', 'organizations'])
+        scheduler.add('subjects', self.record, 'subjects')
+        scheduler.add('organizations', self.record, 'organizations', dependencies=['schools'])
+        scheduler.add('courses', self.record, 'courses', dependencies=['subjects', 'organizations'])
+        scheduler.add('schools', self.record, 'schools')
+
+    def assert_dependencies_respected(self):
+        for name, dependencies in (
+                ('programs', ('courses', 'organizations')),
+                ('organizations', ('schools',)),
+                ('courses', ('subjects', 'organizations')),
+        ):
+            for dependency in dependencies:
+                self.assertLess(self.calls.index(dependency), self.calls.index(name))
+
+    def test_run_serial(self):
+        """ Verify ready tasks are run in the order they were added, after their dependencies. """
+        scheduler = DependencyScheduler()
+        self.add_tasks(scheduler)
+
+        results = scheduler.run()
+
+        self.assertEqual(self.calls, ['subjects', 'schools', 'organizations', 'courses', 'programs'])
+        self.assertEqual(results, {name: name for name in self.calls})
+
+    def test_run_parallel(self):
+        scheduler = DependencyScheduler(max_workers=2, executor_class=concurrent.futures.ThreadPoolExecutor)
+        self.add_tasks(scheduler)
+
+        results = scheduler.run()
+
+        self.assertEqual(len(self.calls), 5)
+        self.assert_dependencies_respected()
+        self.assertEqual(results, {name: name for name in self.calls})
+
+    def test_failed_dependency(self):
+        """ Verify a failed task is logged, and the tasks depending on it are still run. """
+        scheduler = DependencyScheduler()
+        scheduler.add('schools', mock.Mock(side_effect=Exception))
+        scheduler.add('organizations', self.record, 'organizations', dependencies=['schools'])
+
+        with mock.patch(LOGGER_PATH) as mock_logger:
+            results = scheduler.run()
+            mock_logger.exception.assert_called_once_with('%s failed!', 'schools')
+
+        self.assertEqual(results, {'schools': None, 'organizations': 'organizations'})
+
+    def test_missing_dependency(self):
+        """ Verify dependencies on tasks which were never added are ignored. """
+        scheduler = DependencyScheduler()
+        scheduler.add('courses', self.record, 'courses', dependencies=['marketing'])
+
+        self.assertEqual(scheduler.run(), {'courses': 'courses'})
+
+    def test_circular_dependencies(self):
+        scheduler = DependencyScheduler()
+        scheduler.add('courses', self.record, 'courses', dependencies=['programs'])
+        scheduler.add('programs', self.record, 'programs', dependencies=['courses'])
+
+        with self.assertRaises(ValueError):
+            scheduler.run()
+
+    def test_duplicate_task(self):
+        scheduler = DependencyScheduler()
+        scheduler.add('courses', self.record, 'courses')
+
+        with self.assertRaises(ValueError):
+            scheduler.add('courses', self.record, 'courses')
+
+    def test_get_critical_path(self):
+        """ Verify the critical path is the chain of dependent tasks with the longest total duration. """
+        scheduler = DependencyScheduler()
+        self.add_tasks(scheduler)
+        durations = {'subjects': 1, 'schools': 2, 'organizations': 3, 'courses': 10, 'programs': 4}
+
+        for name, task in scheduler.tasks.items():
+            task.started = 0
+            task.finished = durations[name]
+
+        self.assertEqual(
+            scheduler.get_critical_path(),
+            (['schools', 'organizations', 'courses', 'programs'], 19)
+        )
@@ -0,0 +1,109 @@
+import mock
+from django.db import connection, transaction
+from django.test import TestCase
+
+from course_discovery.apps.course_metadata.data_loaders.transactions import TransactionBatch
+from course_discovery.apps.course_metadata.models import LevelType
+
+
+class TransactionBatchTests(TestCase):
+    def write(self, batch, name, fail=False):
+        try:
+            with batch.record():
+                LevelType.objects.create(name=name)
+
+                if fail:
+                    raise ValueError(name)
+        except ValueError:
+            pass
+
+    def test_record_rolled_back(self):
+        """ Verify a record which fails is rolled back, without rolling back the other records of its batch. """
+        on_rollback = mock.Mock()
+
+        with TransactionBatch(10, on_rollback=on_rollback) as batch:
+            self.write(batch, 'first')
+            self.write(batch, 'failed', fail=True)
+            self.write(batch, 'last')
+
+        self.assertEqual(set(LevelType.objects.values_list('name', flat=True)), {'first', 'last'})
+        on_rollback.assert_called_once_with()
+
+    def test_batch_size(self):
+        """ Verify the transaction is committed once batch_size records have been written. """
+        with TransactionBatch(2) as batch:
+            self.write(batch, 'first')
+            self.assertIsNotNone(batch.atomic)
+
+            self.write(batch, 'second')
+            self.assertIsNone(batch.atomic)
+
+            self.write(batch, 'third')
+            self.assertIsNotNone(batch.atomic)
+
+        self.assertIsNone(batch.atomic)
+        self.assertEqual(LevelType.objects.filter(name__in=('first', 'second', 'third')).count(), 3)
+
+    def test_autocommit(self):
+        """ Verify records are not written in a transaction if batch_size is 0. """
+        savepoints = len(connection.savepoint_ids)
+
+        with TransactionBatch(0) as batch:
+            with batch.record():
+                self.assertEqual(len(connection.savepoint_ids), savepoints)
+                LevelType.objects.create(name='first')
+
+            self.assertIsNone(batch.atomic)
+
+        self.assertTrue(LevelType.objects.filter(name='first').exists())
+
+    def test_on_commit(self):
+        """ Verify callbacks are called once the records written before them are committed. """
+        callback = mock.Mock()
+
+        with TransactionBatch(10) as batch:
+            self.write(batch, 'first')
+            batch.on_commit(callback)
+            self.assertFalse(callback.called)
+
+        callback.assert_called_once_with()
+
+        batch.on_commit(callback)
+        self.assertEqual(callback.call_count, 2)
+
+    def test_batch_rolled_back(self):
+        """ Verify the open transaction is rolled back if an exception is raised outside of a record. """
+        on_rollback = mock.Mock()
+
+        with self.assertRaises(ValueError):
+            with TransactionBatch(10, on_rollback=on_rollback) as batch:
+                self.write(batch, 'first')
+                raise ValueError
+
+        self.assertFalse(LevelType.objects.filter(name='first').exists())
+        self.assertFalse(connection.needs_rollback)
+        on_rollback.assert_called_once_with()
+
+    def test_on_commit_rolled_back(self):
+        """ Verify callbacks are discarded if their batch is rolled back. """
+        callback = mock.Mock()
+
+        with self.assertRaises(ValueError):
+            with TransactionBatch(10) as batch:
+                self.write(batch, 'first')
+                batch.on_commit(callback)
+                raise ValueError
+
+        self.assertFalse(callback.called)
+        self.assertEqual(batch.callbacks, [])
+
+    def test_batch_marked_for_rollback(self):
+        """ Verify on_rollback is called if the transaction could not be committed. """
+        on_rollback = mock.Mock()
+
+        with TransactionBatch(10, on_rollback=on_rollback) as batch:
+            self.write(batch, 'first')
+            transaction.set_rollback(True)
+
+        self.assertFalse(LevelType.objects.filter(name='first').exists())
+        on_rollback.assert_called_once_with()
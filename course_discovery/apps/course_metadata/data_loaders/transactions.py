@@ -0,0 +1,100 @@
+import contextlib
+import logging
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionBatch(object):
+    """ Groups the writes of consecutive records into transactions, rather than committing every write on its own.
+
+    Each record is written in a savepoint, so a record which fails is rolled back without affecting the other records
+    of its transaction. The transaction is committed once batch_size records have been written, and when the batch is
+    closed. A batch_size of 0 leaves every write in autocommit mode.
+
+    Transactions belong to the database connection of the thread which opens them, so threads writing at the same time
+    (i.e. loaders run with is_threadsafe) must each use their own batch.
+    """
+
+    def __init__(self, batch_size, on_rollback=None, using=None):
+        """
+        Arguments:
+            batch_size (int): Number of records written in each transaction.
+            on_rollback (callable): Called when the writes of a record, or of the whole batch, are rolled back, e.g.
+                to discard cached rows which may no longer exist.
+            using (str): Alias of the database written to.
+        """
+        self.batch_size = batch_size
+        self.on_rollback = on_rollback
+        self.using = using
+        self.atomic = None
+        self.count = 0
+        self.callbacks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.commit(exc_type, exc_value, traceback)
+
+    @contextlib.contextmanager
+    def record(self):
+        """ Context manager in which the writes of a single record are made. """
+        if not self.batch_size:
+            yield
+            return
+
+        if self.atomic is None:
+            self.atomic = transaction.atomic(using=self.using)
+            self.atomic.__enter__()
+
+        try:
+            with transaction.atomic(using=self.using):
+                yield
+        except Exception:
+            if self.on_rollback:
+                self.on_rollback()
+            raise
+        finally:
+            self.count += 1
+
+            if self.count >= self.batch_size:
+                self.commit()
+
+    def on_commit(self, func):
+        """
+        Calls func once the records written so far are committed, or right away if they already are. func is not
+        called if the transaction is rolled back, e.g. so the fingerprints of records which were rolled back are not
+        saved.
+        """
+        if self.atomic is None:
+            func()
+        else:
+            self.callbacks.append(func)
+
+    def commit(self, exc_type=None, exc_value=None, traceback=None):
+        """ Commits the open transaction, or rolls it back if an exception is given. """
+        if self.atomic is None:
+            return
+
+        atomic, self.atomic = self.atomic, None
+        callbacks, self.callbacks = self.callbacks, []
+        self.count = 0
+
+        rolled_back = exc_type is not None
+
+        if not rolled_back and transaction.get_rollback(using=self.using):
+            # A failure which could not be limited to its savepoint (e.g. a deadlock) invalidated the transaction.
+            logger.error('A batch of writes was rolled back, since its transaction could not be committed.')
+            rolled_back = True
+
+        try:
+            atomic.__exit__(exc_type, exc_value, traceback)
+        finally:
+            if rolled_back and self.on_rollback:
+                self.on_rollback()
+
+        if not rolled_back:
+            for func in callbacks:
+                func()
@@ -0,0 +1,211 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+
+import jwt
+from django.core.management import BaseCommand, CommandError
+
+from course_discovery.apps.core.http import get_http_adapter, override_http_adapter
+from course_discovery.apps.core.models import Partner
+from course_discovery.apps.course_metadata.data_loaders.benchmark import QueryCounter, get_peak_rss, get_rss
+from course_discovery.apps.course_metadata.data_loaders.replay import Corpus, RecordingAdapter, ReplayAdapter
+from course_discovery.apps.course_metadata.data_loaders.scheduler import DependencyScheduler
+from course_discovery.apps.course_metadata.management.commands.refresh_course_metadata import (
+    TOKEN_TYPE, disconnect_api_change_receiver, execute_loader, get_access_token, get_partner_loaders, get_task_name
+)
+from course_discovery.apps.course_metadata.models import DataLoaderConfig
+
+logger = logging.getLogger(__name__)
+
+# Access token sent to the upstream services when responses are replayed. It is never validated.
+REPLAY_ACCESS_TOKEN = 'replay'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the course metadata data loaders against upstream responses recorded in a corpus.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--corpus',
+            action='store',
+            dest='corpus',
+            required=True,
+            help='Path of the gzipped corpus of upstream responses.'
+        )
+        parser.add_argument(
+            '--record',
+            action='store_true',
+            dest='record',
+            default=False,
+            help='Call the upstream services, and save their responses to the corpus, instead of replaying it.'
+        )
+        parser.add_argument(
+            '--partner_code',
+            action='store',
+            dest='partner_code',
+            default=None,
+            help='The short code for a specific partner to refresh.'
+        )
+        parser.add_argument(
+            '--latency',
+            action='store',
+            dest='latency',
+            type=float,
+            default=0,
+            help='Seconds added to every replayed request.'
+        )
+        parser.add_argument(
+            '--throttle_rate',
+            action='store',
+            dest='throttle_rate',
+            type=float,
+            default=0,
+            help='Fraction of replayed requests, between 0 and 1, answered with a 429 response.'
+        )
+        parser.add_argument(
+            '--page_multiplier',
+            action='store',
+            dest='page_multiplier',
+            type=int,
+            default=1,
+            help='Number of times the recorded pages of paginated API responses are replayed.'
+        )
+        parser.add_argument(
+            '--seed',
+            action='store',
+            dest='seed',
+            type=int,
+            default=None,
+            help='Seed used to select throttled requests.'
+        )
+        parser.add_argument(
+            '--report',
+            action='store',
+            dest='report',
+            default=None,
+            help='Path of a file to which the report is written as JSON.'
+        )
+
+    def handle(self, *args, **options):
+        partners = Partner.objects.all()
+
+        partner_code = options.get('partner_code')
+        if partner_code:
+            partners = partners.filter(short_code=partner_code)
+
+        if not partners:
+            raise CommandError('No partners available!')
+
+        if options['record']:
+            corpus = Corpus()
+            adapter = RecordingAdapter(get_http_adapter(), corpus)
+        else:
+            try:
+                corpus = Corpus.load(options['corpus'])
+            except (IOError, OSError, ValueError) as exc:
+                raise CommandError('Failed to load the corpus [{}]: {}'.format(options['corpus'], exc))
+
+            adapter = ReplayAdapter(
+                corpus,
+                latency=options['latency'],
+                throttle_rate=options['throttle_rate'],
+                page_multiplier=options['page_multiplier'],
+                seed=options['seed'],
+            )
+
+        disconnect_api_change_receiver()
+
+        start = time.monotonic()
+        results = []
+
+        with override_http_adapter(adapter):
+            # Loaders are run one at a time, so the resources used by each of them can be measured.
+            scheduler = DependencyScheduler()
+
+            for partner in partners:
+                self.add_partner_tasks(scheduler, partner, results, options['record'])
+
+            scheduler.run()
+
+        report = OrderedDict([
+            ('wall_time', round(time.monotonic() - start, 3)),
+            ('process_peak_rss_kb', get_peak_rss()),
+            ('loaders', results),
+        ])
+
+        if options['record']:
+            corpus.save(options['corpus'])
+            logger.info('Saved %d responses to [%s].', len(corpus), options['corpus'])
+        else:
+            report['requests'] = dict(adapter.stats)
+
+        self.write_report(report, options.get('report'))
+
+    def add_partner_tasks(self, scheduler, partner, results, record):
+        kwargs = {}
+
+        if record:
+            access_token = get_access_token(partner)
+            kwargs['username'] = jwt.decode(access_token, verify=False)['preferred_username']
+        else:
+            access_token = REPLAY_ACCESS_TOKEN
+
+        max_workers = DataLoaderConfig.get_solo().max_workers
+
+        for loader_class, api_url, max_workers in get_partner_loaders(partner, max_workers):
+            if api_url:
+                name = get_task_name(partner, loader_class.__name__)
+                scheduler.add(
+                    name,
+                    self.execute_loader,
+                    results,
+                    name,
+                    loader_class,
+                    partner,
+                    api_url,
+                    access_token,
+                    TOKEN_TYPE,
+                    max_workers,
+                    # Writes are kept on this thread, so they are measured.
+                    False,
+                    dependencies=[get_task_name(partner, dependency) for dependency in loader_class.DEPENDENCIES],
+                    **kwargs
+                )
+
+    def execute_loader(self, results, name, loader_class, *loader_args, **loader_kwargs):
+        start = time.monotonic()
+        rss = get_rss()
+
+        with QueryCounter() as counter:
+            result = execute_loader(loader_class, *loader_args, **loader_kwargs)
+
+        # The memory the loader held on to once it finished. Memory it used and freed meanwhile is not included.
+        rss_increase = get_rss() - rss if rss is not None else None
+
+        results.append(OrderedDict([
+            ('loader', name),
+            ('succeeded', result['succeeded']),
+            ('wall_time', round(time.monotonic() - start, 3)),
+            ('queries', counter.queries),
+            ('rows_written', counter.rows_written),
+            ('rss_increase_kb', rss_increase),
+            ('metrics', result['metrics']),
+        ]))
+
+        return result
+
+    def write_report(self, report, path):
+        for result in report['loaders']:
+            self.stdout.write(
+                '{loader}: {status} in {wall_time}s, {queries} queries, {rows_written} rows written, '
+                'RSS increased by {rss_increase_kb} KB'.format(
+                    status='succeeded' if result['succeeded'] else 'failed', **result
+                )
+            )
+
+        self.stdout.write('Total: {wall_time}s, process peak RSS {process_peak_rss_kb} KB'.format(**report))
+
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
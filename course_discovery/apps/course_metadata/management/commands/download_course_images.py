@@ -1,9 +1,17 @@
+import concurrent.futures
 import logging
+import os
+import tempfile
+import threading
+from urllib.parse import urlsplit
 
 import requests
-from django.core.files.base import ContentFile
+from django.core.files import File
 from django.core.management import BaseCommand
+from django.db.models import Q
 
+from course_discovery.apps.core.http import get_session
+from course_discovery.apps.course_metadata.data_loaders.prefetch import prefetch
 from course_discovery.apps.course_metadata.models import Course
 
 logger = logging.getLogger(__name__)
@@ -12,12 +20,22 @@ IMAGE_TYPES = {
     'image/jpeg': 'jpg',
     'image/png': 'png',
 }
+# Size of the chunks in which images are read from the response, and above which they are buffered on disk.
+CHUNK_SIZE = 64 * 1024
+MAX_MEMORY_SIZE = 1024 * 1024
 
 
 class Command(BaseCommand):
     help = 'Download course images to this server. This is intended to migrate image data from the edx.org ' \
            'marketing site to Discovery.'
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = None
+        self.host_semaphores = {}
+        self.max_per_host = 1
+        self.lock = threading.Lock()
+
     def add_arguments(self, parser):
         super().add_arguments(parser)
         parser.add_argument(
@@ -26,41 +44,165 @@ class Command(BaseCommand):
             dest='overwrite_existing',
             help='Overwrite existing image content'
         )
+        parser.add_argument(
+            '--workers',
+            action='store',
+            dest='workers',
+            type=int,
+            default=8,
+            help='Number of images downloaded at the same time.'
+        )
+        parser.add_argument(
+            '--max_per_host',
+            action='store',
+            dest='max_per_host',
+            type=int,
+            default=4,
+            help='Maximum number of images downloaded at the same time from a single host.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            action='store',
+            dest='checkpoint',
+            default=None,
+            help='Path of a file in which the key and id of the last course processed are saved. If the file exists, '
+                 'only courses after that course are processed. The file is removed once every course has been '
+                 'processed.'
+        )
 
     def handle(self, *args, **options):
-        courses = Course.objects.filter(card_image_url__isnull=False).exclude(card_image_url='').order_by('key')
+        # Keys are only unique per partner, so courses are ordered by their primary keys as well.
+        courses = Course.objects.filter(card_image_url__isnull=False).exclude(card_image_url='').order_by('key', 'pk')
 
         if not options['overwrite_existing']:
             courses = courses.filter(image='')
 
+        checkpoint_path = options.get('checkpoint')
+        checkpoint = self.read_checkpoint(checkpoint_path)
+        if checkpoint:
+            key, pk = checkpoint
+            logger.info('Resuming after course [%s]...', key)
+
+            if pk is None:
+                courses = courses.filter(key__gt=key)
+            else:
+                courses = courses.filter(Q(key__gt=key) | Q(key=key, pk__gt=pk))
+
         count = courses.count()
         if count < 1:
             logger.info('All courses are up to date.')
+            self.remove_checkpoint(checkpoint_path)
             return
 
         logger.info('Retrieving images for [%d] courses...', count)
+        self.session = get_session()
+        self.max_per_host = max(options['max_per_host'], 1)
+        workers = max(options['workers'], 1)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            # Images are downloaded and written to storage by the workers, but courses are saved by this thread, in
+            # key order, so the checkpoint is only moved past courses which have been processed.
+            for course, downloaded in prefetch(executor, self.download_image, courses.iterator(), workers * 2):
+                if downloaded:
+                    try:
+                        course.save()
+                        logger.info('Image for course [%s] successfully updated.', course.key)
+                    except Exception:  # pylint: disable=broad-except
+                        logger.exception('An unknown exception occurred while saving image for course [%s]',
+                                         course.key)
 
-        for course in courses:
-            logger.info('Retrieving image for course [%s] from [%s]...', course.key, course.card_image_url)
+                self.write_checkpoint(checkpoint_path, course.key, course.pk)
 
-            try:
-                response = requests.get(course.card_image_url)
+        self.remove_checkpoint(checkpoint_path)
 
-                if response.status_code == requests.codes.ok:  # pylint: disable=no-member
-                    content_type = response.headers['Content-Type'].lower()
-                    extension = IMAGE_TYPES.get(content_type)
+    def get_host_semaphore(self, url):
+        host = urlsplit(url).netloc
 
-                    if extension:
-                        filename = '{uuid}.{extension}'.format(uuid=str(course.uuid), extension=extension)
-                        course.image.save(filename, ContentFile(response.content))
-                        logger.info('Image for course [%s] successfully updated.', course.key)
-                    else:
-                        # pylint: disable=line-too-long
-                        msg = 'Image retrieved for course [%s] from [%s] has an unknown content type [%s] and will not be saved.'
-                        logger.error(msg, course.key, course.card_image_url, content_type)
-
-                else:
-                    msg = 'Failed to download image for course [%s] from [%s]! Response was [%d]:\n%s'
-                    logger.error(msg, course.key, course.card_image_url, response.status_code, response.content)
-            except Exception:  # pylint: disable=broad-except
-                logger.exception('An unknown exception occurred while downloading image for course [%s]', course.key)
+        with self.lock:
+            semaphore = self.host_semaphores.get(host)
+
+            if semaphore is None:
+                semaphore = self.host_semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+
+        return semaphore
+
+    def download_image(self, course):
+        """
+        Downloads the image of a course, and writes it to storage. The course itself is not saved.
+
+        Returns:
+            bool: True if the image of the course was updated.
+        """
+        logger.info('Retrieving image for course [%s] from [%s]...', course.key, course.card_image_url)
+
+        try:
+            with self.get_host_semaphore(course.card_image_url):
+                response = self.session.get(course.card_image_url, stream=True)
+
+                try:
+                    return self.save_image(course, response)
+                finally:
+                    response.close()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('An unknown exception occurred while downloading image for course [%s]', course.key)
+            return False
+
+    def save_image(self, course, response):
+        if response.status_code != requests.codes.ok:  # pylint: disable=no-member
+            msg = 'Failed to download image for course [%s] from [%s]! Response was [%d]:\n%s'
+            logger.error(msg, course.key, course.card_image_url, response.status_code, response.content)
+            return False
+
+        content_type = response.headers['Content-Type'].lower()
+        extension = IMAGE_TYPES.get(content_type)
+
+        if not extension:
+            # pylint: disable=line-too-long
+            msg = 'Image retrieved for course [%s] from [%s] has an unknown content type [%s] and will not be saved.'
+            logger.error(msg, course.key, course.card_image_url, content_type)
+            return False
+
+        # The image is streamed into a buffer which moves to disk once it is large, rather than being held in memory.
+        with tempfile.SpooledTemporaryFile(max_size=MAX_MEMORY_SIZE) as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+
+            f.seek(0)
+            filename = '{uuid}.{extension}'.format(uuid=str(course.uuid), extension=extension)
+            course.image.save(filename, File(f), save=False)
+
+        return True
+
+    def read_checkpoint(self, path):
+        """
+        Returns:
+            tuple: Key and primary key of the last course processed, or None if there is no checkpoint. The primary
+                key is None if the checkpoint was written before primary keys were saved, in which case every course
+                with the key was processed.
+        """
+        if not (path and os.path.exists(path)):
+            return None
+
+        with open(path) as f:
+            lines = f.read().strip().splitlines()
+
+        if not lines:
+            return None
+
+        pk = int(lines[1]) if len(lines) > 1 else None
+        return lines[0], pk
+
+    def write_checkpoint(self, path, key, pk):
+        if not path:
+            return
+
+        # Replace the file in one step, so a crash never leaves a partially written checkpoint.
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write('{key}\n{pk}'.format(key=key, pk=pk))
+
+        os.replace(temp_path, path)
+
+    def remove_checkpoint(self, path):
+        if path and os.path.exists(path):
+            os.remove(path)
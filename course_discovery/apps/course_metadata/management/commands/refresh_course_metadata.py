@@ -1,36 +1,191 @@
 import concurrent.futures
-import itertools
+import json
 import logging
+import multiprocessing
+import sys
+import threading
 import time
+from collections import OrderedDict
 
 import jwt
+import pytz
 import waffle
+from dateutil.parser import parse
 from django.apps import apps
-from django.core.management import BaseCommand, CommandError
-from django.db import connection
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection, transaction
 from django.db.models.signals import post_delete, post_save
 from edx_rest_api_client.client import EdxRestApiClient
 
-from course_discovery.apps.api.cache import api_change_receiver, set_api_timestamp
+from course_discovery.apps.api.cache import api_change_receiver, bump_partner_generations, set_api_timestamp
+from course_discovery.apps.api.documents import defer_document_bumps
 from course_discovery.apps.core.models import Partner
 from course_discovery.apps.course_metadata.data_loaders.api import (
     CoursesApiDataLoader, EcommerceApiDataLoader, OrganizationsApiDataLoader, ProgramsApiDataLoader
 )
+from course_discovery.apps.course_metadata.data_loaders.html_cleaning import prune_cleaned_html
 from course_discovery.apps.course_metadata.data_loaders.marketing_site import (
     CourseMarketingSiteDataLoader, PersonMarketingSiteDataLoader, SchoolMarketingSiteDataLoader,
     SponsorMarketingSiteDataLoader, SubjectMarketingSiteDataLoader
 )
-from course_discovery.apps.course_metadata.models import Course, DataLoaderConfig
+from course_discovery.apps.course_metadata.data_loaders.metrics import build_report
+from course_discovery.apps.course_metadata.data_loaders.rate_limiter import get_host, set_host_semaphores
+from course_discovery.apps.course_metadata.data_loaders.scheduler import DependencyScheduler
+from course_discovery.apps.course_metadata.models import Course, DataLoaderConfig, DataLoaderRun
 
 logger = logging.getLogger(__name__)
 
+TOKEN_TYPE = 'JWT'
+
+# Access tokens, and the usernames they were issued to, retrieved by this process. Keyed by partner id.
+access_tokens = {}
+access_tokens_lock = threading.Lock()
+
+
+def get_partner_api_urls(partner):
+    return (
+        partner.marketing_site_url_root, partner.organizations_api_url, partner.courses_api_url,
+        partner.ecommerce_api_url, partner.programs_api_url,
+    )
+
+
+def get_partner_loaders(partner, max_workers):
+    """
+    Returns the data loaders of the partner.
+
+    Returns:
+        tuple: Loader class, API URL and maximum number of workers of each loader. The URL is empty if the partner
+            does not have the API.
+    """
+    return (
+        (SubjectMarketingSiteDataLoader, partner.marketing_site_url_root, max_workers),
+        (SchoolMarketingSiteDataLoader, partner.marketing_site_url_root, max_workers),
+        (SponsorMarketingSiteDataLoader, partner.marketing_site_url_root, max_workers),
+        (PersonMarketingSiteDataLoader, partner.marketing_site_url_root, max_workers),
+        (CourseMarketingSiteDataLoader, partner.marketing_site_url_root, max_workers),
+        (OrganizationsApiDataLoader, partner.organizations_api_url, max_workers),
+        (CoursesApiDataLoader, partner.courses_api_url, max_workers),
+        (EcommerceApiDataLoader, partner.ecommerce_api_url, 1),
+        (ProgramsApiDataLoader, partner.programs_api_url, max_workers),
+    )
+
+
+def disconnect_api_change_receiver():
+    """
+    Disconnects the api_change_receiver function from the post_save and post_delete signals, so model changes made
+    while data is loaded do not repeatedly invalidate the API response cache. The receivers invalidating API
+    documents remain connected, so only the documents of changed objects are rebuilt once data is loaded.
+    """
+    for model in apps.get_app_config('course_metadata').get_models():
+        for signal in (post_save, post_delete):
+            signal.disconnect(receiver=api_change_receiver, sender=model)
+
+
+def get_access_token(partner):
+    """ Retrieves a JWT access token for the partner's service user. """
+    logger.info('Retrieving access token for partner [{}]'.format(partner.short_code))
 
-def execute_loader(loader_class, *loader_args, **loader_kwargs):
     try:
-        loader_class(*loader_args, **loader_kwargs).ingest()
+        access_token, __ = EdxRestApiClient.get_oauth_access_token(
+            '{root}/access_token'.format(root=partner.oidc_url_root.strip('/')),
+            partner.oidc_key,
+            partner.oidc_secret,
+            token_type=TOKEN_TYPE
+        )
+    except Exception:
+        logger.exception('No access token acquired through client_credential flow.')
+        raise
+
+    return access_token
+
+
+def get_partner_credentials(partner):
+    """
+    Returns the access token of the partner's service user, and its username. The token is retrieved the first time
+    one of the partner's loaders runs in this process, rather than when the refresh starts, so it does not expire
+    while the loaders of other partners run.
+
+    Returns:
+        tuple: Access token, and username.
+    """
+    with access_tokens_lock:
+        if partner.id not in access_tokens:
+            access_token = get_access_token(partner)
+            username = jwt.decode(access_token, verify=False)['preferred_username']
+            access_tokens[partner.id] = (access_token, username)
+
+        return access_tokens[partner.id]
+
+
+def get_task_name(partner, loader_name):
+    return '{partner}:{loader}'.format(partner=partner.short_code, loader=loader_name)
+
+
+def execute_loader(loader_class, partner, *loader_args, **loader_kwargs):
+    """
+    Runs a data loader.
+
+    Returns:
+        OrderedDict: Short code of the partner, name of the loader, whether it succeeded, and the metrics collected
+            by the loader.
+    """
+    result = OrderedDict([
+        ('partner', partner.short_code),
+        ('loader', loader_class.__name__),
+        ('succeeded', False),
+        ('metrics', None),
+    ])
+    loader = None
+
+    try:
+        loader = loader_class(partner, *loader_args, **loader_kwargs)
+        # The documents of the objects the loader changes are invalidated at once, when it finishes.
+        with defer_document_bumps():
+            result['metrics'] = loader.run()
+        result['succeeded'] = True
     except Exception:  # pylint: disable=broad-except
         logger.exception('%s failed!', loader_class.__name__)
 
+        if loader:
+            result['metrics'] = loader.metrics.as_dict()
+
+    return result
+
+
+def report_results(results):
+    """
+    Logs the results of data loader runs as a single JSON report, and saves them if the DataLoaderConfig asks for it.
+
+    Arguments:
+        results (iterable): Results returned by execute_loader. None is ignored.
+
+    Returns:
+        OrderedDict: The report.
+    """
+    results = [result for result in results if result]
+    report = build_report(results)
+    logger.info('Data loader report: %s', json.dumps(report))
+
+    if DataLoaderConfig.get_solo().record_runs:
+        partners = {
+            partner.short_code: partner
+            for partner in Partner.objects.filter(short_code__in=[result['partner'] for result in results])
+        }
+        DataLoaderRun.objects.bulk_create([
+            DataLoaderRun(
+                partner=partners[result['partner']],
+                loader=result['loader'],
+                succeeded=result['succeeded'],
+                duration=(result['metrics'] or {}).get('timings', {}).get('total'),
+                metrics=result['metrics'] or {},
+            )
+            # Runs are only recorded for partners which still exist.
+            for result in results if result['partner'] in partners
+        ])
+
+    return report
+
 
 def execute_parallel_loader(loader_class, *loader_args, **loader_kwargs):
     """
@@ -48,7 +203,50 @@ def execute_parallel_loader(loader_class, *loader_args, **loader_kwargs):
     """
     connection.close()
 
-    execute_loader(loader_class, *loader_args, **loader_kwargs)
+    return execute_loader(loader_class, *loader_args, **loader_kwargs)
+
+
+def execute_partner_loader(parallel, loader_class, partner, api_url, max_workers, is_threadsafe, **loader_kwargs):
+    """
+    Runs a data loader with the access token of its partner.
+
+    Arguments:
+        parallel (bool): True if the loader runs in a process of its own. See execute_parallel_loader.
+
+    Raises:
+        Exception: If no access token could be retrieved, in which case the loader is not run.
+    """
+    access_token, username = get_partner_credentials(partner)
+    kwargs = {'username': username} if username else {}
+    kwargs.update(loader_kwargs)
+
+    execute = execute_parallel_loader if parallel else execute_loader
+    return execute(loader_class, partner, api_url, access_token, TOKEN_TYPE, max_workers, is_threadsafe, **kwargs)
+
+
+def get_partner_results(partner, results):
+    """ Returns the results of a partner's tasks. The result of a task which raised is None. """
+    prefix = get_task_name(partner, '')
+    return [result for name, result in results.items() if name.startswith(prefix)]
+
+
+def get_failed_partners(partners, results, require_success=False):
+    """
+    Returns the short codes of the partners whose loaders could not be run, i.e. whose tasks raised instead of
+    returning a result (e.g. because no access token could be retrieved).
+
+    Arguments:
+        partners (iterable): Partners whose tasks were run.
+        results (dict): Results of the tasks, keyed by task name, as returned by DependencyScheduler.run.
+        require_success (bool): Also return the partners with loaders which ran, but did not succeed.
+    """
+    return [
+        partner.short_code for partner in partners
+        if not all(
+            result is not None and (result['succeeded'] or not require_success)
+            for result in get_partner_results(partner, results)
+        )
+    ]
 
 
 class Command(BaseCommand):
@@ -62,15 +260,42 @@ class Command(BaseCommand):
             default=None,
             help='The short code for a specific partner to refresh.'
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            dest='incremental',
+            default=False,
+            help='Skip records whose upstream data has not changed since the last successful refresh. Records '
+                 'deleted upstream are only removed by a full refresh.'
+        )
+        parser.add_argument(
+            '--since',
+            action='store',
+            dest='since',
+            default=None,
+            help='Only load records changed after this ISO 8601 datetime. Implies --incremental.'
+        )
+        parser.add_argument(
+            '--parallel_partners',
+            action='store_true',
+            dest='parallel_partners',
+            default=False,
+            help='Refresh each partner in its own process, at the same time as the other partners.'
+        )
+        parser.add_argument(
+            '--staged',
+            action='store_true',
+            dest='staged',
+            default=False,
+            help='Load the data of each partner in a single database transaction, which is only committed, and the '
+                 'partner\'s cached API responses invalidated, once all of its loaders have succeeded. Readers never '
+                 'see partially refreshed data. The loaders of a partner are run one at a time, and its data is left '
+                 'as it was if any of them fails.'
+        )
 
     def handle(self, *args, **options):
-        # We only want to invalidate the API response cache once data loading
-        # completes. Disconnecting the api_change_receiver function from post_save
-        # and post_delete signals prevents model changes during data loading from
-        # repeatedly invalidating the cache.
-        for model in apps.get_app_config('course_metadata').get_models():
-            for signal in (post_save, post_delete):
-                signal.disconnect(receiver=api_change_receiver, sender=model)
+        # We only want to invalidate the API response cache once data loading completes.
+        disconnect_api_change_receiver()
 
         # For each partner defined...
         partners = Partner.objects.all()
@@ -83,23 +308,80 @@ class Command(BaseCommand):
         if not partners:
             raise CommandError('No partners available!')
 
-        token_type = 'JWT'
-        for partner in partners:
-            logger.info('Retrieving access token for partner [{}]'.format(partner.short_code))
+        since = options.get('since')
+        if since:
+            try:
+                since = parse(since)
+            except (OverflowError, ValueError):
+                raise CommandError('Invalid value for --since: [{}]'.format(since))
+
+            if not since.tzinfo:
+                since = since.replace(tzinfo=pytz.UTC)
+
+        loader_kwargs = {}
+        if options.get('incremental'):
+            loader_kwargs['incremental'] = True
+        if since:
+            loader_kwargs['since'] = since
+
+        # Tokens are retrieved again for every refresh, since they expire.
+        access_tokens.clear()
 
+        staged = options.get('staged')
+        if options.get('parallel_partners'):
+            failed_partners = self.refresh_partners_in_parallel(list(partners), loader_kwargs, staged)
+        elif staged:
+            failed_partners = [
+                partner.short_code for partner in partners if not self.refresh_partner_staged(partner, loader_kwargs)
+            ]
+        else:
+            scheduler = self.get_scheduler()
+
+            for partner in partners:
+                self.add_partner_tasks(scheduler, partner, loader_kwargs)
+
+            results = self.run_scheduler(scheduler)
+            report_results(results.values())
+            failed_partners = get_failed_partners(partners, results)
+
+        if staged:
+            # Partners were published as their transactions were committed.
+            logger.info('Data loading complete.')
+        else:
+            timestamp = time.time()
+            logger.info(
+                'Data loading complete. Updating API timestamp to {timestamp}.'.format(timestamp=timestamp)
+            )
+
+            set_api_timestamp(timestamp)
+
+        # Cleaned HTML is memoized across refreshes. Old entries are pruned, so those of content which is no longer
+        # loaded do not accumulate.
+        prune_cleaned_html()
+
+        if settings.API_CACHE_WARMING_MANIFEST:
+            # Cached responses were invalidated above, so rebuild the most requested ones before clients do. Those
+            # built from search results are left to update_index, since the search index has not been rebuilt yet.
             try:
-                access_token, __ = EdxRestApiClient.get_oauth_access_token(
-                    '{root}/access_token'.format(root=partner.oidc_url_root.strip('/')),
-                    partner.oidc_key,
-                    partner.oidc_secret,
-                    token_type=token_type
-                )
-            except Exception:
-                logger.exception('No access token acquired through client_credential flow.')
-                raise
-            username = jwt.decode(access_token, verify=False)['preferred_username']
-            kwargs = {'username': username} if username else {}
+                call_command('warm_api_cache', skip_search_index=True)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Failed to warm the API cache.')
+
+        if failed_partners:
+            raise CommandError('Failed to refresh partners: {}'.format(', '.join(failed_partners)))
+
+    def get_scheduler(self):
+        if waffle.switch_is_active('parallel_refresh_pipeline'):
+            return DependencyScheduler(
+                max_workers=DataLoaderConfig.get_solo().max_parallel_loaders,
+                executor_class=concurrent.futures.ProcessPoolExecutor
+            )
+
+        return DependencyScheduler()
 
+    def run_scheduler(self, scheduler):
+        """ Runs the tasks of a scheduler, and returns their results. """
+        if scheduler.executor_class:
             # The Linux kernel implements copy-on-write when fork() is called to create a new
             # process. Pages that the parent and child processes share, such as the database
             # connection, are marked read-only. If a write is performed on a read-only page
@@ -121,77 +403,147 @@ class Command(BaseCommand):
             # to open a new one, and the parent ends up running a query on a closed connection.
             # This results in a 'MySQL server has gone away' error.
             #
-            # To resolve this, we force Django to reconnect to the database before running any queries.
-            connection.connect()
+            # To resolve this, we close the connection before the loader processes are forked, so
+            # it is not shared with them. Django opens a new one the next time a query is run.
+            connection.close()
 
-            # If no courses exist for this partner, this command is likely being run on a
-            # new catalog installation. In that case, we don't want multiple threads racing
-            # to create courses. If courses do exist, this command is likely being run
-            # as an update, significantly lowering the probability of race conditions.
-            courses_exist = Course.objects.filter(partner=partner).exists()
-            is_threadsafe = courses_exist and waffle.switch_is_active('threaded_metadata_write')
-            max_workers = DataLoaderConfig.get_solo().max_workers
+        return scheduler.run()
 
-            logger.info(
-                'Command is{negation} using threads to write data.'.format(negation='' if is_threadsafe else ' not')
-            )
-
-            pipeline = (
-                (
-                    (SubjectMarketingSiteDataLoader, partner.marketing_site_url_root, max_workers),
-                    (SchoolMarketingSiteDataLoader, partner.marketing_site_url_root, max_workers),
-                    (SponsorMarketingSiteDataLoader, partner.marketing_site_url_root, max_workers),
-                    (PersonMarketingSiteDataLoader, partner.marketing_site_url_root, max_workers),
-                ),
-                (
-                    (CourseMarketingSiteDataLoader, partner.marketing_site_url_root, max_workers),
-                    (OrganizationsApiDataLoader, partner.organizations_api_url, max_workers),
-                ),
-                (
-                    (CoursesApiDataLoader, partner.courses_api_url, max_workers),
-                ),
-                (
-                    (EcommerceApiDataLoader, partner.ecommerce_api_url, 1),
-                    (ProgramsApiDataLoader, partner.programs_api_url, max_workers),
-                ),
-            )
+    def add_partner_tasks(self, scheduler, partner, loader_kwargs, allow_threads=True):
+        """
+        Adds a task to the scheduler for each of the partner's data loaders. Loaders only write data from multiple
+        threads if allow_threads is True. The partner's access token is retrieved by its first task which runs.
+        """
+        # If no courses exist for this partner, this command is likely being run on a
+        # new catalog installation. In that case, we don't want multiple threads racing
+        # to create courses. If courses do exist, this command is likely being run
+        # as an update, significantly lowering the probability of race conditions.
+        courses_exist = Course.objects.filter(partner=partner).exists()
+        is_threadsafe = allow_threads and courses_exist and waffle.switch_is_active('threaded_metadata_write')
+        max_workers = DataLoaderConfig.get_solo().max_workers
 
-            if waffle.switch_is_active('parallel_refresh_pipeline'):
-                for stage in pipeline:
-                    with concurrent.futures.ProcessPoolExecutor() as executor:
-                        for loader_class, api_url, max_workers in stage:
-                            if api_url:
-                                executor.submit(
-                                    execute_parallel_loader,
-                                    loader_class,
-                                    partner,
-                                    api_url,
-                                    access_token,
-                                    token_type,
-                                    max_workers,
-                                    is_threadsafe,
-                                    **kwargs,
-                                )
-            else:
-                # Flatten pipeline and run serially.
-                for loader_class, api_url, max_workers in itertools.chain(*(stage for stage in pipeline)):
-                    if api_url:
-                        execute_loader(
-                            loader_class,
-                            partner,
-                            api_url,
-                            access_token,
-                            token_type,
-                            max_workers,
-                            is_threadsafe,
-                            **kwargs,
-                        )
-
-            # TODO Cleanup CourseRun overrides equivalent to the Course values.
-
-        timestamp = time.time()
         logger.info(
-            'Data loading complete. Updating API timestamp to {timestamp}.'.format(timestamp=timestamp)
+            'Command is{negation} using threads to write data.'.format(negation='' if is_threadsafe else ' not')
         )
 
-        set_api_timestamp(timestamp)
+        # Each loader is started as soon as the loaders it depends on have finished. Loaders for different
+        # partners do not depend on each other, so their pipelines interleave.
+        for loader_class, api_url, max_workers in get_partner_loaders(partner, max_workers):
+            if api_url:
+                scheduler.add(
+                    get_task_name(partner, loader_class.__name__),
+                    execute_partner_loader,
+                    bool(scheduler.executor_class),
+                    loader_class,
+                    partner,
+                    api_url,
+                    max_workers,
+                    is_threadsafe,
+                    dependencies=[get_task_name(partner, name) for name in loader_class.DEPENDENCIES],
+                    **loader_kwargs,
+                )
+
+        # TODO Cleanup CourseRun overrides equivalent to the Course values.
+
+    def refresh_partner_staged(self, partner, loader_kwargs):
+        """
+        Runs the data loaders of a partner in a single transaction, and publishes the partner's data once it is
+        committed, by invalidating its cached API responses. If any loader fails, the transaction is rolled back and
+        the partner's data is left as it was.
+
+        Until the transaction is committed, readers keep seeing the partner's previous data, since the API change
+        receivers are disconnected and the loaders' writes are not visible to other connections. Transactions belong
+        to a connection, so the loaders are run one at a time by this thread, and do not write data from other
+        threads. The transactions of the loaders' own batches become savepoints.
+
+        Returns:
+            bool: True if the partner was published.
+        """
+        scheduler = DependencyScheduler()
+        self.add_partner_tasks(scheduler, partner, loader_kwargs, allow_threads=False)
+
+        # Documents are only invalidated once the transaction is committed, so they are not rebuilt from the previous
+        # data in the meantime.
+        with defer_document_bumps():
+            with transaction.atomic():
+                results = scheduler.run()
+                published = not get_failed_partners([partner], results, require_success=True)
+
+                if not published:
+                    transaction.set_rollback(True)
+
+        # Runs are recorded outside of the transaction, so failed runs are recorded even though their data is not.
+        report_results(results.values())
+
+        if published:
+            logger.info('Publishing partner [%s].', partner.short_code)
+            bump_partner_generations(partner.id)
+        else:
+            logger.error('Rolled back partner [%s], since its loaders did not all succeed.', partner.short_code)
+
+        return published
+
+    def refresh_partners_in_parallel(self, partners, loader_kwargs, staged=False):
+        """
+        Refreshes each partner in its own process, with its own database connection and access token. The number of
+        concurrent requests made to each upstream host is capped across all of the processes. If staged is True, each
+        process refreshes its partner with refresh_partner_staged.
+
+        Returns:
+            list: Short codes of the partners which could not be refreshed.
+        """
+        config = DataLoaderConfig.get_solo()
+        hosts = {get_host(url) for partner in partners for url in get_partner_api_urls(partner) if url}
+
+        with multiprocessing.Manager() as manager:
+            semaphores = {
+                host: manager.BoundedSemaphore(config.rate_limit_shared_max_concurrency) for host in hosts
+            }
+
+            # Close the connection so it is not shared with the partner processes. See execute_parallel_loader.
+            connection.close()
+
+            processes = []
+            for partner in partners:
+                process = multiprocessing.Process(
+                    target=self.refresh_partner,
+                    args=(partner, loader_kwargs, semaphores, staged),
+                    name='refresh-{}'.format(partner.short_code)
+                )
+                process.start()
+                processes.append((partner, process))
+
+            failed_partners = []
+            for partner, process in processes:
+                process.join()
+
+                if process.exitcode == 0:
+                    logger.info('Refreshed partner [%s].', partner.short_code)
+                else:
+                    logger.error('Failed to refresh partner [%s]. Exit code: %s', partner.short_code, process.exitcode)
+                    failed_partners.append(partner.short_code)
+
+        return failed_partners
+
+    def refresh_partner(self, partner, loader_kwargs, semaphores, staged=False):
+        """
+        Runs all data loaders for a single partner. This is the entry point of the processes started by
+        refresh_partners_in_parallel. The process exits with a non-zero status if any loader failed.
+        """
+        connection.close()
+        set_host_semaphores(semaphores)
+
+        try:
+            if staged:
+                failed_partners = [] if self.refresh_partner_staged(partner, loader_kwargs) else [partner.short_code]
+            else:
+                scheduler = self.get_scheduler()
+                self.add_partner_tasks(scheduler, partner, loader_kwargs)
+                results = self.run_scheduler(scheduler)
+                report_results(results.values())
+                failed_partners = get_failed_partners([partner], results, require_success=True)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Failed to refresh partner [%s]!', partner.short_code)
+            sys.exit(1)
+
+        sys.exit(1 if failed_partners else 0)
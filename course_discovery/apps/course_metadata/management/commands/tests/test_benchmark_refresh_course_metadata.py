@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+
+import jwt
+import responses
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from course_discovery.apps.core.tests.factories import PartnerFactory
+from course_discovery.apps.core.tests.utils import mock_api_callback
+from course_discovery.apps.course_metadata.data_loaders.tests import mock_data
+from course_discovery.apps.course_metadata.models import Course, CourseRun
+
+ACCESS_TOKEN = str(jwt.encode({'preferred_username': 'bob'}, 'secret'), 'utf-8')
+
+
+class BenchmarkRefreshCourseMetadataCommandTests(TestCase):
+    def setUp(self):
+        super(BenchmarkRefreshCourseMetadataCommandTests, self).setUp()
+        # Only load data from the Courses API.
+        self.partner = PartnerFactory(
+            marketing_site_url_root=None, organizations_api_url=None, ecommerce_api_url=None, programs_api_url=None
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.corpus = os.path.join(directory.name, 'corpus.jsonl.gz')
+        self.report = os.path.join(directory.name, 'report.json')
+
+    @responses.activate
+    def record(self):
+        url = self.partner.oidc_url_root.strip('/') + '/access_token'
+        responses.add_callback(
+            responses.POST, url, callback=mock_api_callback(url, {'access_token': ACCESS_TOKEN, 'expires_in': 30},
+                                                            results_key=False),
+            content_type='application/json'
+        )
+        url = self.partner.courses_api_url + 'courses/'
+        responses.add_callback(
+            responses.GET, url, callback=mock_api_callback(url, mock_data.COURSES_API_BODIES, pagination=True),
+            content_type='application/json'
+        )
+
+        call_command('benchmark_refresh_course_metadata', '--corpus', self.corpus, '--record')
+
+    def test_record_and_replay(self):
+        """ Verify the recorded responses are replayed, and the resources used by each loader are reported. """
+        self.record()
+        course_run_count = CourseRun.objects.count()
+        self.assertGreater(course_run_count, 0)
+
+        Course.objects.all().delete()
+
+        # Responses are replayed without calling the upstream services.
+        with responses.RequestsMock():
+            call_command('benchmark_refresh_course_metadata', '--corpus', self.corpus, '--report', self.report)
+
+        self.assertEqual(CourseRun.objects.count(), course_run_count)
+
+        with open(self.report) as f:
+            report = json.load(f)
+
+        self.assertEqual(report['requests'], {'requests': 1})
+        self.assertEqual(len(report['loaders']), 1)
+
+        result = report['loaders'][0]
+        self.assertEqual(result['loader'], '{}:CoursesApiDataLoader'.format(self.partner.short_code))
+        self.assertTrue(result['succeeded'])
+        self.assertGreater(result['queries'], 0)
+        self.assertGreater(result['rows_written'], 0)
+        self.assertIn('rss_increase_kb', result)
+        self.assertGreater(report['process_peak_rss_kb'], 0)
+
+    def test_missing_corpus(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_refresh_course_metadata', '--corpus', self.corpus)
@@ -3,6 +3,7 @@ import pytest
 import responses
 from django.core.management import call_command
 
+from course_discovery.apps.course_metadata.management.commands.download_course_images import Command
 from course_discovery.apps.course_metadata.tests.factories import CourseFactory
 
 
@@ -114,3 +115,55 @@ class TestDownloadCourseImages:
 
         assert len(responses.calls) == 1
         self.assert_course_has_no_image(course)
+
+    @responses.activate
+    def test_download_with_checkpoint(self, tmpdir):
+        image_url, image_content = self.mock_image_response()
+        done = CourseFactory(key='edX+A', card_image_url=image_url, image=None)
+        course = CourseFactory(key='edX+B', card_image_url=image_url, image=None)
+        checkpoint = tmpdir.join('checkpoint')
+        checkpoint.write(done.key)
+
+        with mock.patch.object(Command, 'remove_checkpoint'):
+            call_command('download_course_images', '--checkpoint', str(checkpoint))
+
+        # Only the courses after the checkpoint are processed, and the checkpoint moves past them.
+        assert len(responses.calls) == 1
+        assert checkpoint.read() == '{}\n{}'.format(course.key, course.pk)
+        self.assert_course_has_no_image(done)
+
+        course.refresh_from_db()
+        assert course.image.read() == image_content
+
+        call_command('download_course_images', '--checkpoint', str(checkpoint))
+        assert not checkpoint.check()
+
+    @responses.activate
+    def test_download_with_checkpoint_duplicate_keys(self, tmpdir):
+        """ Verify courses sharing the key of the checkpoint, e.g. those of other partners, are not skipped. """
+        image_url, image_content = self.mock_image_response()
+        done = CourseFactory(key='edX+A', card_image_url=image_url, image=None)
+        course = CourseFactory(key='edX+A', card_image_url=image_url, image=None)
+        checkpoint = tmpdir.join('checkpoint')
+        checkpoint.write('{}\n{}'.format(done.key, done.pk))
+
+        call_command('download_course_images', '--checkpoint', str(checkpoint))
+
+        assert len(responses.calls) == 1
+        self.assert_course_has_no_image(done)
+
+        course.refresh_from_db()
+        assert course.image.read() == image_content
+
+    @responses.activate
+    def test_download_with_workers(self):
+        image_url, image_content = self.mock_image_response()
+        courses = CourseFactory.create_batch(5, card_image_url=image_url, image=None)
+
+        call_command('download_course_images', '--workers', '3', '--max_per_host', '2')
+
+        assert len(responses.calls) == len(courses)
+
+        for course in courses:
+            course.refresh_from_db()
+            assert course.image.read() == image_content
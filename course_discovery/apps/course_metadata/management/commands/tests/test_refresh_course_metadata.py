@@ -1,11 +1,16 @@
+import concurrent.futures
+import datetime
 import json
+from urllib.parse import urlparse
 
 import ddt
 import jwt
 import mock
+import pytz
 import responses
+from django.core.cache import cache
 from django.core.management import CommandError, call_command
-from django.test import TransactionTestCase
+from django.test import TransactionTestCase, override_settings
 
 from course_discovery.apps.core.tests.factories import PartnerFactory
 from course_discovery.apps.core.tests.utils import mock_api_callback
@@ -17,12 +22,39 @@ from course_discovery.apps.course_metadata.data_loaders.marketing_site import (
     SponsorMarketingSiteDataLoader, SubjectMarketingSiteDataLoader
 )
 from course_discovery.apps.course_metadata.data_loaders.tests import mock_data
-from course_discovery.apps.course_metadata.management.commands.refresh_course_metadata import execute_parallel_loader
+from course_discovery.apps.course_metadata.management.commands.refresh_course_metadata import (
+    execute_loader, report_results
+)
+from course_discovery.apps.course_metadata.models import DataLoaderConfig, DataLoaderRun, LevelType
 from course_discovery.apps.course_metadata.tests import toggle_switch
 from course_discovery.apps.course_metadata.tests.factories import CourseFactory
 
 JSON = 'application/json'
 ACCESS_TOKEN = str(jwt.encode({'preferred_username': 'bob'}, 'secret'), 'utf-8')
+LOGGER_PATH = 'course_discovery.apps.course_metadata.management.commands.refresh_course_metadata.logger'
+
+
+def get_loader_result(succeeded=True, partner='edx', loader='MockDataLoader', metrics=None):
+    return {'partner': partner, 'loader': loader, 'succeeded': succeeded, 'metrics': metrics}
+
+
+class SynchronousProcess(object):
+    """ Runs the target in the test process, so the mocks of the test apply to it. """
+
+    def __init__(self, target, args, name):
+        self.target = target
+        self.args = args
+        self.name = name
+        self.exitcode = None
+
+    def start(self):
+        try:
+            self.target(*self.args)
+        except SystemExit as exc:
+            self.exitcode = exc.code
+
+    def join(self):
+        pass
 
 
 @ddt.ddt
@@ -125,7 +157,7 @@ class RefreshCourseMetadataCommandTests(TransactionTestCase):
         )
         return bodies
 
-    @mock.patch('course_discovery.apps.api.cache.set_api_timestamp')
+    @mock.patch('course_discovery.apps.api.cache.bump_generation')
     @mock.patch('course_discovery.apps.course_metadata.management.commands.refresh_course_metadata.set_api_timestamp')
     def test_refresh_course_metadata_serial(self, mock_set_api_timestamp, mock_receiver):
         with responses.RequestsMock() as rsps:
@@ -133,7 +165,8 @@ class RefreshCourseMetadataCommandTests(TransactionTestCase):
             self.mock_apis()
 
             with mock.patch('course_discovery.apps.course_metadata.management.commands.'
-                            'refresh_course_metadata.execute_loader') as mock_executor:
+                            'refresh_course_metadata.execute_loader',
+                            return_value=get_loader_result()) as mock_executor:
                 call_command('refresh_course_metadata')
 
                 # Set up expected calls
@@ -147,7 +180,7 @@ class RefreshCourseMetadataCommandTests(TransactionTestCase):
         assert mock_set_api_timestamp.call_count == 1
         assert not mock_receiver.called
 
-    @mock.patch('course_discovery.apps.api.cache.set_api_timestamp')
+    @mock.patch('course_discovery.apps.api.cache.bump_generation')
     @mock.patch('course_discovery.apps.course_metadata.management.commands.refresh_course_metadata.set_api_timestamp')
     def test_refresh_course_metadata_parallel(self, mock_set_api_timestamp, mock_receiver):
         for name in ['threaded_metadata_write', 'parallel_refresh_pipeline']:
@@ -161,12 +194,21 @@ class RefreshCourseMetadataCommandTests(TransactionTestCase):
             # courses, the command won't risk race conditions between threads trying to
             # create the same course.
             CourseFactory(partner=self.partner)
-            with mock.patch('concurrent.futures.ProcessPoolExecutor.submit') as mock_executor:
+            # Mocks cannot be sent to other processes, so run the loaders in threads instead.
+            with mock.patch('concurrent.futures.ProcessPoolExecutor', concurrent.futures.ThreadPoolExecutor), \
+                    mock.patch('course_discovery.apps.course_metadata.management.commands.'
+                               'refresh_course_metadata.connection') as mock_connection, \
+                    mock.patch('course_discovery.apps.course_metadata.management.commands.'
+                               'refresh_course_metadata.execute_parallel_loader',
+                               return_value=get_loader_result()) as mock_executor:
                 call_command('refresh_course_metadata')
 
+                # The connection is not shared with the loader processes.
+                assert mock_connection.close.called
+                assert not mock_connection.connect.called
+
                 # Set up expected calls
-                expected_calls = [mock.call(execute_parallel_loader, loader_class,
-                                            self.partner, api_url, ACCESS_TOKEN,
+                expected_calls = [mock.call(loader_class, self.partner, api_url, ACCESS_TOKEN,
                                             'JWT', max_workers or 7, True, **self.kwargs)
                                   for loader_class, api_url, max_workers in self.pipeline]
                 mock_executor.assert_has_calls(expected_calls, any_order=True)
@@ -176,6 +218,185 @@ class RefreshCourseMetadataCommandTests(TransactionTestCase):
         assert mock_set_api_timestamp.call_count == 1
         assert not mock_receiver.called
 
+    @ddt.data(
+        (['--incremental'], {'incremental': True}),
+        (['--since=2018-06-01T12:00:00'], {'since': datetime.datetime(2018, 6, 1, 12, tzinfo=pytz.UTC)}),
+    )
+    @ddt.unpack
+    def test_refresh_course_metadata_incremental(self, command_args, expected_kwargs):
+        """ Verify the incremental options are passed to the data loaders. """
+        with responses.RequestsMock() as rsps:
+            self.mock_access_token_api(rsps)
+
+            with mock.patch('course_discovery.apps.course_metadata.management.commands.'
+                            'refresh_course_metadata.execute_loader',
+                            return_value=get_loader_result()) as mock_executor:
+                call_command('refresh_course_metadata', *command_args)
+
+                self.kwargs.update(expected_kwargs)
+                expected_calls = [mock.call(loader_class, self.partner, api_url,
+                                            ACCESS_TOKEN, 'JWT', max_workers or 7, False, **self.kwargs)
+                                  for loader_class, api_url, max_workers in self.pipeline]
+                mock_executor.assert_has_calls(expected_calls)
+
+    def test_refresh_course_metadata_with_invalid_since(self):
+        """ Verify an error is raised if --since is not a valid datetime. """
+        with self.assertRaises(CommandError):
+            call_command('refresh_course_metadata', '--since=yesterday-ish')
+
+    @ddt.data(True, False)
+    @mock.patch('course_discovery.apps.course_metadata.management.commands.refresh_course_metadata.set_api_timestamp')
+    def test_refresh_course_metadata_parallel_partners(self, succeeded, mock_set_api_timestamp):
+        """ Verify each partner is refreshed in its own process, and partner failures are reported. """
+        module = 'course_discovery.apps.course_metadata.management.commands.refresh_course_metadata'
+
+        with responses.RequestsMock() as rsps:
+            self.mock_access_token_api(rsps)
+
+            with mock.patch('multiprocessing.Process', SynchronousProcess), \
+                    mock.patch(module + '.set_host_semaphores') as mock_set_host_semaphores, \
+                    mock.patch(module + '.execute_loader', return_value=get_loader_result(succeeded)) as mock_executor:
+                if succeeded:
+                    call_command('refresh_course_metadata', '--parallel_partners')
+                else:
+                    with self.assertRaisesRegex(CommandError, self.partner.short_code):
+                        call_command('refresh_course_metadata', '--parallel_partners')
+
+                expected_calls = [mock.call(loader_class, self.partner, api_url,
+                                            ACCESS_TOKEN, 'JWT', max_workers or 7, False, **self.kwargs)
+                                  for loader_class, api_url, max_workers in self.pipeline]
+                mock_executor.assert_has_calls(expected_calls)
+
+        semaphores = mock_set_host_semaphores.call_args[0][0]
+        self.assertIn(urlparse(self.partner.courses_api_url).netloc, semaphores)
+        assert mock_set_api_timestamp.call_count == 1
+
+    def test_refresh_course_metadata_warms_cache(self):
+        """ Verify the API cache is warmed once data loading completes, if a manifest is configured. """
+        module = 'course_discovery.apps.course_metadata.management.commands.refresh_course_metadata'
+
+        with responses.RequestsMock() as rsps:
+            self.mock_access_token_api(rsps)
+
+            with mock.patch(module + '.execute_loader', return_value=get_loader_result()), \
+                    mock.patch(module + '.call_command') as mock_call_command:
+                call_command('refresh_course_metadata')
+                assert not mock_call_command.called
+
+                with override_settings(API_CACHE_WARMING_MANIFEST='/tmp/manifest.json'):
+                    call_command('refresh_course_metadata')
+
+                mock_call_command.assert_called_once_with('warm_api_cache', skip_search_index=True)
+
+    @ddt.data(True, False)
+    @mock.patch('course_discovery.apps.course_metadata.management.commands.refresh_course_metadata.set_api_timestamp')
+    def test_refresh_course_metadata_staged(self, succeeded, mock_set_api_timestamp):
+        """ Verify staged refreshes only publish the data of partners whose loaders all succeeded. """
+        module = 'course_discovery.apps.course_metadata.management.commands.refresh_course_metadata'
+        DataLoaderConfig.objects.update_or_create(pk=1, defaults={'record_runs': True})
+
+        def execute_loader(loader_class, *args, **kwargs):  # pylint: disable=unused-argument
+            LevelType.objects.create(name=loader_class.__name__)
+            return get_loader_result(
+                succeeded or loader_class is not ProgramsApiDataLoader, self.partner.short_code, loader_class.__name__
+            )
+
+        with responses.RequestsMock() as rsps:
+            self.mock_access_token_api(rsps)
+
+            with mock.patch(module + '.execute_loader', side_effect=execute_loader) as mock_executor, \
+                    mock.patch(module + '.bump_partner_generations') as mock_bump_partner_generations:
+                if succeeded:
+                    call_command('refresh_course_metadata', '--staged')
+                else:
+                    with self.assertRaisesRegex(CommandError, self.partner.short_code):
+                        call_command('refresh_course_metadata', '--staged')
+
+                expected_calls = [mock.call(loader_class, self.partner, api_url,
+                                            ACCESS_TOKEN, 'JWT', max_workers or 7, False, **self.kwargs)
+                                  for loader_class, api_url, max_workers in self.pipeline]
+                mock_executor.assert_has_calls(expected_calls)
+
+        # Data is only committed, and published to API clients, if every loader succeeded. Runs are always recorded.
+        self.assertEqual(LevelType.objects.count(), len(self.pipeline) if succeeded else 0)
+        self.assertEqual(DataLoaderRun.objects.count(), len(self.pipeline))
+        expected_calls = [mock.call(self.partner.id)] if succeeded else []
+        self.assertEqual(mock_bump_partner_generations.call_args_list, expected_calls)
+        assert not mock_set_api_timestamp.called
+
+    @ddt.data(True, False)
+    def test_refresh_course_metadata_staged_parallel_partners(self, succeeded):
+        """ Verify partners refreshed in parallel processes are published by their own process. """
+        module = 'course_discovery.apps.course_metadata.management.commands.refresh_course_metadata'
+
+        with responses.RequestsMock() as rsps:
+            self.mock_access_token_api(rsps)
+
+            with mock.patch('multiprocessing.Process', SynchronousProcess), \
+                    mock.patch(module + '.set_host_semaphores'), \
+                    mock.patch(module + '.execute_loader', return_value=get_loader_result(succeeded)), \
+                    mock.patch(module + '.bump_partner_generations') as mock_bump_partner_generations:
+                if succeeded:
+                    call_command('refresh_course_metadata', '--staged', '--parallel_partners')
+                else:
+                    with self.assertRaisesRegex(CommandError, self.partner.short_code):
+                        call_command('refresh_course_metadata', '--staged', '--parallel_partners')
+
+        expected_calls = [mock.call(self.partner.id)] if succeeded else []
+        self.assertEqual(mock_bump_partner_generations.call_args_list, expected_calls)
+
+    def test_execute_loader(self):
+        """ Verify execute_loader reports whether the loader succeeded, and the metrics it collected. """
+        loader_class = mock.Mock(__name__='MockDataLoader')
+        loader_class.return_value.run.return_value = {'counters': {'created': 1}}
+        self.assertEqual(execute_loader(loader_class, self.partner), {
+            'partner': self.partner.short_code,
+            'loader': 'MockDataLoader',
+            'succeeded': True,
+            'metrics': {'counters': {'created': 1}},
+        })
+
+        loader_class.return_value.run.side_effect = Exception
+        loader_class.return_value.metrics.as_dict.return_value = {'counters': {'failed': 1}}
+        result = execute_loader(loader_class, self.partner)
+        self.assertFalse(result['succeeded'])
+        self.assertEqual(result['metrics'], {'counters': {'failed': 1}})
+
+    @ddt.data(True, False)
+    def test_report_results(self, record_runs):
+        """ Verify the results are logged as one JSON report, and only saved if the DataLoaderConfig asks for it. """
+        # The config is cached by django-solo.
+        self.addCleanup(cache.clear)
+        DataLoaderConfig.objects.update_or_create(pk=1, defaults={'record_runs': record_runs})
+        metrics = {'counters': {'created': 2}, 'timings': {'total': 1.5}, 'latency': {'count': 1}}
+        results = [
+            get_loader_result(True, partner=self.partner.short_code, loader='CoursesApiDataLoader', metrics=metrics),
+            get_loader_result(False, partner=self.partner.short_code, loader='ProgramsApiDataLoader'),
+            None,
+        ]
+
+        with mock.patch(LOGGER_PATH) as mock_logger:
+            report = report_results(results)
+            mock_logger.info.assert_called_once_with('Data loader report: %s', json.dumps(report))
+
+        self.assertFalse(report['succeeded'])
+        partner_report = report['partners'][self.partner.short_code]
+        self.assertEqual(partner_report['counters'], {'created': 2})
+        self.assertEqual(list(partner_report['loaders']), ['CoursesApiDataLoader', 'ProgramsApiDataLoader'])
+
+        runs = DataLoaderRun.objects.order_by('loader')
+        if record_runs:
+            self.assertEqual(
+                [(run.partner, run.loader, run.succeeded, run.duration) for run in runs],
+                [
+                    (self.partner, 'CoursesApiDataLoader', True, 1.5),
+                    (self.partner, 'ProgramsApiDataLoader', False, None),
+                ]
+            )
+            self.assertEqual(runs[0].metrics, metrics)
+        else:
+            self.assertFalse(runs.exists())
+
     def test_refresh_course_metadata_with_invalid_partner_code(self):
         """ Verify an error is raised if an invalid partner code is passed on the command line. """
         with self.assertRaises(CommandError):
@@ -187,11 +408,37 @@ class RefreshCourseMetadataCommandTests(TransactionTestCase):
         with mock.patch('edx_rest_api_client.client.EdxRestApiClient.get_oauth_access_token', side_effect=Exception):
             logger = 'course_discovery.apps.course_metadata.management.commands.refresh_course_metadata.logger'
             with mock.patch(logger) as mock_logger:
-                with self.assertRaises(Exception):
+                with self.assertRaisesRegex(CommandError, self.partner.short_code):
                     call_command('refresh_course_metadata')
             expected_calls = [mock.call('No access token acquired through client_credential flow.')]
             mock_logger.exception.assert_has_calls(expected_calls)
 
+    def test_refresh_course_metadata_token_retrieved_lazily(self):
+        """ Verify each partner's access token is retrieved once, when the first of its loaders runs. """
+        module = 'course_discovery.apps.course_metadata.management.commands.refresh_course_metadata'
+        other_partner = PartnerFactory()
+        events = []
+
+        def get_access_token(partner):
+            events.append(('token', partner))
+            return ACCESS_TOKEN
+
+        def execute_loader(loader_class, partner, *args, **kwargs):  # pylint: disable=unused-argument
+            events.append(('loader', partner))
+            return get_loader_result()
+
+        with mock.patch(module + '.get_access_token', side_effect=get_access_token), \
+                mock.patch(module + '.execute_loader', side_effect=execute_loader):
+            call_command('refresh_course_metadata')
+
+        tokens = [event for event in events if event[0] == 'token']
+        self.assertEqual(tokens, [('token', self.partner), ('token', other_partner)])
+        for partner in (self.partner, other_partner):
+            self.assertLess(events.index(('token', partner)), events.index(('loader', partner)))
+
+        # The second partner's token is not retrieved before the first partner's loaders start.
+        self.assertLess(events.index(('loader', self.partner)), events.index(('token', other_partner)))
+
     def test_refresh_course_metadata_with_loader_exception(self):
         """ Verify execution continues if an individual data loader fails. """
         with responses.RequestsMock() as rsps:
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.15 on 2026-10-17 09:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_metadata', '0084_auto_20180522_1339'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataloaderconfig',
+            name='rate_limit_default_retry_after',
+            field=models.PositiveSmallIntegerField(default=30, help_text='Number of seconds to pause after a 429 or 503 response without a Retry-After header.'),
+        ),
+        migrations.AddField(
+            model_name='dataloaderconfig',
+            name='rate_limit_initial_concurrency',
+            field=models.PositiveSmallIntegerField(default=2, help_text='Number of concurrent requests made to a single upstream host when a loader starts.'),
+        ),
+        migrations.AddField(
+            model_name='dataloaderconfig',
+            name='rate_limit_max_concurrency',
+            field=models.PositiveSmallIntegerField(default=7, help_text='Maximum number of concurrent requests made to a single upstream host. Concurrency grows toward this value while the upstream responds without throttling.'),
+        ),
+        migrations.AddField(
+            model_name='dataloaderconfig',
+            name='rate_limit_max_retries',
+            field=models.PositiveSmallIntegerField(default=5, help_text='Number of times a request is retried after a 429 or 503 response.'),
+        ),
+        migrations.AddField(
+            model_name='dataloaderconfig',
+            name='rate_limit_requests_per_second',
+            field=models.PositiveSmallIntegerField(default=10, help_text='Maximum number of requests per second made to a single upstream host. Set to 0 to disable this limit.'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.15 on 2026-10-17 10:03
+from __future__ import unicode_literals
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_auto_20171004_1133'),
+        ('course_metadata', '0085_dataloaderconfig_rate_limit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataLoaderCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('loader', models.CharField(help_text='Name of the data loader class.', max_length=255)),
+                ('high_water_mark', models.DateTimeField(blank=True, help_text='Time at which the last successful run of the data loader started.', null=True)),
+                ('partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.Partner')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DataLoaderFingerprint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('loader', models.CharField(help_text='Name of the data loader class.', max_length=255)),
+                ('key', models.CharField(help_text='Key identifying the upstream record.', max_length=255)),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.Partner')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='dataloaderfingerprint',
+            unique_together=set([('partner', 'loader', 'key')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dataloadercheckpoint',
+            unique_together=set([('partner', 'loader')]),
+        ),
+    ]
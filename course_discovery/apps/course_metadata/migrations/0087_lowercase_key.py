@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.15 on 2026-10-17 11:20
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def populate_lowercase_keys(apps, schema_editor):
+    for model_name in ('Course', 'CourseRun', 'Organization'):
+        model = apps.get_model('course_metadata', model_name)
+        model.objects.update(lowercase_key=Lower('key'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_metadata', '0086_dataloadercheckpoint_dataloaderfingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='lowercase_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='courserun',
+            name='lowercase_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='lowercase_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_lowercase_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.15 on 2026-10-17 12:05
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_metadata', '0087_lowercase_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataloaderconfig',
+            name='max_parallel_loaders',
+            field=models.PositiveSmallIntegerField(default=4, help_text='Maximum number of data loaders run at the same time when the parallel refresh pipeline is enabled.'),
+        ),
+    ]
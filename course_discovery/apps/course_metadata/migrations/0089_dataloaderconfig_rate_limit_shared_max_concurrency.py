@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.15 on 2026-10-17 12:48
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_metadata', '0088_dataloaderconfig_max_parallel_loaders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataloaderconfig',
+            name='rate_limit_shared_max_concurrency',
+            field=models.PositiveSmallIntegerField(default=14, help_text='Maximum number of concurrent requests made to a single upstream host by all partners, when partners are refreshed in parallel.'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.15 on 2026-10-17 13:42
+from __future__ import unicode_literals
+
+import django.db.models.deletion
+import django_extensions.db.fields
+import jsonfield.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_auto_20171004_1133'),
+        ('course_metadata', '0089_dataloaderconfig_rate_limit_shared_max_concurrency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataLoaderRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('loader', models.CharField(help_text='Name of the data loader class.', max_length=255)),
+                ('succeeded', models.BooleanField(default=False)),
+                ('duration', models.FloatField(blank=True, help_text='Duration of the run, in seconds.', null=True)),
+                ('metrics', jsonfield.fields.JSONField(default=dict, help_text='Counters, timings and request latencies of the run.')),
+                ('partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.Partner')),
+            ],
+            options={
+                'get_latest_by': 'created',
+            },
+        ),
+        migrations.AddField(
+            model_name='dataloaderconfig',
+            name='record_runs',
+            field=models.BooleanField(default=False, help_text='Save the metrics collected by each data loader run, in addition to logging them.'),
+        ),
+    ]
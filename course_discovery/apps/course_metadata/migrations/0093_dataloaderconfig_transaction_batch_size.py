@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.15 on 2026-10-17 17:02
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_metadata', '0092_dataloaderimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataloaderconfig',
+            name='transaction_batch_size',
+            field=models.PositiveSmallIntegerField(default=50, help_text='Number of records written by a data loader in each database transaction. Records are still rolled back individually if they fail. Set to 0 to commit every write on its own.'),
+        ),
+    ]
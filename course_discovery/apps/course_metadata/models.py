@@ -16,6 +16,7 @@ from django.utils.translation import ugettext_lazy as _
 from django_extensions.db.fields import AutoSlugField
 from django_extensions.db.models import TimeStampedModel
 from haystack.query import SearchQuerySet
+from jsonfield.fields import JSONField
 from parler.models import TranslatableModel, TranslatedFieldsModel
 from solo.models import SingletonModel
 from sortedm2m.fields import SortedManyToManyField
@@ -28,7 +29,9 @@ from course_discovery.apps.course_metadata.choices import CourseRunPacing, Cours
 from course_discovery.apps.course_metadata.publishers import (
     CourseRunMarketingSitePublisher, ProgramMarketingSitePublisher
 )
-from course_discovery.apps.course_metadata.query import CourseQuerySet, CourseRunQuerySet, ProgramQuerySet
+from course_discovery.apps.course_metadata.query import (
+    CourseQuerySet, CourseRunQuerySet, LowercaseKeyQuerySet, ProgramQuerySet
+)
 from course_discovery.apps.course_metadata.utils import UploadToFieldNamePath, clean_query, custom_render_variations
 from course_discovery.apps.ietf_language_tags.models import LanguageTag
 from course_discovery.apps.publisher.utils import VALID_CHARS_IN_COURSE_NUM_AND_ORG_KEY
@@ -70,6 +73,28 @@ class AbstractMediaModel(TimeStampedModel):
         abstract = True
 
 
+class AbstractLowercaseKeyModel(TimeStampedModel):
+    """ Abstract base class for models with a key field which is looked up case-insensitively.
+
+    The lowercased key is stored in an indexed column, so case-insensitive lookups can filter on lowercase_key with
+    an equality comparison instead of using key__iexact, which cannot use an index. It is kept in sync by save(), and
+    by the update() and bulk_create() methods of LowercaseKeyQuerySet, which the managers of subclasses must use.
+    """
+    lowercase_key = models.CharField(max_length=255, db_index=True, editable=False)
+
+    class Meta(object):
+        abstract = True
+
+    def save(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        self.lowercase_key = self.key.lower()
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'key' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'lowercase_key'}
+
+        super(AbstractLowercaseKeyModel, self).save(*args, **kwargs)
+
+
 class AbstractSocialNetworkModel(TimeStampedModel):
     """ SocialNetwork model. """
     FACEBOOK = 'facebook'
@@ -211,7 +236,7 @@ class SyllabusItem(AbstractValueModel):
     parent = models.ForeignKey('self', blank=True, null=True, related_name='children')
 
 
-class Organization(TimeStampedModel):
+class Organization(AbstractLowercaseKeyModel):
     """ Organization model. """
     partner = models.ForeignKey(Partner, null=True, blank=False)
     uuid = models.UUIDField(blank=False, null=False, default=uuid4, editable=False, verbose_name=_('UUID'))
@@ -234,6 +259,8 @@ class Organization(TimeStampedModel):
         help_text=_('Pick a tag from the suggestions. To make a new tag, add a comma after the tag name.'),
     )
 
+    objects = LowercaseKeyQuerySet.as_manager()
+
     def clean(self):
         if not VALID_CHARS_IN_COURSE_NUM_AND_ORG_KEY.match(self.key):
             raise ValidationError(_('Please do not use any spaces or special characters other than period, '
@@ -334,7 +361,7 @@ class Position(TimeStampedModel):
         return name
 
 
-class Course(TimeStampedModel):
+class Course(AbstractLowercaseKeyModel):
     """ Course model. """
     partner = models.ForeignKey(Partner)
     uuid = models.UUIDField(default=uuid4, editable=False, verbose_name=_('UUID'))
@@ -451,7 +478,7 @@ class Course(TimeStampedModel):
         return cls.objects.filter(pk__in=ids)
 
 
-class CourseRun(TimeStampedModel):
+class CourseRun(AbstractLowercaseKeyModel):
     """ CourseRun model. """
     uuid = models.UUIDField(default=uuid4, editable=False, verbose_name=_('UUID'))
     course = models.ForeignKey(Course, related_name='course_runs')
@@ -1310,3 +1337,120 @@ class DataLoaderConfig(SingletonModel):
     Configuration for data loaders used in the refresh_course_metadata command.
     """
     max_workers = models.PositiveSmallIntegerField(default=7)
+    max_parallel_loaders = models.PositiveSmallIntegerField(
+        default=4, help_text=_('Maximum number of data loaders run at the same time when the parallel refresh '
+                               'pipeline is enabled.')
+    )
+    rate_limit_requests_per_second = models.PositiveSmallIntegerField(
+        default=10, help_text=_('Maximum number of requests per second made to a single upstream host. '
+                                'Set to 0 to disable this limit.')
+    )
+    rate_limit_initial_concurrency = models.PositiveSmallIntegerField(
+        default=2, help_text=_('Number of concurrent requests made to a single upstream host when a loader starts.')
+    )
+    rate_limit_max_concurrency = models.PositiveSmallIntegerField(
+        default=7, help_text=_('Maximum number of concurrent requests made to a single upstream host. Concurrency '
+                               'grows toward this value while the upstream responds without throttling.')
+    )
+    rate_limit_shared_max_concurrency = models.PositiveSmallIntegerField(
+        default=14, help_text=_('Maximum number of concurrent requests made to a single upstream host by all '
+                                'partners, when partners are refreshed in parallel.')
+    )
+    rate_limit_max_retries = models.PositiveSmallIntegerField(
+        default=5, help_text=_('Number of times a request is retried after a 429 or 503 response.')
+    )
+    rate_limit_default_retry_after = models.PositiveSmallIntegerField(
+        default=30, help_text=_('Number of seconds to pause after a 429 or 503 response without a Retry-After '
+                                'header.')
+    )
+    record_runs = models.BooleanField(
+        default=False, help_text=_('Save the metrics collected by each data loader run, in addition to logging them.')
+    )
+    transaction_batch_size = models.PositiveSmallIntegerField(
+        default=50, help_text=_('Number of records written by a data loader in each database transaction. Records '
+                                'are still rolled back individually if they fail. Set to 0 to commit every write '
+                                'on its own.')
+    )
+
+
+class DataLoaderCheckpoint(TimeStampedModel):
+    """
+    High-water mark recorded by a data loader at the end of a successful run for a partner.
+    """
+    partner = models.ForeignKey(Partner)
+    loader = models.CharField(max_length=255, help_text=_('Name of the data loader class.'))
+    high_water_mark = models.DateTimeField(
+        null=True, blank=True, help_text=_('Time at which the last successful run of the data loader started.')
+    )
+
+    class Meta(object):
+        unique_together = (
+            ('partner', 'loader'),
+        )
+
+    def __str__(self):
+        return '{loader}: {high_water_mark}'.format(loader=self.loader, high_water_mark=self.high_water_mark)
+
+
+class DataLoaderRun(TimeStampedModel):
+    """
+    Metrics collected by a data loader while loading the data of a partner.
+    """
+    partner = models.ForeignKey(Partner)
+    loader = models.CharField(max_length=255, help_text=_('Name of the data loader class.'))
+    succeeded = models.BooleanField(default=False)
+    duration = models.FloatField(null=True, blank=True, help_text=_('Duration of the run, in seconds.'))
+    metrics = JSONField(default=dict, help_text=_('Counters, timings and request latencies of the run.'))
+
+    class Meta(object):
+        get_latest_by = 'created'
+
+    def __str__(self):
+        return '{loader}: {created}'.format(loader=self.loader, created=self.created)
+
+
+class DataLoaderFingerprint(models.Model):
+    """
+    Hash of the cleaned upstream payload last ingested for a record. Incremental refreshes skip records whose
+    payload hash has not changed.
+    """
+    partner = models.ForeignKey(Partner)
+    loader = models.CharField(max_length=255, help_text=_('Name of the data loader class.'))
+    key = models.CharField(max_length=255, help_text=_('Key identifying the upstream record.'))
+    fingerprint = models.CharField(max_length=40)
+
+    class Meta(object):
+        unique_together = (
+            ('partner', 'loader', 'key'),
+        )
+
+    def __str__(self):
+        return '{key}: {fingerprint}'.format(key=self.key, fingerprint=self.fingerprint)
+
+
+class CleanedHtml(models.Model):
+    """
+    HTML cleaned by the data loaders, keyed by a hash of the HTML loaded from upstream services, so unchanged content
+    is not cleaned again by every refresh. Rows are pruned once they are older than a retention period, so content
+    which is no longer loaded does not accumulate (see html_cleaning.prune_cleaned_html).
+    """
+    hash = models.CharField(max_length=40, unique=True)
+    html = models.TextField()
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.hash
+
+
+class DataLoaderImage(models.Model):
+    """
+    Validators and content hash of an image last downloaded by a data loader. Used to skip downloading and saving
+    images which have not changed.
+    """
+    url = models.URLField(max_length=255, unique=True)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=255, blank=True)
+    content_hash = models.CharField(max_length=40)
+
+    def __str__(self):
+        return self.url
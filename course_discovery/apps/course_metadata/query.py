@@ -2,12 +2,34 @@ import datetime
 
 import pytz
 from django.db import models
+from django.db.models.functions import Lower
 from django.db.models.query_utils import Q
 
 from course_discovery.apps.course_metadata.choices import CourseRunStatus, ProgramStatus
 
 
-class CourseQuerySet(models.QuerySet):
+class LowercaseKeyQuerySet(models.QuerySet):
+    """ QuerySet of models with a lowercase_key (see AbstractLowercaseKeyModel), which keeps it in sync with the key
+    when rows are written without being saved one at a time. """
+
+    def update(self, **kwargs):
+        if 'key' in kwargs:
+            key = kwargs['key']
+            kwargs['lowercase_key'] = key.lower() if isinstance(key, str) else Lower(key)
+
+        return super(LowercaseKeyQuerySet, self).update(**kwargs)
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.lowercase_key = obj.key.lower()
+
+        return super(LowercaseKeyQuerySet, self).bulk_create(objs, *args, **kwargs)
+
+
+class CourseQuerySet(LowercaseKeyQuerySet):
     def available(self):
         """
         A Course is considered to be "available" if it contains at least one CourseRun
@@ -60,7 +82,7 @@ class CourseQuerySet(models.QuerySet):
         return query.distinct()
 
 
-class CourseRunQuerySet(models.QuerySet):
+class CourseRunQuerySet(LowercaseKeyQuerySet):
     def active(self):
         """ Returns CourseRuns that have not yet ended and meet the following enrollment criteria:
             - Open for enrollment
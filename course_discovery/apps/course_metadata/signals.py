@@ -1,9 +1,12 @@
 import waffle
 from django.apps import apps
-from django.db.models.signals import post_delete, post_save, pre_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
 from course_discovery.apps.api.cache import api_change_receiver
+from course_discovery.apps.api.documents import (
+    document_change_receiver, document_m2m_change_receiver, get_document_m2m_senders, get_document_models
+)
 from course_discovery.apps.course_metadata.models import Program
 from course_discovery.apps.course_metadata.publishers import ProgramMarketingSitePublisher
 
@@ -27,3 +30,12 @@ def delete_program(sender, instance, **kwargs):  # pylint: disable=unused-argume
 for model in apps.get_app_config('course_metadata').get_models():
     for signal in (post_save, post_delete):
         signal.connect(api_change_receiver, sender=model)
+
+# Invalidate the API documents a changed object is part of. These receivers remain connected while course metadata is
+# refreshed, so only the documents of changed objects are rebuilt.
+for model in get_document_models():
+    for signal in (post_save, pre_delete):
+        signal.connect(document_change_receiver, sender=model)
+
+for through in get_document_m2m_senders():
+    m2m_changed.connect(document_m2m_change_receiver, sender=through)
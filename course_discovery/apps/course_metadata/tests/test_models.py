@@ -21,7 +21,7 @@ from course_discovery.apps.core.utils import SearchQuerySetWrapper
 from course_discovery.apps.course_metadata.choices import CourseRunStatus, ProgramStatus
 from course_discovery.apps.course_metadata.models import (
     FAQ, AbstractMediaModel, AbstractNamedModel, AbstractValueModel, CorporateEndorsement, Course, CourseRun,
-    Endorsement, Seat, SeatType, Subject, Topic
+    Endorsement, Organization, Seat, SeatType, Subject, Topic
 )
 from course_discovery.apps.course_metadata.publishers import (
     CourseRunMarketingSitePublisher, ProgramMarketingSitePublisher
@@ -531,6 +531,46 @@ class AbstractValueModelTests(TestCase):
         self.assertEqual(str(instance), value)
 
 
+@ddt.ddt
+class AbstractLowercaseKeyModelTests(TestCase):
+    """ Tests for AbstractLowercaseKeyModel. """
+
+    KEYS = {
+        factories.CourseFactory: ('edX+DemoX', 'edX+DemoX_2'),
+        factories.CourseRunFactory: ('course-v1:edX+DemoX+1T2018', 'course-v1:edX+DemoX+2T2018'),
+        factories.OrganizationFactory: ('edX', 'edX_2'),
+    }
+
+    @ddt.data(*KEYS)
+    def test_save(self, factory):
+        """ Verify the lowercased key is stored whenever the key is saved. """
+        key, new_key = self.KEYS[factory]
+        instance = factory(key=key)
+        self.assertEqual(instance.lowercase_key, key.lower())
+
+        instance.key = new_key
+        instance.save(update_fields=['key'])
+        instance.refresh_from_db()
+        self.assertEqual(instance.lowercase_key, new_key.lower())
+        self.assertEqual(instance.__class__.objects.get(lowercase_key=new_key.lower()), instance)
+
+    @ddt.data(*KEYS)
+    def test_update(self, factory):
+        """ Verify the lowercased key is stored when the key is updated without saving the instance. """
+        key, new_key = self.KEYS[factory]
+        instance = factory(key=key)
+
+        instance.__class__.objects.filter(pk=instance.pk).update(key=new_key)
+        instance.refresh_from_db()
+        self.assertEqual(instance.lowercase_key, new_key.lower())
+
+    def test_bulk_create(self):
+        """ Verify the lowercased key is stored when instances are created in bulk. """
+        partner = factories.PartnerFactory()
+        Organization.objects.bulk_create([Organization(key=key, name=key, partner=partner) for key in ('edX', 'MITx')])
+        self.assertEqual(set(Organization.objects.values_list('lowercase_key', flat=True)), {'edx', 'mitx'})
+
+
 @ddt.ddt
 class ProgramTests(TestCase):
     """Tests of the Program model."""
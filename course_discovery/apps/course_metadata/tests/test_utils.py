@@ -6,8 +6,12 @@ from django.test import TestCase
 
 from course_discovery.apps.course_metadata import utils
 from course_discovery.apps.course_metadata.exceptions import MarketingSiteAPIClientException
-from course_discovery.apps.course_metadata.tests.factories import ProgramFactory
+from course_discovery.apps.course_metadata.models import CourseRun
+from course_discovery.apps.course_metadata.tests.factories import (
+    CourseFactory, CourseRunFactory, PersonFactory, ProgramFactory, SubjectFactory
+)
 from course_discovery.apps.course_metadata.tests.mixins import MarketingSiteAPIClientTestMixin
+from course_discovery.apps.ietf_language_tags.models import LanguageTag
 
 
 @ddt.ddt
@@ -74,6 +78,42 @@ class MarketingSiteAPIClientTests(MarketingSiteAPIClientTestMixin):
         with self.assertRaises(MarketingSiteAPIClientException):
             self.api_client.csrf_token  # pylint: disable=pointless-statement
 
+    @responses.activate
+    def test_csrf_token_cached(self):
+        """ Verify the CSRF token is only retrieved once per session. """
+        self.mock_login_response(200)
+        self.mock_csrf_token_response(200)
+        self.assertEqual(self.api_client.api_session.headers.get('X-CSRF-Token'), self.csrf_token)
+        self.assertEqual(self.api_client.csrf_token, self.csrf_token)
+        self.assert_responses_call_count(3)
+
+    @responses.activate
+    def test_csrf_token_rejected(self):
+        """ Verify the CSRF token is refreshed, and the request sent again, if the marketing site rejects it. """
+        self.mock_login_response(200)
+        self.mock_csrf_token_response(200)
+        url = '{root}/node.json'.format(root=self.api_root)
+        statuses = [403, 200]
+
+        def request_callback(request):
+            self.assertEqual(request.headers['X-CSRF-Token'], self.csrf_token)
+            return (statuses.pop(0), {}, '{}')
+
+        responses.add_callback(responses.GET, url, callback=request_callback, content_type='application/json')
+
+        response = self.api_client.api_session.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        # Login (2 calls), token, rejected request, new token and retried request
+        self.assert_responses_call_count(6)
+
+    @responses.activate
+    def test_refresh_csrf_token_replaced(self):
+        """ Verify a rejected token which has already been replaced by another thread is not refreshed again. """
+        self.api_client._csrf_token = 'new'  # pylint: disable=protected-access
+        self.assertEqual(self.api_client.refresh_csrf_token(rejected_token='old'), 'new')
+        self.assert_responses_call_count(0)
+
     @responses.activate
     def test_user_id(self):
         self.mock_login_response(200)
@@ -105,3 +145,43 @@ class MarketingSiteAPIClientTests(MarketingSiteAPIClientTestMixin):
         self.mock_csrf_token_response(500)
         with self.assertRaises(MarketingSiteAPIClientException):
             self.api_client.api_session  # pylint: disable=pointless-statement
+
+
+class SyncManyToManyTests(TestCase):
+    def test_sync_many_to_many(self):
+        """ Verify only the objects which were removed or added are written. """
+        course_run = CourseRunFactory()
+        kept, removed, added = PersonFactory.create_batch(3)
+        course_run.staff.add(kept, removed)
+        through = CourseRun.staff.through
+
+        self.assertTrue(utils.sync_many_to_many(course_run.staff, [kept, added]))
+        self.assertEqual(list(course_run.staff.all()), [kept, added])
+        # The relationship to the object which was kept was not written again.
+        self.assertEqual(through.objects.filter(courserun=course_run, person=kept).count(), 1)
+
+        with self.assertNumQueries(1):
+            self.assertFalse(utils.sync_many_to_many(course_run.staff, [kept, added]))
+
+    def test_sync_many_to_many_sorted(self):
+        """ Verify the order of sorted relationships is updated. """
+        course = CourseFactory()
+        first, second, third = SubjectFactory.create_batch(3)
+        course.subjects.add(first, second, third)
+
+        self.assertTrue(utils.sync_many_to_many(course.subjects, [first, third, second]))
+        self.assertEqual(list(course.subjects.all()), [first, third, second])
+
+        self.assertTrue(utils.sync_many_to_many(course.subjects, [first, second]))
+        self.assertEqual(list(course.subjects.all()), [first, second])
+
+    def test_sync_many_to_many_unsorted(self):
+        """ Verify the order of unsorted relationships is ignored. """
+        course_run = CourseRunFactory(transcript_languages=[])
+        languages = list(LanguageTag.objects.all()[:2])
+        course_run.transcript_languages.add(*languages)
+
+        self.assertFalse(utils.sync_many_to_many(course_run.transcript_languages, languages[::-1]))
+
+        self.assertTrue(utils.sync_many_to_many(course_run.transcript_languages, []))
+        self.assertFalse(course_run.transcript_languages.exists())
@@ -1,12 +1,15 @@
 import random
 import string
+import threading
 import uuid
+from collections import OrderedDict
 
-import requests
 from django.utils.functional import cached_property
+from requests.auth import AuthBase
 from stdimage.models import StdImageFieldFile
 from stdimage.utils import UploadTo
 
+from course_discovery.apps.core.http import get_session
 from course_discovery.apps.course_metadata.exceptions import MarketingSiteAPIClientException
 
 RESERVED_ELASTICSEARCH_QUERY_OPERATORS = ('AND', 'OR', 'NOT', 'TO',)
@@ -74,6 +77,85 @@ def custom_render_variations(file_name, variations, storage, replace=True):
     return False
 
 
+def sync_many_to_many(manager, objects):
+    """ Updates a many-to-many relationship to contain exactly the given objects.
+
+    Unlike clearing the relationship and adding every object again, only the rows of objects which were removed or
+    added are deleted and inserted, so relationships which have not changed are not written to at all.
+
+    Sorted relationships (i.e. SortedManyToManyField) keep the order of the given objects. Since new objects are always
+    added after the existing ones, existing objects which are not in the same position relative to each other are
+    removed and added again.
+
+    Args:
+        manager (ManyRelatedManager): Manager of the relationship, e.g. course.subjects.
+        objects (iterable): Model instances which should be related, in order.
+
+    Returns:
+        bool: True if the relationship was changed.
+    """
+    objects_by_pk = OrderedDict((obj.pk, obj) for obj in objects)
+    current = list(manager.values_list('pk', flat=True))
+    current_pks = set(current)
+
+    removed = current_pks.difference(objects_by_pk)
+    added = [pk for pk in objects_by_pk if pk not in current_pks]
+
+    if getattr(manager.through, '_sort_field_name', None):
+        desired = list(objects_by_pk)
+        kept = [pk for pk in current if pk in objects_by_pk]
+        in_order = 0
+
+        while in_order < len(kept) and kept[in_order] == desired[in_order]:
+            in_order += 1
+
+        removed.update(kept[in_order:])
+        added = desired[in_order:]
+
+    if removed:
+        manager.remove(*removed)
+
+    if added:
+        manager.add(*[objects_by_pk[pk] for pk in added])
+
+    return bool(removed or added)
+
+
+class CsrfTokenAuth(AuthBase):
+    """ Sets the marketing site's cached CSRF token on each request.
+
+    If the marketing site rejects the token (e.g. because it expired), the token is refreshed and the request is sent
+    again once.
+    """
+    REJECTED_STATUS_CODES = (401, 403)
+
+    def __init__(self, client, session):
+        self.client = client
+        self.session = session
+
+    def __call__(self, request):
+        request.headers['X-CSRF-Token'] = self.client.csrf_token
+        request.register_hook('response', self.handle_response)
+        return request
+
+    def handle_response(self, response, **kwargs):
+        request = response.request
+
+        if response.status_code not in self.REJECTED_STATUS_CODES or getattr(request, 'csrf_token_refreshed', False):
+            return response
+
+        token = self.client.refresh_csrf_token(rejected_token=request.headers.get('X-CSRF-Token'))
+
+        # Consume the body, so the connection is released back to the pool before the request is sent again.
+        response.content  # pylint: disable=pointless-statement
+        response.close()
+
+        retry = request.copy()
+        retry.headers['X-CSRF-Token'] = token
+        retry.csrf_token_refreshed = True
+        return self.session.send(retry, **kwargs)
+
+
 class MarketingSiteAPIClient(object):
     """
     The marketing site API client we can use to communicate with the marketing site
@@ -88,11 +170,13 @@ class MarketingSiteAPIClient(object):
         self.username = marketing_site_api_username
         self.password = marketing_site_api_password
         self.api_url = api_url.strip('/')
+        self._csrf_token = None
+        self._csrf_token_lock = threading.Lock()
 
     @cached_property
     def init_session(self):
         # Login to set session cookies
-        session = requests.Session()
+        session = get_session()
         login_url = '{root}/user'.format(root=self.api_url)
         login_data = {
             'name': self.username,
@@ -114,13 +198,42 @@ class MarketingSiteAPIClient(object):
             )
         return session
 
-    @property
+    @cached_property
     def api_session(self):
-        self.init_session.headers.update(self.headers)
-        return self.init_session
+        # The API session shares the login cookies, and sets the cached CSRF token on each request.
+        session = get_session()
+        session.cookies = self.init_session.cookies
+        session.headers.update(self.headers)
+        session.auth = CsrfTokenAuth(self, session)
+        return session
 
     @property
     def csrf_token(self):
+        """ Returns the CSRF token of the logged in session, retrieving it from the marketing site if necessary. """
+        with self._csrf_token_lock:
+            if self._csrf_token is None:
+                self._csrf_token = self._get_csrf_token()
+
+            return self._csrf_token
+
+    def refresh_csrf_token(self, rejected_token=None):
+        """
+        Retrieves a new CSRF token from the marketing site.
+
+        Args:
+            rejected_token (str): Token rejected by the marketing site. If another thread has already replaced it, the
+                replacement is returned instead of retrieving yet another token.
+
+        Returns:
+            str
+        """
+        with self._csrf_token_lock:
+            if rejected_token is None or rejected_token == self._csrf_token:
+                self._csrf_token = self._get_csrf_token()
+
+            return self._csrf_token
+
+    def _get_csrf_token(self):
         # We need to make sure we can bypass the Varnish cache.
         # So adding a random salt into the query string to cache bust
         random_qs = ''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(10))
@@ -1,10 +1,11 @@
 import logging
 
 from django.conf import settings
-from django.core.management import CommandError
+from django.core.management import CommandError, call_command
 from haystack import connections as haystack_connections
 from haystack.management.commands.update_index import Command as HaystackCommand
 
+from course_discovery.apps.api.cache import bump_search_index_generation
 from course_discovery.apps.core.utils import ElasticsearchUtils
 
 logger = logging.getLogger(__name__)
@@ -54,6 +55,16 @@ class Command(HaystackCommand):
 
             self.set_alias(backend, alias, index)
 
+        # API responses built from the previous index are no longer valid.
+        bump_search_index_generation()
+
+        if settings.API_CACHE_WARMING_MANIFEST:
+            # Rebuild the most requested responses before clients do, now that they can use the new index.
+            try:
+                call_command('warm_api_cache')
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Failed to warm the API cache.')
+
     def percentage_change(self, current, previous):
         try:
             return abs(current - previous) / previous
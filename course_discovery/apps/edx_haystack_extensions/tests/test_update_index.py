@@ -15,11 +15,15 @@ from course_discovery.apps.edx_haystack_extensions.tests.mixins import SearchInd
 class UpdateIndexTests(ElasticsearchTestMixin, SearchIndexTestMixin, TestCase):
     @freeze_time('2016-06-21')
     def test_handle(self):
-        """ Verify the command creates a timestamped index and repoints the alias. """
+        """ Verify the command creates a timestamped index, repoints the alias, and invalidates API responses. """
         with mock.patch('course_discovery.apps.edx_haystack_extensions.management.commands.'
-                        'update_index.Command.sanity_check_new_index', return_value=(True, '')):
+                        'update_index.Command.sanity_check_new_index', return_value=(True, '')), \
+                mock.patch('course_discovery.apps.edx_haystack_extensions.management.commands.'
+                           'update_index.bump_search_index_generation') as mock_bump_search_index_generation:
             call_command('update_index')
 
+        mock_bump_search_index_generation.assert_called_once_with()
+
         alias = settings.HAYSTACK_CONNECTIONS['default']['INDEX_NAME']
         index = '{alias}_20160621_000000'.format(alias=alias)
 
@@ -35,6 +39,20 @@ class UpdateIndexTests(ElasticsearchTestMixin, SearchIndexTestMixin, TestCase):
         }
         self.assertDictEqual(response, expected)
 
+    def test_warm_api_cache(self):
+        """ Verify the API cache is warmed once the new index is in use, if a manifest is configured. """
+        with mock.patch('course_discovery.apps.edx_haystack_extensions.management.commands.'
+                        'update_index.Command.sanity_check_new_index', return_value=(True, '')), \
+                mock.patch('course_discovery.apps.edx_haystack_extensions.management.commands.'
+                           'update_index.call_command') as mock_call_command:
+            call_command('update_index')
+            self.assertFalse(mock_call_command.called)
+
+            with override_settings(API_CACHE_WARMING_MANIFEST='/tmp/manifest.json'):
+                call_command('update_index')
+
+            mock_call_command.assert_called_once_with('warm_api_cache')
+
     def test_sanity_check_error(self):
         """ Verify the command raises a CommandError if new index fails the sanity check. """
         CourseRunFactory()
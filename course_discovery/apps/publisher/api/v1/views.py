@@ -10,6 +10,7 @@ from rest_framework.decorators import detail_route
 from rest_framework.response import Response
 from slumber.exceptions import SlumberBaseException
 
+from course_discovery.apps.core.http import get_session
 from course_discovery.apps.core.utils import serialize_datetime
 from course_discovery.apps.course_metadata.models import CourseEntitlement as DiscoveryCourseEntitlement
 from course_discovery.apps.course_metadata.models import CourseRun as DiscoveryCourseRun
@@ -90,7 +91,7 @@ class CourseRunViewSet(viewsets.GenericViewSet):
         course_key = self.get_course_key(course_run.course)
         discovery_course = Course.objects.get(partner=partner, key=course_key)
 
-        api = EdxRestApiClient(partner.ecommerce_api_url, jwt=partner.access_token)
+        api = EdxRestApiClient(partner.ecommerce_api_url, session=get_session(), jwt=partner.access_token)
         data = {
             'id': course_run.lms_course_id,
             'uuid': str(discovery_course.uuid),
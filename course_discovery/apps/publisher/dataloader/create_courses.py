@@ -1,24 +1,81 @@
+import concurrent.futures
 import io
 import logging
 
-import requests
 from django.core.files import File
+from django.db import connection, transaction
 
+from course_discovery.apps.core.http import get_session
 from course_discovery.apps.publisher.choices import CourseRunStateChoices, CourseStateChoices, PublisherUserRole
 from course_discovery.apps.publisher.models import Course, CourseRun, CourseRunState, CourseState, Seat
 
 logger = logging.getLogger(__name__)
 
+# Number of courses imported in each transaction.
+CHUNK_SIZE = 100
+# Number of course images downloaded at the same time.
+IMAGE_WORKERS = 4
 
-def execute_query(start_id, end_id, create_course_run):
-    """ Execute query according to the range."""
 
+def execute_query(start_id, end_id, create_course_run, chunk_size=CHUNK_SIZE):
+    """ Execute query according to the range.
+
+    Courses are imported in chunks of consecutive ids. The related objects of each chunk are fetched together, each
+    chunk is written in a single transaction, and the images of its courses are downloaded in the background while
+    its courses are written.
+    """
+    start_id, end_id = int(start_id), int(end_id)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=IMAGE_WORKERS) as image_executor:
+        for chunk_start in range(start_id, end_id + 1, chunk_size):
+            chunk_end = min(chunk_start + chunk_size - 1, end_id)
+            import_chunk(chunk_start, chunk_end, create_course_run, image_executor)
+
+
+def execute_parallel_query(start_id, end_id, create_course_run, chunk_size=CHUNK_SIZE):
+    """
+    Imports a range of courses in a process of its own. The database connection copied from the parent process is
+    closed, so this process opens its own.
+    """
+    connection.close()
+    execute_query(start_id, end_id, create_course_run, chunk_size)
+
+
+def split_range(start_id, end_id, count):
+    """
+    Splits a range of ids into at most count contiguous ranges of similar size.
+
+    Returns:
+        list: (start, end) tuples of inclusive ranges.
+    """
+    start_id, end_id = int(start_id), int(end_id)
+    size = max(-(-(end_id - start_id + 1) // max(count, 1)), 1)
+
+    return [(start, min(start + size - 1, end_id)) for start in range(start_id, end_id + 1, size)]
+
+
+def import_chunk(start_id, end_id, create_course_run, image_executor):
     from course_discovery.apps.course_metadata.models import Course as CourseMetaData
 
-    for course in CourseMetaData.objects.select_related('canonical_course_run', 'level_type', 'video').filter(
-            id__range=(start_id, end_id)):
+    courses = CourseMetaData.objects.select_related('canonical_course_run', 'level_type', 'video').filter(
+        id__range=(start_id, end_id)
+    ).prefetch_related('authoring_organizations', 'subjects')
 
-        process_course(course, create_course_run)
+    if create_course_run:
+        courses = courses.prefetch_related(
+            'canonical_course_run__transcript_languages', 'canonical_course_run__staff', 'canonical_course_run__seats'
+        )
+
+    courses = list(courses)
+
+    for course in courses:
+        # Only the courses which will be imported need their image. See organizations_requirements.
+        if course.authoring_organizations.all() and not course.image and course.card_image_url:
+            course.card_image_download = image_executor.submit(download_card_image, course)
+
+    with transaction.atomic():
+        for course in courses:
+            process_course(course, create_course_run)
 
 
 def process_course(meta_data_course, create_course_run):
@@ -34,7 +91,9 @@ def process_course(meta_data_course, create_course_run):
         if not available_organization:
             return
 
-        create_or_update_course(meta_data_course, available_organization, create_course_run)
+        # The course is imported in a savepoint, so a failure does not affect the other courses of its chunk.
+        with transaction.atomic():
+            create_or_update_course(meta_data_course, available_organization, create_course_run)
 
     except:  # pylint: disable=bare-except
         logger.exception('Exception appear for course-id [%s].', meta_data_course.uuid)
@@ -94,6 +153,10 @@ def create_or_update_course(meta_data_course, available_organization, create_cou
         create_course_runs(meta_data_course, publisher_course)
 
 
+def download_card_image(meta_data_course):
+    return get_session().get(meta_data_course.card_image_url)
+
+
 def transfer_course_image(meta_data_course, publisher_course):
     if meta_data_course.image:
         publisher_course.image.save(
@@ -101,7 +164,9 @@ def transfer_course_image(meta_data_course, publisher_course):
             meta_data_course.image.file
         )
     elif meta_data_course.card_image_url:
-        response = requests.get(meta_data_course.card_image_url)
+        # The image may already have been downloaded in the background by execute_query.
+        download = getattr(meta_data_course, 'card_image_download', None)
+        response = download.result() if download else download_card_image(meta_data_course)
         if response.status_code == 200:
             img_name = meta_data_course.card_image_url.split('/')[-1]
             with io.BytesIO() as fp:
@@ -198,7 +263,8 @@ def organizations_requirements(organizations, meta_data_course):
     """ Before adding course make sure organization exists and has OrganizationExtension
     object also.
     """
-    available_organization = organizations.first()
+    # The organizations may have been prefetched, so take the first without querying them again.
+    available_organization = next(iter(organizations), None)
 
     if not available_organization:
         logger.warning(
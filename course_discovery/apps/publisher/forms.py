@@ -5,7 +5,6 @@ import waffle
 from dal import autocomplete
 from django import forms
 from django.core.exceptions import ValidationError
-from django.db.models.functions import Lower
 from django.template.loader import render_to_string
 from django.utils.translation import ugettext_lazy as _
 from opaque_keys import InvalidKeyError
@@ -71,7 +70,7 @@ class CourseForm(BaseForm):
     organization = forms.ModelChoiceField(
         queryset=Organization.objects.filter(
             organization_extension__organization_id__isnull=False
-        ).order_by(Lower('key')),
+        ).order_by('lowercase_key'),
         label=_('Organization Name'),
         required=True
     )
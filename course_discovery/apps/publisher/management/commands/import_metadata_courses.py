@@ -1,8 +1,12 @@
+import concurrent.futures
 import logging
 
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
 
-from course_discovery.apps.publisher.dataloader.create_courses import execute_query
+from course_discovery.apps.publisher.dataloader.create_courses import (
+    CHUNK_SIZE, execute_parallel_query, execute_query, split_range
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,10 +43,50 @@ class Command(BaseCommand):
             help='Whether this script should create the initial course run'
         )
 
+        parser.add_argument(
+            '--chunk_size',
+            action='store',
+            dest='chunk_size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Number of courses imported in each transaction.'
+        )
+
+        parser.add_argument(
+            '--processes',
+            action='store',
+            dest='processes',
+            type=int,
+            default=1,
+            help='Number of processes between which the range of ids is split.'
+        )
+
     def handle(self, *args, **options):
         """ Import the course according to the given range."""
         start_id = options.get('start_id')
         end_id = options.get('end_id')
         create_course_run = bool(options.get('create_course_run'))
+        chunk_size = options['chunk_size']
+        processes = options['processes']
+
+        if chunk_size < 1:
+            raise CommandError('--chunk_size must be at least 1.')
+
+        if processes <= 1:
+            execute_query(start_id, end_id, create_course_run, chunk_size)
+            return
+
+        ranges = split_range(start_id, end_id, processes)
+
+        # Close the connection so it is not shared with the import processes. See execute_parallel_query.
+        connection.close()
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(execute_parallel_query, range_start, range_end, create_course_run, chunk_size)
+                for range_start, range_end in ranges
+            ]
 
-        execute_query(start_id, end_id, create_course_run)
+            for (range_start, range_end), future in zip(ranges, futures):
+                future.result()
+                logger.info('Imported courses with ids [%d] to [%d].', range_start, range_end)
@@ -1,3 +1,4 @@
+import concurrent.futures
 import logging
 
 import ddt
@@ -14,6 +15,7 @@ from course_discovery.apps.course_metadata.tests.factories import (
     CourseFactory, CourseRunFactory, OrganizationFactory, PersonFactory, SeatFactory, SubjectFactory
 )
 from course_discovery.apps.ietf_language_tags.models import LanguageTag
+from course_discovery.apps.publisher.dataloader import create_courses
 from course_discovery.apps.publisher.dataloader.create_courses import logger as dataloader_logger
 from course_discovery.apps.publisher.dataloader.update_course_runs import logger as update_logger
 from course_discovery.apps.publisher.models import Course as Publisher_Course
@@ -49,6 +51,12 @@ class ImportCoursesCommandTests(TestCase):
         with self.assertRaises(ValueError):
             call_command(self.command_name, *command_args)
 
+    @ddt.data(0, -1)
+    def test_invalid_chunk_size(self, chunk_size):
+        """ Verify CommandError is raised if courses cannot be imported in chunks of the given size. """
+        with self.assertRaises(CommandError):
+            call_command(self.command_name, '--start_id=1', '--end_id=2', '--chunk_size={}'.format(chunk_size))
+
 
 @ddt.ddt
 class ImportCoursesTests(TestCase):
@@ -104,6 +112,55 @@ class ImportCoursesTests(TestCase):
             )
             create_or_update_course.assert_not_called()
 
+    @mock.patch('course_discovery.apps.publisher.dataloader.create_courses.process_course')
+    def test_query_in_chunks(self, process_course):
+        """ Verify that courses are imported in chunks, with their organizations and subjects fetched together. """
+        course_3 = CourseFactory()
+        command_args = ['--start_id={}'.format(self.course.id), '--end_id={}'.format(course_3.id), '--chunk_size=2']
+
+        with mock.patch(
+            'course_discovery.apps.publisher.dataloader.create_courses.import_chunk',
+            wraps=create_courses.import_chunk
+        ) as import_chunk:
+            call_command(self.command_name, *command_args)
+
+        self.assertEqual(
+            [call[0][:2] for call in import_chunk.call_args_list],
+            [(self.course.id, self.course.id + 1), (self.course.id + 2, course_3.id)]
+        )
+        self.assertEqual(
+            [mock.call(self.course, False), mock.call(self.course_2, False), mock.call(course_3, False)],
+            process_course.call_args_list
+        )
+
+        course = process_course.call_args_list[0][0][0]
+        with self.assertNumQueries(0):
+            list(course.authoring_organizations.all())
+            list(course.subjects.all())
+
+    @mock.patch('course_discovery.apps.publisher.management.commands.import_metadata_courses.connection')
+    @mock.patch('concurrent.futures.ProcessPoolExecutor', concurrent.futures.ThreadPoolExecutor)
+    @mock.patch(
+        'course_discovery.apps.publisher.management.commands.import_metadata_courses.execute_parallel_query'
+    )
+    def test_query_in_processes(self, execute_parallel_query, __):
+        """ Verify that the range of ids is split between processes. """
+        call_command(self.command_name, '--start_id=1', '--end_id=10', '--processes=3', '--chunk_size=2')
+
+        self.assertEqual(
+            sorted(call[0] for call in execute_parallel_query.call_args_list),
+            [(1, 4, False, 2), (5, 8, False, 2), (9, 10, False, 2)]
+        )
+
+    @ddt.data(
+        (1, 10, 3, [(1, 4), (5, 8), (9, 10)]),
+        (1, 2, 4, [(1, 1), (2, 2)]),
+        (5, 5, 1, [(5, 5)]),
+    )
+    @ddt.unpack
+    def test_split_range(self, start_id, end_id, count, expected):
+        self.assertEqual(create_courses.split_range(start_id, end_id, count), expected)
+
 
 # pylint: disable=no-member
 @ddt.ddt
@@ -2,7 +2,6 @@ from functools import wraps
 
 from dal import autocomplete
 from django.contrib.auth.decorators import login_required
-from django.db.models.functions import Lower
 from django.http import HttpResponseForbidden, HttpResponseRedirect
 from django.utils.decorators import method_decorator
 
@@ -148,13 +147,13 @@ def get_user_organizations(user):
     """
     organizations = Organization.objects.filter(
         organization_extension__organization_id__isnull=False
-    ).order_by(Lower('key'))
+    ).order_by('lowercase_key')
 
     if not check_roles_access(user):
         # If not internal user return only those organizations which belongs to user.
         organizations = organizations.filter(
             organization_extension__group__in=user.groups.all()
-        ).order_by(Lower('key'))
+        ).order_by('lowercase_key')
 
     return organizations
 
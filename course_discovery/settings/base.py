@@ -366,6 +366,19 @@ REST_FRAMEWORK_EXTENSIONS = {
     'DEFAULT_OBJECT_CACHE_KEY_FUNC': 'course_discovery.apps.api.cache.timestamped_object_key_constructor',
 }
 
+# Cached API responses (see course_discovery.apps.api.cache). When a cached response is invalidated, a single worker
+# rebuilds it, holding a lock for at most API_CACHE_LOCK_TIMEOUT seconds. Meanwhile, other workers serve the previous
+# response, for at most API_CACHE_STALE_TIMEOUT seconds after the first request for the new response, or wait up to
+# API_CACHE_WAIT_TIMEOUT seconds for the new response if there is no previous one.
+API_CACHE_LOCK_TIMEOUT = 60
+API_CACHE_STALE_TIMEOUT = 300
+API_CACHE_WAIT_TIMEOUT = 10
+
+# Manifest of the requests replayed by the warm_api_cache command, and the user they are made for. If a manifest is
+# set, the cache is warmed at the end of refresh_course_metadata.
+API_CACHE_WARMING_MANIFEST = None
+API_CACHE_WARMING_USERNAME = None
+
 # NOTE (CCB): JWT_SECRET_KEY is intentionally not set here to avoid production releases with a public value.
 # Set a value in a downstream settings file.
 JWT_AUTH = {
@@ -518,6 +531,16 @@ PUBLISHER_FROM_EMAIL = None
 # the course run end date minus the specified number of days.
 PUBLISHER_UPGRADE_DEADLINE_DAYS = 10
 
+# Outbound HTTP connections (see course_discovery.apps.core.http). Connections are pooled per host and kept alive, so
+# clients calling the same host (e.g. data loaders, publisher and management commands) reuse them.
+HTTP_CLIENT_POOL_SIZE = 10
+# Number of times a request is retried after a connection error or read timeout. Requests are retried with an
+# exponential backoff of HTTP_CLIENT_BACKOFF_FACTOR * (2 ^ (retry - 1)) seconds.
+HTTP_CLIENT_MAX_RETRIES = 3
+HTTP_CLIENT_BACKOFF_FACTOR = 0.5
+# Default (connect, read) timeout, in seconds, for requests which do not specify their own.
+HTTP_CLIENT_TIMEOUT = (5, 60)
+
 # Django Debug Toolbar settings
 # http://django-debug-toolbar.readthedocs.org/en/latest/installation.html
 if os.environ.get('ENABLE_DJANGO_TOOLBAR', False):